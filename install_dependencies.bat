@@ -35,6 +35,9 @@ python -m pip install networkx --user
 echo Installing Matplotlib...
 python -m pip install matplotlib --user
 
+echo Installing NumPy...
+python -m pip install numpy --user
+
 echo.
 echo ********************************************
 echo * All Dependencies Successfully Installed! *
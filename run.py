@@ -1,14 +1,92 @@
 # run.py
 import sys
+import threading
+import time
+
 from PyQt5.QtWidgets import QApplication
-from src.gui.main_window import MainWindow  
+from PyQt5.QtCore import QTimer
+
+# Modules only needed once "Demarrer Djikstra" is clicked, in dependency order.
+# These do not touch Qt, so they are imported on a background thread...
+BACKGROUND_MODULES = [
+    "numpy",
+    "networkx",
+    "matplotlib",
+    "matplotlib.figure",
+]
+# ...while these create Qt state and are imported on the GUI thread, one per
+# event-loop turn, once the background imports are done
+GUI_MODULES = [
+    "matplotlib.backends.backend_qt5agg",
+    "src.gui2.djikstra_app",
+]
+
+
+def _timed_import(name, report):
+    import importlib
+    start = time.perf_counter()
+    importlib.import_module(name)
+    if report is not None:
+        report.append((name, time.perf_counter() - start))
+
+
+def prewarm(report=None):
+    """Import the non-Qt part of the visualizer stack (run on a background thread)"""
+    for name in BACKGROUND_MODULES:
+        _timed_import(name, report)
+
+
+def prewarm_gui(report=None, on_done=None):
+    """
+    Import GUI_MODULES on the GUI thread, each in its own QTimer.singleShot(0)
+    so pending paint and input events are handled in between.
+    """
+    pending = list(GUI_MODULES)
+
+    def next_module():
+        if not pending:
+            if on_done is not None:
+                on_done()
+            return
+        _timed_import(pending.pop(0), report)
+        QTimer.singleShot(0, next_module)
+
+    QTimer.singleShot(0, next_module)
+
 
 def main():
+    import_report = "--import-report" in sys.argv
+    started = time.perf_counter()
+
     app = QApplication(sys.argv)
     app.setApplicationName("Dijkstra")
 
+    from src.gui.main_window import MainWindow
     window = MainWindow()
     window.show()
+    timings = [("startup (Qt + editor)", time.perf_counter() - started)]
+    report = timings if import_report else None
+
+    def print_report():
+        print("Import report (seconds):")
+        for name, seconds in timings:
+            print(f"  {name:<40} {seconds:8.3f}")
+
+    def after_first_paint():
+        timings.append(("first paint", time.perf_counter() - started))
+        thread = threading.Thread(target=prewarm, args=(report,), daemon=True)
+        thread.start()
+
+        def wait_for_thread():
+            # Polled from the event loop: the GUI thread never blocks on join()
+            if thread.is_alive():
+                QTimer.singleShot(20, wait_for_thread)
+            else:
+                prewarm_gui(report, print_report if import_report else None)
+
+        QTimer.singleShot(20, wait_for_thread)
+
+    QTimer.singleShot(0, after_first_paint)
 
     sys.exit(app.exec_())
 
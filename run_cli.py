@@ -0,0 +1,7 @@
+# run_cli.py
+import sys
+
+from src.gui2.headless import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# edge_index.py
+
+from bisect import bisect_left, insort
+
+
+class EdgeIndex:
+    """
+    Adjacency index over the editor's edge ids, kept up to date on every edit.
+
+    out_edges[u] / in_edges[v] are the ids of the live edges leaving u /
+    entering v, and pairs[(u, v)] lists the ids of the parallel edges u -> v
+    in creation order (the position in that list is the curve offset ordinal).
+    """
+
+    def __init__(self, node_count=0):
+        self.out_edges = [set() for _ in range(node_count)]
+        self.in_edges = [set() for _ in range(node_count)]
+        self.pairs = {}
+
+    @classmethod
+    def from_edges(cls, edges, node_count):
+        index = cls(node_count)
+        for edge_id, edge in enumerate(edges):
+            if edge is not None:
+                index.add(edge_id, edge[0], edge[1])
+        return index
+
+    def add_node(self):
+        self.out_edges.append(set())
+        self.in_edges.append(set())
+
+    def pop_node(self):
+        self.out_edges.pop()
+        self.in_edges.pop()
+
+    def add(self, edge_id, u, v):
+        self.out_edges[u].add(edge_id)
+        self.in_edges[v].add(edge_id)
+        group = self.pairs.setdefault((u, v), [])
+        if not group or group[-1] < edge_id:
+            group.append(edge_id)
+        else:
+            # Revived by undo: go back to its original ordinal
+            insort(group, edge_id)
+
+    def remove(self, edge_id, u, v):
+        self.out_edges[u].discard(edge_id)
+        self.in_edges[v].discard(edge_id)
+        group = self.pairs[(u, v)]
+        del group[bisect_left(group, edge_id)]
+        if not group:
+            del self.pairs[(u, v)]
+
+    def count(self, u, v):
+        """Number of parallel edges u -> v"""
+        group = self.pairs.get((u, v))
+        return len(group) if group else 0
+
+    def group(self, u, v):
+        return self.pairs.get((u, v), [])
+
+    def incident(self, node):
+        """Ids of the edges entering or leaving node (a loop appears once)"""
+        return self.out_edges[node] | self.in_edges[node]
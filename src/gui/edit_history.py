@@ -0,0 +1,133 @@
+# edit_history.py
+
+from collections import deque
+
+
+class AddNode:
+    def __init__(self, position):
+        self.position = position
+        self.node_id = None
+
+    def apply(self, canvas):
+        self.node_id = canvas._append_node(self.position)
+
+    def revert(self, canvas):
+        # Everything recorded after this command has been undone,
+        # so the node is the last one in the list
+        canvas._pop_node(self.node_id)
+
+
+class MoveNode:
+    def __init__(self, node_id, old_position, new_position):
+        self.node_id = node_id
+        self.old_position = old_position
+        self.new_position = new_position
+
+    def apply(self, canvas):
+        canvas.nodes[self.node_id] = self.new_position
+
+    def revert(self, canvas):
+        canvas.nodes[self.node_id] = self.old_position
+
+
+class DeleteNode:
+    """Tombstones a node and its incident edges: O(degree), no renumbering"""
+
+    def __init__(self, node_id):
+        self.node_id = node_id
+        self.position = None
+        self.removed_edges = []
+
+    def apply(self, canvas):
+        self.position = canvas.nodes[self.node_id]
+        self.removed_edges = [(edge_id, canvas._kill_edge(edge_id))
+                              for edge_id in canvas.index.incident(self.node_id)]
+        canvas.nodes[self.node_id] = None
+
+    def revert(self, canvas):
+        canvas.nodes[self.node_id] = self.position
+        for edge_id, edge in self.removed_edges:
+            canvas._revive_edge(edge_id, edge)
+
+
+class AddEdge:
+    def __init__(self, edge):
+        self.edge = edge
+        self.edge_id = None
+
+    def apply(self, canvas):
+        self.edge_id = canvas._append_edge(self.edge)
+
+    def revert(self, canvas):
+        canvas._pop_edge(self.edge_id)
+
+
+class DeleteEdge:
+    def __init__(self, edge_id):
+        self.edge_id = edge_id
+        self.edge = None
+
+    def apply(self, canvas):
+        self.edge = canvas._kill_edge(self.edge_id)
+
+    def revert(self, canvas):
+        canvas._revive_edge(self.edge_id, self.edge)
+
+
+class ReplaceGraph:
+    """
+    Swaps the whole graph (import, clear). The previous lists are kept as they
+    are, so undoing an import is a reference swap, not a copy.
+    """
+
+    def __init__(self, state):
+        self.state = state
+
+    def apply(self, canvas):
+        self.state = canvas._swap_state(self.state)
+
+    revert = apply
+
+
+class EditHistory:
+    """Linear undo/redo log of editor commands (at most `limit` steps kept)"""
+
+    def __init__(self, limit=1000):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+
+    def execute(self, command, canvas):
+        command.apply(canvas)
+        self.undo_stack.append(command)
+        self.redo_stack.clear()
+
+    def record(self, command):
+        """Log a command whose effect has already been applied (e.g. a finished drag)"""
+        self.undo_stack.append(command)
+        self.redo_stack.clear()
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def undo(self, canvas):
+        if not self.undo_stack:
+            return False
+        command = self.undo_stack.pop()
+        command.revert(canvas)
+        self.redo_stack.append(command)
+        return True
+
+    def redo(self, canvas):
+        if not self.redo_stack:
+            return False
+        command = self.redo_stack.pop()
+        command.apply(canvas)
+        self.undo_stack.append(command)
+        return True
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
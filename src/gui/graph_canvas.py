@@ -7,11 +7,20 @@ from PyQt5.QtCore import QRectF
 
 import math
 
+from .edge_index import EdgeIndex
+from .edit_history import (AddEdge, AddNode, DeleteEdge, DeleteNode, EditHistory,
+                           MoveNode, ReplaceGraph)
+
 class GraphCanvas(QWidget):
     def __init__(self):
         super().__init__()
+        # Node and edge ids are list positions and never change: deleted
+        # entries are tombstoned with None instead of renumbering the rest
         self.nodes = []
         self.edges = []
+        # Out/in incidence and parallel-edge groups of the live edges
+        self.index = EdgeIndex()
+        self.history = EditHistory()
         self.radius = 20
         self.edge_offset = 20
         self.curve_strength = 0.4
@@ -19,6 +28,7 @@ class GraphCanvas(QWidget):
         self.dragging_node_index = None
         self.hover_node_index = None
         self.drag_offset = QPointF(0, 0)
+        self.drag_start = None
         self.selected_node_for_edge = None
         self.eraser_mode = False
         self.allow_loops = True
@@ -45,25 +55,20 @@ class GraphCanvas(QWidget):
         self.draw_selected_edge_preview(painter)
 
     def draw_edges(self, painter):
-        edge_groups = {}
-        for src, dst, weight in self.edges:
-            key = (src, dst) if src != dst else (src, dst, 'loop')
-            edge_groups.setdefault(key, []).append((src, dst, weight))
-
         pen = QPen(QColor(60, 60, 60), 2)
         painter.setPen(pen)
         painter.setFont(QFont("Arial", 10))
 
-        for key, edges in edge_groups.items():
-            for i, (src, dst, weight) in enumerate(edges):
-                if src >= len(self.nodes) or dst >= len(self.nodes):
-                    continue
-                x1, y1 = self.nodes[src]
-                x2, y2 = self.nodes[dst]
+        # Parallel edges come pre-grouped by the index, in creation order
+        for (src, dst), edge_ids in self.index.pairs.items():
+            x1, y1 = self.nodes[src]
+            x2, y2 = self.nodes[dst]
+            for i, edge_id in enumerate(edge_ids):
+                weight = self.edges[edge_id][2]
                 if src == dst:
                     self.draw_loop(painter, x1, y1, weight, i)
                 else:
-                    self.draw_curved_edge(painter, x1, y1, x2, y2, weight, i, len(edges))
+                    self.draw_curved_edge(painter, x1, y1, x2, y2, weight, i, len(edge_ids))
 
     def draw_curved_edge(self, painter, x1, y1, x2, y2, weight, index, total):
         dx, dy = x2 - x1, y2 - y1
@@ -148,7 +153,10 @@ class GraphCanvas(QWidget):
         painter.restore()
 
     def draw_nodes(self, painter):
-        for idx, (x, y) in enumerate(self.nodes):
+        for idx, position in enumerate(self.nodes):
+            if position is None:
+                continue
+            x, y = position
             if idx == self.error_node_index:
                 color = QColor(255, 100, 100)  # Red for error
                 border = QColor(200, 0, 0)
@@ -165,7 +173,8 @@ class GraphCanvas(QWidget):
             self.draw_label(painter, str(idx), x, y)
 
     def draw_selected_edge_preview(self, painter):
-        if self.selected_node_for_edge is None or self.selected_node_for_edge >= len(self.nodes):
+        if self.selected_node_for_edge is None or self.selected_node_for_edge >= len(self.nodes) \
+                or self.nodes[self.selected_node_for_edge] is None:
             return
         src = self.nodes[self.selected_node_for_edge]
         dst = self.mapFromGlobal(QCursor.pos())
@@ -183,9 +192,10 @@ class GraphCanvas(QWidget):
         if event.button() == Qt.LeftButton:
             if node_idx is not None:
                 self.dragging_node_index = node_idx
+                self.drag_start = self.nodes[node_idx]
                 self.drag_offset = pos - QPointF(*self.nodes[node_idx])
             else:
-                self.nodes.append((pos.x(), pos.y()))
+                self.history.execute(AddNode((pos.x(), pos.y())), self)
                 self.update()
 
         elif event.button() == Qt.RightButton:
@@ -208,7 +218,12 @@ class GraphCanvas(QWidget):
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton:
+            idx = self.dragging_node_index
+            if idx is not None and self.nodes[idx] != self.drag_start:
+                # One undo step per drag, not per mouse move
+                self.history.record(MoveNode(idx, self.drag_start, self.nodes[idx]))
             self.dragging_node_index = None
+            self.drag_start = None
 
     def handle_right_click(self, node_idx):
         if node_idx is None:
@@ -238,7 +253,7 @@ class GraphCanvas(QWidget):
             # Passed all checks - prompt for weight and add edge
             weight, ok = QInputDialog.getInt(self, "Poids de l'arête", "Entrez le poids :", 1, 0, 999)
             if ok:
-                self.edges.append((src, dst, weight))
+                self.add_edge(src, dst, weight)
 
             self.selected_node_for_edge = None
 
@@ -258,7 +273,7 @@ class GraphCanvas(QWidget):
         self.update()
 
     def edge_exists(self, src, dst):
-        return any(e[0] == src and e[1] == dst for e in self.edges)
+        return self.index.count(src, dst) > 0
 
     def handle_eraser(self, x, y, node_idx):
         if node_idx is not None:
@@ -267,21 +282,16 @@ class GraphCanvas(QWidget):
             self.delete_edge(x, y)
 
     def delete_node(self, idx):
-        self.nodes.pop(idx)
-        self.edges = [(u if u < idx else u - 1,
-                       v if v < idx else v - 1,
-                       w) for u, v, w in self.edges if u != idx and v != idx]
+        self.history.execute(DeleteNode(idx), self)
         if self.selected_node_for_edge == idx:
             self.selected_node_for_edge = None
-        elif self.selected_node_for_edge is not None and self.selected_node_for_edge > idx:
-            self.selected_node_for_edge -= 1
         self.update()
 
     def delete_edge(self, x, y):
-        for i, (u, v, w) in enumerate(self.edges):
-            if u >= len(self.nodes) or v >= len(self.nodes):
-                continue
-                
+        # Parallel edges share the tested geometry: one test per (u, v) pair,
+        # then the oldest edge of the group is removed
+        for (u, v), edge_ids in self.index.pairs.items():
+            i = edge_ids[0]
             x1, y1 = self.nodes[u]
             x2, y2 = self.nodes[v]
             
@@ -289,17 +299,20 @@ class GraphCanvas(QWidget):
                 loop_radius = self.radius + 1  # Base loop radius
                 # Check if point is near the loop (approximate with a circle above the node)
                 if math.hypot(x - x1, y - (y1 - 2 * loop_radius)) < loop_radius + 10:
-                    self.edges.pop(i)
+                    self.history.execute(DeleteEdge(i), self)
                     self.update()
                     return
             else:
                 if self.is_point_near_edge(x, y, x1, y1, x2, y2):
-                    self.edges.pop(i)
+                    self.history.execute(DeleteEdge(i), self)
                     self.update()
                     return
 
     def get_node_at(self, x, y):
-        for idx, (nx, ny) in enumerate(self.nodes):
+        for idx, position in enumerate(self.nodes):
+            if position is None:
+                continue
+            nx, ny = position
             if (x - nx) ** 2 + (y - ny) ** 2 <= self.radius ** 2:
                 return idx
         return None
@@ -314,8 +327,84 @@ class GraphCanvas(QWidget):
                 return True
         return False
     
+    # ------------------------------------------------------------------
+    # Editing (every change goes through self.history)
+    # ------------------------------------------------------------------
+
+    def add_edge(self, src, dst, weight):
+        self.history.execute(AddEdge((src, dst, weight)), self)
+
+    def set_graph(self, nodes, edges):
+        """Replace the whole graph in one undoable step (import)"""
+        index = EdgeIndex.from_edges(edges, len(nodes))
+        self.history.execute(ReplaceGraph((nodes, edges, index)), self)
+        self.selected_node_for_edge = None
+        self.dragging_node_index = None
+        self.update()
+
+    def undo(self):
+        if self.history.undo(self):
+            self.selected_node_for_edge = None
+            self.update()
+
+    def redo(self):
+        if self.history.redo(self):
+            self.selected_node_for_edge = None
+            self.update()
+
+    # Primitives used by the edit_history commands
+
+    def _append_node(self, position):
+        self.nodes.append(position)
+        self.index.add_node()
+        return len(self.nodes) - 1
+
+    def _pop_node(self, node_id):
+        assert node_id == len(self.nodes) - 1
+        self.nodes.pop()
+        self.index.pop_node()
+
+    def _append_edge(self, edge):
+        edge_id = len(self.edges)
+        self.edges.append(edge)
+        self.index.add(edge_id, edge[0], edge[1])
+        return edge_id
+
+    def _pop_edge(self, edge_id):
+        assert edge_id == len(self.edges) - 1
+        self._kill_edge(edge_id)
+        self.edges.pop()
+
+    def _kill_edge(self, edge_id):
+        """Tombstone an edge and return it, so that undo can revive it"""
+        edge = self.edges[edge_id]
+        self.index.remove(edge_id, edge[0], edge[1])
+        self.edges[edge_id] = None
+        return edge
+
+    def _revive_edge(self, edge_id, edge):
+        self.edges[edge_id] = edge
+        self.index.add(edge_id, edge[0], edge[1])
+
+    def _swap_state(self, state):
+        previous = (self.nodes, self.edges, self.index)
+        self.nodes, self.edges, self.index = state
+        return previous
+
+    def live_edges(self):
+        return [edge for edge in self.edges if edge is not None]
+
+    def to_graph(self):
+        """Returns the graph as a CSRGraph (parallel edges keep their minimum weight)"""
+        from src.gui2.csr_graph import CSRGraph
+        graph = CSRGraph.from_edges(self.live_edges())
+        # Editor positions (y pointing up) for the focused renderer
+        graph.coordinates = [(self.nodes[label][0], -self.nodes[label][1])
+                             for label in graph.labels]
+        return graph
+
     def export_graph(self):
         """Returns the graph edges in the format [(src, dst, weight), ...]"""
         # Sort edges for consistent output
-        sorted_edges = sorted(self.edges, key=lambda x: (x[0], x[1], x[2]))
+        sorted_edges = sorted(self.live_edges(), key=lambda x: (x[0], x[1], x[2]))
         return sorted_edges
\ No newline at end of file
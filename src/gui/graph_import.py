@@ -0,0 +1,134 @@
+# graph_import.py
+
+import numbers
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+def validate_edges(edges, max_examples=5):
+    """
+    Check an imported edge list in one vectorised pass.
+
+    Nodes are canvas indices: an edge is kept when it is a (src, dst, weight)
+    triple of numbers, src/dst are non-negative integers and the weight is
+    finite. The graph gets max(index) + 1 nodes, so indices left free by
+    deleted nodes (an export keeps the editor's ids) come back as isolated
+    nodes instead of shifting the others.
+
+    Returns (valid edges, number of nodes, errors) where errors is a list of
+    (count, message, [example edges]) with one entry per kind of problem.
+    """
+    edges = list(edges)
+    errors = []
+    positions = np.arange(len(edges))
+    try:
+        data = np.array(edges)
+        if data.dtype.kind not in 'iuf' or data.shape[1:] != (3,):
+            raise ValueError
+        data = data.astype(np.float64).reshape(-1, 3)
+    except (ValueError, TypeError):
+        # Only reached for ragged or non-numeric input: find the culprits
+        rows, keep, malformed = [], [], []
+        for i, edge in enumerate(edges):
+            try:
+                src, dst, weight = edge
+                if not all(isinstance(x, numbers.Real) for x in (src, dst, weight)):
+                    raise TypeError
+                rows.append((float(src), float(dst), float(weight)))
+                keep.append(i)
+            except (TypeError, ValueError):
+                malformed.append(edge)
+        if malformed:
+            errors.append((len(malformed), f"{len(malformed)} entrée(s) mal formée(s), "
+                           f"format attendu (src, dst, poids)", malformed[:max_examples]))
+        data = np.array(rows, dtype=np.float64).reshape(-1, 3)
+        positions = np.array(keep, dtype=np.int64)
+
+    src, dst, weight = data[:, 0], data[:, 1], data[:, 2]
+    bad_label = (src < 0) | (dst < 0) | (src != np.floor(src)) | (dst != np.floor(dst))
+    bad_weight = ~np.isfinite(weight) & ~bad_label
+    for mask, message in ((bad_label, "nœud(s) qui ne sont pas des entiers positifs"),
+                          (bad_weight, "poids non fini(s)")):
+        if mask.any():
+            errors.append((int(mask.sum()), f"{int(mask.sum())} arête(s) avec des {message}",
+                           [edges[i] for i in positions[mask][:max_examples].tolist()]))
+    ok = ~(bad_label | bad_weight)
+
+    num_nodes = int(max(src[ok].max(), dst[ok].max())) + 1 if ok.any() else 0
+
+    valid = [tuple(edges[i]) for i in positions[ok].tolist()]
+    return valid, num_nodes, errors
+
+
+def ring_layout(num_nodes):
+    """
+    Concentric rings around the centre (6, 12, 18, ... nodes), as unit
+    coordinates: the outer ring has radius 1. Returns an (n, 2) array.
+    """
+    if num_nodes == 0:
+        return np.empty((0, 2))
+    # Smallest number of rings R with 6 + 12 + ... + 6R = 3R(R + 1) >= n
+    rings = int(np.ceil((-1 + np.sqrt(1 + 4 * num_nodes / 3)) / 2))
+    while 3 * rings * (rings + 1) < num_nodes:
+        rings += 1
+    starts = 3 * np.arange(rings) * np.arange(1, rings + 1)
+    counts = np.minimum(6 * np.arange(1, rings + 1), num_nodes - starts)
+
+    ring_of = np.repeat(np.arange(rings), counts)
+    angle = 2 * np.pi * (np.arange(num_nodes) - starts[ring_of]) / counts[ring_of]
+    radius = (ring_of + 1) / rings
+    return np.column_stack((radius * np.cos(angle), radius * np.sin(angle)))
+
+
+def unit_box_layout(coordinates):
+    """Map (n, 2) coordinates onto [-1, 1]², keeping the aspect ratio"""
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    low, high = coordinates.min(axis=0), coordinates.max(axis=0)
+    span = max((high - low).max(), 1e-12)
+    return (coordinates - (low + high) / 2) * (2 / span)
+
+
+class GraphImportWorker(QThread):
+    """Validates an edge list and computes its ring layout off the GUI thread"""
+
+    import_ready = pyqtSignal(object)
+    import_failed = pyqtSignal(str)
+
+    def __init__(self, edges, parent=None):
+        super().__init__(parent)
+        self.edges = edges
+
+    def build(self):
+        edges, num_nodes, errors = validate_edges(self.edges)
+        return edges, ring_layout(num_nodes), errors
+
+    def run(self):
+        try:
+            self.import_ready.emit(self.build())
+        except Exception as e:
+            self.import_failed.emit(str(e))
+
+
+class GeneratedGraphWorker(GraphImportWorker):
+    """
+    Builds a generators.GENERATORS graph off the GUI thread. Generated graphs
+    are valid by construction; spatial ones keep their own coordinates.
+    """
+
+    def __init__(self, kind, edge_count, seed, parent=None):
+        super().__init__(None, parent)
+        self.kind = kind
+        self.edge_count = edge_count
+        self.seed = seed
+
+    def build(self):
+        from src.gui2.generators import generate
+
+        graph = generate(self.kind, self.edge_count, self.seed)
+        edges = list(graph.weighted_edges())
+        if getattr(graph, 'coordinates', None) is not None:
+            positions = unit_box_layout(graph.coordinates)
+        else:
+            positions = ring_layout(graph.number_of_nodes())
+        return edges, positions, []
@@ -66,6 +66,11 @@ class HelpDialog(QDialog):
   - **Clic gauche** sur un nœud pour le supprimer ainsi que ses arêtes.
   - **Clic gauche** sur une arête pour la supprimer.
 - **Clic du milieu** sur un nœud ou une arête pour les supprimer (fonctionne même sans le mode gomme).
+- Les numéros des autres nœuds ne changent pas après une suppression.
+
+### ↶ Annuler / Rétablir
+- **Ctrl+Z** (ou **"↶ Annuler"**) annule la dernière modification : ajout, déplacement, suppression ou import.
+- **Ctrl+Y** / **Ctrl+Maj+Z** (ou **"↷ Rétablir"**) la rétablit.
 
 ---
 
@@ -108,6 +113,7 @@ class HelpDialog(QDialog):
 - Cliquez sur le bouton **"?"** pour plus d’aide.
 - **Clic droit** : créer une arête.
 - **Clic du milieu** : supprimer un nœud ou une arête (même sans le mode gomme).
+- **Ctrl+Z / Ctrl+Y** : annuler / rétablir.
 """)
 
 
@@ -3,12 +3,12 @@ import math
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QCheckBox, QLabel, QMessageBox,
-    QGroupBox, QFrame , QInputDialog, QDialog,QPlainTextEdit,QApplication,QLineEdit
+    QGroupBox, QFrame , QInputDialog, QDialog,QPlainTextEdit,QApplication,QLineEdit,
+    QShortcut
 )
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont
+from PyQt5.QtGui import QFont, QKeySequence
 
-from src.gui2.djikstra_app import DijkstraApp
 from src.gui.graph_selection_dialog import GraphSelectionDialog
 from src.gui.help_dialog import HelpDialog
 from .graph_canvas import GraphCanvas
@@ -124,6 +124,16 @@ class MainWindow(QWidget):
         
         self.eraser_cb = QCheckBox("Mode Gomme")
         tool_layout.addWidget(self.eraser_cb)
+
+        history_layout = QHBoxLayout()
+        undo_btn = QPushButton("↶ Annuler")
+        undo_btn.setToolTip("Annuler la dernière modification (Ctrl+Z)")
+        redo_btn = QPushButton("↷ Rétablir")
+        redo_btn.setToolTip("Rétablir la modification annulée (Ctrl+Y)")
+        for btn in (undo_btn, redo_btn):
+            btn.setStyleSheet("min-width: 60px; padding: 6px 8px;")
+            history_layout.addWidget(btn)
+        tool_layout.addLayout(history_layout)
         tool_group.setLayout(tool_layout)
         side_panel.addWidget(tool_group)
 
@@ -168,6 +178,12 @@ class MainWindow(QWidget):
         self.canvas = GraphCanvas()
         layout.addWidget(self.canvas, stretch=4)
 
+        undo_btn.clicked.connect(self.canvas.undo)
+        redo_btn.clicked.connect(self.canvas.redo)
+        QShortcut(QKeySequence.Undo, self, activated=self.canvas.undo)
+        QShortcut(QKeySequence.Redo, self, activated=self.canvas.redo)
+        QShortcut(QKeySequence("Ctrl+Y"), self, activated=self.canvas.redo)
+
         # Connect signals
         self.eraser_cb.stateChanged.connect(self.update_canvas_config)
         self.allow_loops_cb.stateChanged.connect(self.update_canvas_config)
@@ -229,12 +245,8 @@ class MainWindow(QWidget):
             QMessageBox.warning(self, "Erreur", "Le graphe est vide.")
             return
 
-        # Get all unique node indices from edges
-        node_set = set()
-        for u, v, _ in edges:
-            node_set.add(u)
-            node_set.add(v)
-        node_list = sorted(node_set)
+        graph = self.canvas.to_graph()
+        node_list = graph.nodes()
 
         formatted_text = str(edges)
 
@@ -249,6 +261,12 @@ class MainWindow(QWidget):
         title.setStyleSheet("font-weight: bold; font-size: 16px;")
         layout.addWidget(title)
 
+        build_label = QLabel(
+            f"Graphe construit en {graph.build_seconds * 1000:.1f} ms "
+            f"({graph.number_of_nodes()} nœuds, {graph.number_of_edges()} arcs)")
+        build_label.setStyleSheet("color: #555555; font-size: 12px;")
+        layout.addWidget(build_label)
+
         text_edit = QPlainTextEdit()
         text_edit.setPlainText(formatted_text)
         text_edit.setReadOnly(True)
@@ -294,7 +312,9 @@ class MainWindow(QWidget):
             try:
                 source = int(source_combo.currentText())
                 print(f"Dialog result: ok=True, source={source}")  # Debug
-                self.dijkstra_app = DijkstraApp(edges, source, parent=None)
+                # Imported here: networkx and matplotlib are only needed from this point
+                from src.gui2.djikstra_app import DijkstraApp
+                self.dijkstra_app = DijkstraApp(graph, source, parent=None)
                 self.dijkstra_app.run()
                 if hasattr(self.dijkstra_app, "visualizer"):
                     vis = self.dijkstra_app.visualizer
@@ -500,13 +520,42 @@ class MainWindow(QWidget):
 ],
         }
 
+        # Procedural graphs are only built once chosen, at the chosen size
+        from src.gui2.generators import GENERATORS
+        generated = {f"⚙ {label} (généré)": kind for kind, (label, _) in GENERATORS.items()}
+
         # Show custom selection dialog
-        dialog = GraphSelectionDialog(list(predefined_graphs.keys()), self)
+        dialog = GraphSelectionDialog(list(predefined_graphs.keys()) + list(generated), self)
         if dialog.exec_() == QDialog.Accepted:
             graph_name = dialog.get_selected_graph()
-            if graph_name:
+            if graph_name in generated:
+                self.generate_graph(generated[graph_name])
+            elif graph_name:
                 self.import_graph_data(predefined_graphs[graph_name])
 
+    def generate_graph(self, kind):
+        from src.gui2.generators import SIZES
+        from src.gui.graph_import import GeneratedGraphWorker
+
+        exponents = "⁰¹²³⁴⁵⁶⁷⁸⁹"
+        choices = [f"10{exponents[len(str(size)) - 1]} arêtes" for size in SIZES]
+        choice, ok = QInputDialog.getItem(self, "Taille du graphe",
+                                          "Nombre approximatif d'arêtes :", choices, 0, False)
+        if not ok:
+            return
+        size = SIZES[choices.index(choice)]
+        seed, ok = QInputDialog.getInt(self, "Graine aléatoire",
+                                       "Graine (même graine = même graphe) :", 42, 0, 2 ** 31 - 1)
+        if not ok:
+            return
+        if size >= 10 ** 5:
+            answer = QMessageBox.question(
+                self, "Grand graphe",
+                f"{choice} : l'affichage dans l'éditeur peut être lent. Continuer ?")
+            if answer != QMessageBox.Yes:
+                return
+        self.start_import(GeneratedGraphWorker(kind, size, seed, self))
+
 
     def import_custom_graph(self):
         text, ok = QInputDialog.getMultiLineText(
@@ -527,76 +576,42 @@ class MainWindow(QWidget):
                 QMessageBox.warning(self, "Format invalide", f"Impossible d'analyser l'entrée : {str(e)}")
 
     def import_graph_data(self, edges):
-        """Import graph data and automatically position nodes in concentric circles (adaptive to screen size)"""
-        import math
-        from PyQt5.QtWidgets import QMessageBox
-
-        try:
-            # Clear existing graph
-            self.canvas.nodes = []
-            self.canvas.edges = []
-
-            # Find all unique nodes
-            nodes = set()
-            for src, dst, _ in edges:
-                nodes.add(src)
-                nodes.add(dst)
-            num_nodes = len(nodes)
-
-            if num_nodes == 0:
-                return
+        """Validate and lay out the edges in a worker thread, then fill the canvas in one swap"""
+        from src.gui.graph_import import GraphImportWorker
+        self.start_import(GraphImportWorker(edges, self))
+
+    def start_import(self, worker):
+        # Only the most recent import is applied if several are started
+        self._import_worker = worker
+        worker.import_ready.connect(lambda result: self.apply_imported_graph(worker, result))
+        worker.import_failed.connect(
+            lambda message: QMessageBox.critical(self, "Erreur", message))
+        worker.finished.connect(worker.deleteLater)
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        worker.finished.connect(QApplication.restoreOverrideCursor)
+        worker.start()
+
+    def apply_imported_graph(self, worker, result):
+        if worker is not self._import_worker:
+            return
+        edges, unit_positions, errors = result
 
-            center_x = self.canvas.width() / 2
-            center_y = self.canvas.height() / 2
-            max_radius = min(center_x, center_y) * 0.9
-
-            # Estimate the number of rings needed
-            ring_counts = []  # how many nodes per ring
-            remaining = num_nodes
-            ring = 1
-            while remaining > 0:
-                capacity = 6 * ring  # number of nodes this ring can hold
-                use = min(remaining, capacity)
-                ring_counts.append(use)
-                remaining -= use
-                ring += 1
-
-            num_rings = len(ring_counts)
-            if num_rings == 0:
-                return
+        # Scaled to the canvas size now, not when the import was started
+        center_x = self.canvas.width() / 2
+        center_y = self.canvas.height() / 2
+        max_radius = min(center_x, center_y) * 0.9
+        positions = unit_positions * max_radius + (center_x, center_y)
 
-            # Dynamically calculate ring gap to use full space
-            ring_gap = max_radius / num_rings
-
-            # Place nodes in rings
-            positions = []
-            node_index = 0
-            for r, count in enumerate(ring_counts):
-                radius = ring_gap * (r + 1)
-                for i in range(count):
-                    angle = 2 * math.pi * i / count
-                    x = center_x + radius * math.cos(angle)
-                    y = center_y + radius * math.sin(angle)
-                    positions.append((x, y))
-                    node_index += 1
-
-            self.canvas.nodes = positions
-
-            # Add edges
-            for src, dst, weight in edges:
-                if src < num_nodes and dst < num_nodes:
-                    self.canvas.edges.append((src, dst, weight))
-                else:
-                    QMessageBox.warning(self, "Arc invalide",
-                                        f"Arc ({src}, {dst}) Référence à un nœud inexistant")
-        except Exception as e:
-            QMessageBox.critical(self, "Erreur", str(e))
+        self.canvas.set_graph([tuple(p) for p in positions.tolist()], edges)
+
+        if errors:
+            skipped = sum(count for count, _, _ in errors)
+            details = "\n".join(
+                f"• {message}" + (f"\n    ex. : {', '.join(map(str, examples))}" if examples else "")
+                for _, message, examples in errors)
+            QMessageBox.warning(self, "Arcs invalides",
+                                f"{skipped} entrée(s) ignorée(s) lors de l'import :\n\n{details}")
 
-            
-            self.canvas.update()
-            
-        except (ValueError, TypeError) as e:
-            QMessageBox.warning(self, "Données invalides", f"Erreur lors du traitement des données du graphe : {str(e)}")
     def show_help(self):
         help_dialog = HelpDialog(self)
         help_dialog.exec_()
\ No newline at end of file
@@ -0,0 +1,304 @@
+import hashlib
+import heapq
+import os
+import pickle
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from .dijkstra_algorithm import build_adjacency
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.dijkstra_cache', 'landmarks')
+
+
+def graph_fingerprint(adjacency):
+    """Stable hash of a weighted adjacency, used as the landmark cache key"""
+    digest = hashlib.sha1()
+    for u in sorted(adjacency, key=repr):
+        for v, w in sorted(adjacency[u], key=repr):
+            digest.update(f"{u!r}>{v!r}:{w!r};".encode())
+        digest.update(f"{u!r}|".encode())
+    return digest.hexdigest()
+
+
+def reverse_adjacency(adjacency):
+    reverse = {u: [] for u in adjacency}
+    for u, neighbors in adjacency.items():
+        for v, w in neighbors:
+            reverse.setdefault(v, []).append((u, w))
+    return reverse
+
+
+def shortest_path_tree(adjacency, source):
+    """Plain Dijkstra to completion, returns ({node: distance}, {node: parent}) for reachable nodes"""
+    distances = {source: 0}
+    parents = {source: None}
+    queue = [(0, source)]
+    while queue:
+        dist, node = heapq.heappop(queue)
+        if dist > distances[node]:
+            continue
+        for neighbor, weight in adjacency[node]:
+            new_distance = dist + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                parents[neighbor] = node
+                heapq.heappush(queue, (new_distance, neighbor))
+    return distances, parents
+
+
+def _distance_row(adjacency, nodes, landmark):
+    distances, _ = shortest_path_tree(adjacency, landmark)
+    return [distances.get(node, float('inf')) for node in nodes]
+
+
+# Graph of a landmark worker process, sent once by the pool initializer
+_worker_graph = None
+
+
+def _init_worker(reverse, nodes):
+    global _worker_graph
+    _worker_graph = (reverse, nodes)
+
+
+def _backward_row(landmark):
+    reverse, nodes = _worker_graph
+    return _distance_row(reverse, nodes, landmark)
+
+
+class LandmarkTable:
+    """
+    Landmark distance tables for ALT (A*, Landmarks, Triangle inequality).
+
+    For each landmark L the table keeps d(L, v) (forward) and d(v, L) (backward)
+    for every node v, stored as lists aligned with self.nodes. Tables are cached
+    on disk under the graph fingerprint so a graph is only preprocessed once.
+    """
+
+    def __init__(self, graph, k=8, method='avoid', workers=None,
+                 cache_dir=DEFAULT_CACHE_DIR, seed=42):
+        """
+        Args:
+            graph: NetworkX DiGraph with a 'weight' attribute on every edge
+            k: number of landmarks
+            method: 'farthest' or 'avoid'
+            workers: 1 runs everything in this process; otherwise the backward
+                search of each landmark runs in a helper process while this one
+                does the forward search
+            cache_dir: directory for cached tables, or None to disable caching
+            seed: seed for the initial landmark choice
+        """
+        self.adjacency = build_adjacency(graph)
+        self.reverse = reverse_adjacency(self.adjacency)
+        self.nodes = list(self.reverse)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.k = min(k, len(self.nodes))
+        self.method = method
+        self.fingerprint = graph_fingerprint(self.adjacency)
+
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = os.path.join(
+                cache_dir, f"{self.fingerprint}_{method}_{self.k}_{seed}.pkl")
+            if os.path.exists(cache_path):
+                with open(cache_path, 'rb') as f:
+                    data = pickle.load(f)
+                self.landmarks = data['landmarks']
+                self.forward = data['forward']
+                self.backward = data['backward']
+                return
+
+        if method not in ('farthest', 'avoid'):
+            raise ValueError(f"Unknown landmark selection method: {method}")
+        rng = random.Random(seed)
+        # Selection searches from every landmark it picks: their rows are the tables
+        self._pool = None
+        if workers != 1 and self.k > 1:
+            self._pool = ProcessPoolExecutor(max_workers=1, initializer=_init_worker,
+                                             initargs=(self.reverse, self.nodes))
+        try:
+            if method == 'farthest':
+                self.landmarks, self.forward, self.backward = self._select_farthest(rng)
+            else:
+                self.landmarks, self.forward, self.backward = self._select_avoid(rng)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+        if cache_path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_path, 'wb') as f:
+                pickle.dump({'landmarks': self.landmarks, 'forward': self.forward,
+                             'backward': self.backward}, f)
+
+    # ------------------------------------------------------------------
+    # Landmark selection
+    # ------------------------------------------------------------------
+    def _landmark_rows(self, node):
+        """(d(node, v), d(v, node)) for every v of self.nodes, as two lists"""
+        if self._pool is None:
+            return (_distance_row(self.adjacency, self.nodes, node),
+                    _distance_row(self.reverse, self.nodes, node))
+        backward = self._pool.submit(_backward_row, node)
+        return _distance_row(self.adjacency, self.nodes, node), backward.result()
+
+    def _closest_update(self, closest, node):
+        """Lower closest to the distance from or to node; returns node's rows"""
+        forward, backward = self._landmark_rows(node)
+        for v, reach, back in zip(self.nodes, forward, backward):
+            closest[v] = min(closest[v], reach, back)
+        return forward, backward
+
+    def _select_farthest(self, rng):
+        """Returns (landmarks, forward rows, backward rows)"""
+        if not self.nodes:
+            return [], [], []
+        # The first landmark is the node farthest from a random start; nodes
+        # unreachable from everything chosen so far count as infinitely far,
+        # so every component ends up with a landmark.
+        closest = {node: float('inf') for node in self.nodes}
+        self._closest_update(closest, rng.choice(self.nodes))
+        landmarks, forward_rows, backward_rows = [], [], []
+        while len(landmarks) < self.k:
+            remaining = [n for n in self.nodes if n not in landmarks]
+            candidate = max(remaining, key=lambda n: (closest[n], -self.index[n]))
+            if not landmarks:
+                closest = {node: float('inf') for node in self.nodes}
+            landmarks.append(candidate)
+            forward, backward = self._closest_update(closest, candidate)
+            forward_rows.append(forward)
+            backward_rows.append(backward)
+        return landmarks, forward_rows, backward_rows
+
+    def _select_avoid(self, rng):
+        """Returns (landmarks, forward rows, backward rows)"""
+        landmarks = []
+        forward_rows, backward_rows = [], []
+        while len(landmarks) < self.k:
+            root = rng.choice(self.nodes)
+            distances, parents = shortest_path_tree(self.adjacency, root)
+            children = {v: [] for v in distances}
+            for v, parent in parents.items():
+                if parent is not None:
+                    children[parent].append(v)
+
+            # size(v) sums how badly the current landmarks bound d(root, w) over
+            # the subtree of v, and drops to zero once the subtree holds a landmark
+            size, has_landmark = {}, {}
+            stack = [(root, False)]
+            while stack:
+                v, expanded = stack.pop()
+                if not expanded:
+                    stack.append((v, True))
+                    stack.extend((c, False) for c in children[v])
+                    continue
+                has_landmark[v] = v in landmarks or any(has_landmark[c] for c in children[v])
+                if has_landmark[v]:
+                    size[v] = 0
+                else:
+                    weight = distances[v] - self._bound(root, v, forward_rows, backward_rows)
+                    size[v] = weight + sum(size[c] for c in children[v])
+
+            node = root
+            while True:
+                heavy = [c for c in children[node] if size[c] > 0]
+                if not heavy:
+                    break
+                node = max(heavy, key=lambda c: size[c])
+
+            if node in landmarks:
+                unused = [n for n in self.nodes if n not in landmarks]
+                if not unused:
+                    break
+                node = rng.choice(unused)
+            landmarks.append(node)
+            forward, backward = self._landmark_rows(node)
+            forward_rows.append(forward)
+            backward_rows.append(backward)
+        return landmarks, forward_rows, backward_rows
+
+    # ------------------------------------------------------------------
+    # Bounds
+    # ------------------------------------------------------------------
+    def _bound(self, v, t, forward_rows, backward_rows):
+        iv, it = self.index[v], self.index[t]
+        best = 0
+        for row in forward_rows:
+            # d(L, t) - d(L, v) <= d(v, t)
+            if row[iv] != float('inf'):
+                best = max(best, row[it] - row[iv])
+        for row in backward_rows:
+            # d(v, L) - d(t, L) <= d(v, t)
+            if row[it] != float('inf'):
+                best = max(best, row[iv] - row[it])
+        return best
+
+    def lower_bound(self, v, t):
+        """Lower bound on d(v, t); infinite when t is provably unreachable from v"""
+        return self._bound(v, t, self.forward, self.backward)
+
+
+class ALTStepByStep:
+    """A* towards a single target using landmark lower bounds (same interface as DijkstraStepByStep)"""
+
+    def __init__(self, graph, source, target, landmarks=None):
+        self.source = source
+        self.target = target
+        self.landmarks = landmarks if landmarks is not None else LandmarkTable(graph)
+
+        self.graph = build_adjacency(graph)
+        self.distances = {node: float('inf') for node in self.graph}
+        self.distances[source] = 0
+        self.predecessors = {node: None for node in self.graph}
+        self.visited = set()
+        self.queue = [(self.landmarks.lower_bound(source, target), source)]
+        self.current_node = None
+        self.finished = False
+
+    def has_next(self):
+        return not self.finished
+
+    def step_forward(self):
+        if not self.queue:
+            self.finished = True
+            self.current_node = None
+            return
+
+        _, current_node = heapq.heappop(self.queue)
+
+        if current_node in self.visited:
+            return
+
+        self.current_node = current_node
+        self.visited.add(current_node)
+        if current_node == self.target:
+            self.finished = True
+            return
+
+        current_distance = self.distances[current_node]
+        for neighbor, weight in self.graph[current_node]:
+            if neighbor in self.visited:
+                continue
+            new_distance = current_distance + weight
+            if new_distance < self.distances[neighbor]:
+                estimate = self.landmarks.lower_bound(neighbor, self.target)
+                self.distances[neighbor] = new_distance
+                self.predecessors[neighbor] = current_node
+                if estimate != float('inf'):
+                    heapq.heappush(self.queue, (new_distance + estimate, neighbor))
+
+        if not self.queue:
+            self.finished = True
+
+    def run(self):
+        while self.has_next():
+            self.step_forward()
+        return self.distances[self.target]
+
+    def get_current_state(self):
+        return {
+            'distances': dict(self.distances),
+            'visited': set(self.visited),
+            'current_node': self.current_node,
+            'predecessors': dict(self.predecessors),
+        }
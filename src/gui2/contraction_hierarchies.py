@@ -0,0 +1,256 @@
+import heapq
+import pickle
+
+from .dijkstra_algorithm import build_adjacency
+
+
+class ContractionHierarchy:
+    """
+    Contraction Hierarchies for repeated point-to-point queries on a static graph.
+
+    Preprocessing contracts nodes one by one (cheapest first by edge difference)
+    and adds shortcuts wherever a contracted node lay on the only shortest path
+    between two of its neighbours. Queries then run a bidirectional Dijkstra that
+    only ever climbs towards higher ranked nodes, which settles a handful of nodes
+    instead of the whole graph.
+    """
+
+    def __init__(self, graph=None, witness_limit=50):
+        """
+        Args:
+            graph: NetworkX DiGraph with a 'weight' attribute on every edge
+            witness_limit: maximum number of nodes settled by a witness search
+        """
+        self.witness_limit = witness_limit
+        self.rank = {}
+        # (u, v) -> (weight, middle node or None for an original edge)
+        self.edges = {}
+        self.upward = {}
+        self.downward = {}
+        if graph is not None:
+            self.preprocess(build_adjacency(graph))
+
+    # ------------------------------------------------------------------
+    # Preprocessing
+    # ------------------------------------------------------------------
+    def preprocess(self, adjacency):
+        out_edges = {u: {} for u in adjacency}
+        in_edges = {u: {} for u in adjacency}
+        for u, neighbors in adjacency.items():
+            for v, w in neighbors:
+                out_edges.setdefault(v, {})
+                in_edges.setdefault(v, {})
+                if u == v:
+                    continue
+                if v not in out_edges[u] or w < out_edges[u][v][0]:
+                    out_edges[u][v] = (w, None)
+                    in_edges[v][u] = (w, None)
+
+        self.edges = {}
+        for u, targets in out_edges.items():
+            for v, data in targets.items():
+                self.edges[(u, v)] = data
+
+        contracted_neighbors = {u: 0 for u in out_edges}
+        order = [(self._priority(v, out_edges, in_edges, contracted_neighbors), v)
+                 for v in out_edges]
+        heapq.heapify(order)
+
+        self.rank = {}
+        while order:
+            _, v = heapq.heappop(order)
+            if v in self.rank:
+                continue
+            # Lazy update: re-evaluate and requeue if v is no longer the cheapest
+            priority = self._priority(v, out_edges, in_edges, contracted_neighbors)
+            if order and priority > order[0][0]:
+                heapq.heappush(order, (priority, v))
+                continue
+            self._contract(v, out_edges, in_edges, contracted_neighbors)
+            self.rank[v] = len(self.rank)
+
+        self._build_search_graphs()
+
+    def _witness_search(self, source, excluded, max_distance, out_edges):
+        distances = {source: 0}
+        queue = [(0, source)]
+        settled = 0
+        while queue and settled < self.witness_limit:
+            dist, node = heapq.heappop(queue)
+            if dist > distances.get(node, float('inf')):
+                continue
+            if dist > max_distance:
+                break
+            settled += 1
+            for neighbor, (weight, _) in out_edges[node].items():
+                if neighbor == excluded:
+                    continue
+                new_distance = dist + weight
+                if new_distance < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = new_distance
+                    heapq.heappush(queue, (new_distance, neighbor))
+        return distances
+
+    def _shortcuts_for(self, v, out_edges, in_edges):
+        shortcuts = []
+        if not in_edges[v] or not out_edges[v]:
+            return shortcuts
+        max_out = max(w for w, _ in out_edges[v].values())
+        for u, (w_in, _) in in_edges[v].items():
+            witnesses = self._witness_search(u, v, w_in + max_out, out_edges)
+            for x, (w_out, _) in out_edges[v].items():
+                if x == u:
+                    continue
+                through_v = w_in + w_out
+                if witnesses.get(x, float('inf')) > through_v:
+                    shortcuts.append((u, x, through_v))
+        return shortcuts
+
+    def _priority(self, v, out_edges, in_edges, contracted_neighbors):
+        shortcuts = len(self._shortcuts_for(v, out_edges, in_edges))
+        edge_difference = shortcuts - len(in_edges[v]) - len(out_edges[v])
+        return edge_difference + contracted_neighbors[v]
+
+    def _contract(self, v, out_edges, in_edges, contracted_neighbors):
+        for u, x, weight in self._shortcuts_for(v, out_edges, in_edges):
+            if x not in out_edges[u] or weight < out_edges[u][x][0]:
+                out_edges[u][x] = (weight, v)
+                in_edges[x][u] = (weight, v)
+                self.edges[(u, x)] = (weight, v)
+
+        for u in in_edges[v]:
+            del out_edges[u][v]
+            contracted_neighbors[u] += 1
+        for x in out_edges[v]:
+            del in_edges[x][v]
+            contracted_neighbors[x] += 1
+        out_edges[v] = {}
+        in_edges[v] = {}
+
+    def _build_search_graphs(self):
+        self.upward = {u: [] for u in self.rank}
+        self.downward = {u: [] for u in self.rank}
+        for (u, v), (weight, _) in self.edges.items():
+            if self.rank[u] < self.rank[v]:
+                self.upward[u].append((v, weight))
+            else:
+                # Stored reversed so the backward search also climbs upwards
+                self.downward[v].append((u, weight))
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump({'rank': self.rank, 'edges': self.edges,
+                         'witness_limit': self.witness_limit}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        hierarchy = cls(witness_limit=data['witness_limit'])
+        hierarchy.rank = data['rank']
+        hierarchy.edges = data['edges']
+        hierarchy._build_search_graphs()
+        return hierarchy
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _upward_step(self, queue, distances, parents, search_graph):
+        dist, node = heapq.heappop(queue)
+        if dist > distances[node]:
+            return None
+        for neighbor, weight in search_graph[node]:
+            new_distance = dist + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                parents[neighbor] = node
+                heapq.heappush(queue, (new_distance, neighbor))
+        return node
+
+    def query(self, source, target):
+        """Return (distance, path) from source to target, or (inf, []) if unreachable"""
+        if source not in self.rank or target not in self.rank:
+            return float('inf'), []
+        if source == target:
+            return 0, [source]
+
+        forward_dist, backward_dist = {source: 0}, {target: 0}
+        forward_parent, backward_parent = {source: None}, {target: None}
+        forward_queue, backward_queue = [(0, source)], [(0, target)]
+        best, meeting = float('inf'), None
+
+        while forward_queue or backward_queue:
+            forward_min = forward_queue[0][0] if forward_queue else float('inf')
+            backward_min = backward_queue[0][0] if backward_queue else float('inf')
+            if min(forward_min, backward_min) >= best:
+                break
+            if forward_min <= backward_min:
+                node = self._upward_step(forward_queue, forward_dist,
+                                         forward_parent, self.upward)
+            else:
+                node = self._upward_step(backward_queue, backward_dist,
+                                         backward_parent, self.downward)
+            if node is None:
+                continue
+            if node in forward_dist and node in backward_dist:
+                total = forward_dist[node] + backward_dist[node]
+                if total < best:
+                    best, meeting = total, node
+
+        if meeting is None:
+            return float('inf'), []
+
+        upward_path = []
+        node = meeting
+        while node is not None:
+            upward_path.append(node)
+            node = forward_parent[node]
+        upward_path.reverse()
+        node = backward_parent[meeting]
+        while node is not None:
+            upward_path.append(node)
+            node = backward_parent[node]
+
+        path = [upward_path[0]]
+        for u, v in zip(upward_path, upward_path[1:]):
+            path.extend(self.unpack_edge(u, v)[1:])
+        return best, path
+
+    def unpack_edge(self, u, v):
+        """Expand a (possibly shortcut) edge into the original node sequence"""
+        stack = [(u, v)]
+        path = [u]
+        while stack:
+            a, b = stack.pop()
+            _, middle = self.edges[(a, b)]
+            if middle is None:
+                path.append(b)
+            else:
+                stack.append((middle, b))
+                stack.append((a, middle))
+        return path
+
+    def query_state(self, source, target):
+        """
+        Answer a query in the same shape as DijkstraStepByStep.get_current_state(),
+        so the result can be handed straight to the visualizer's display_path_info.
+        """
+        distance, path = self.query(source, target)
+        distances = {}
+        predecessors = {}
+        previous, running = None, 0
+        for node in path:
+            if previous is not None:
+                running += self.edges[(previous, node)][0]
+            distances[node] = running
+            predecessors[node] = previous
+            previous = node
+        return {
+            'distances': distances,
+            'visited': set(path),
+            'current_node': target if path else None,
+            'predecessors': predecessors,
+        }
@@ -0,0 +1,183 @@
+import time
+
+import numpy as np
+
+
+class CSRGraph:
+    """
+    Compressed sparse row storage of a weighted directed graph.
+
+    This is the graph container shared by the editor, the engines and the
+    visualizer. Out-edges of the node with index i are
+    indices[indptr[i]:indptr[i + 1]] with matching weights, and there is at
+    most one edge per (u, v) pair (parallel edges keep their minimum weight).
+    Node labels (canvas indices or user values) are kept in self.labels and
+    mapped back with self.index. NetworkX is only needed by the
+    from_networkx / to_networkx adapters.
+    """
+
+    def __init__(self, labels, indptr, indices, weights):
+        self.labels = list(labels)
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        # Integer weights stay integers so distances print as they were entered
+        self.weights = np.asarray(weights) if len(weights) else np.empty(0, dtype=np.float64)
+        self.build_seconds = None
+
+    @classmethod
+    def from_edges(cls, edge_list, nodes=()):
+        """
+        Build from [(u, v, weight), ...], keeping the minimum weight for each (u, v).
+
+        Integer node labels go through the vectorised from_arrays() path; other
+        label types (strings, mixed) fall back to a dictionary pass.
+
+        Args:
+            edge_list: iterable of (u, v, weight) tuples, or an (E, 3) array
+            nodes: extra node labels to include even if they have no edges
+        """
+        if isinstance(edge_list, np.ndarray):
+            return cls.from_arrays(edge_list[:, 0], edge_list[:, 1], edge_list[:, 2], nodes)
+        start = time.perf_counter()
+        edge_list = list(edge_list)
+        if edge_list:
+            sources, targets, weights = (np.asarray(c) for c in zip(*edge_list))
+        else:
+            sources = targets = weights = np.empty(0, dtype=np.int64)
+        extra = np.asarray(list(nodes))
+        if all(a.dtype.kind in 'iu' for a in (sources, targets)) and \
+                (len(extra) == 0 or extra.dtype.kind in 'iu'):
+            graph = cls.from_arrays(sources, targets, weights, extra)
+            graph.build_seconds = time.perf_counter() - start
+            return graph
+        return cls._from_edges_dict(edge_list, nodes)
+
+    @classmethod
+    def from_arrays(cls, sources, targets, weights, nodes=()):
+        """
+        Vectorised construction from parallel arrays of integer node labels.
+
+        np.unique builds the sorted label list and the label -> index map for
+        both endpoints at once, then one lexsort on ((u, v), w) groups parallel
+        edges with the lightest first. The elapsed time is stored in build_seconds.
+        """
+        start = time.perf_counter()
+        sources = np.asarray(sources)
+        targets = np.asarray(targets)
+        weights = np.asarray(weights)
+        edge_count = len(sources)
+        labels, inverse = np.unique(
+            np.concatenate((sources, targets, np.asarray(nodes, dtype=sources.dtype))),
+            return_inverse=True)
+        u, v = inverse[:edge_count], inverse[edge_count:2 * edge_count]
+
+        # u * n + v orders like (u, v) and makes the sort a two-key lexsort
+        order = np.lexsort((weights, u * len(labels) + v))
+        u, v, weights = u[order], v[order], weights[order]
+        keep = np.ones(edge_count, dtype=bool)
+        keep[1:] = (u[1:] != u[:-1]) | (v[1:] != v[:-1])
+        u, v, weights = u[keep], v[keep], weights[keep]
+
+        indptr = np.zeros(len(labels) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(u, minlength=len(labels)), out=indptr[1:])
+        graph = cls(labels.tolist(), indptr, v, weights)
+        graph.build_seconds = time.perf_counter() - start
+        return graph
+
+    @classmethod
+    def _from_edges_dict(cls, edge_list, nodes=()):
+        start = time.perf_counter()
+        min_edges = {}
+        for u, v, w in edge_list:
+            if (u, v) not in min_edges or w < min_edges[(u, v)]:
+                min_edges[(u, v)] = w
+
+        label_set = set(nodes)
+        for u, v in min_edges:
+            label_set.add(u)
+            label_set.add(v)
+        try:
+            labels = sorted(label_set)
+        except TypeError:
+            labels = sorted(label_set, key=repr)
+        index = {label: i for i, label in enumerate(labels)}
+
+        edges = sorted(((index[u], index[v], w) for (u, v), w in min_edges.items()),
+                       key=lambda e: (e[0], e[1]))
+        counts = np.bincount([e[0] for e in edges], minlength=len(labels))
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        graph = cls(labels, indptr, [e[1] for e in edges], [e[2] for e in edges])
+        graph.build_seconds = time.perf_counter() - start
+        return graph
+
+    @classmethod
+    def from_networkx(cls, graph):
+        labels = list(graph.nodes())
+        index = {label: i for i, label in enumerate(labels)}
+        indptr = np.zeros(len(labels) + 1, dtype=np.int64)
+        indices, weights = [], []
+        for i, u in enumerate(labels):
+            for v, d in graph[u].items():
+                indices.append(index[v])
+                weights.append(d['weight'])
+            indptr[i + 1] = len(indices)
+        return cls(labels, indptr, indices, weights)
+
+    def to_networkx(self):
+        import networkx as nx
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.labels)
+        graph.add_weighted_edges_from(self.weighted_edges())
+        return graph
+
+    def to_adjacency(self):
+        """Return {label: [(neighbor_label, weight), ...]}"""
+        return {label: self[label] for label in self.labels}
+
+    def number_of_nodes(self):
+        return len(self.labels)
+
+    def number_of_edges(self):
+        return len(self.indices)
+
+    def nodes(self):
+        return list(self.labels)
+
+    def weighted_edges(self):
+        """Yield (u, v, weight) with node labels"""
+        labels = self.labels
+        sources = np.repeat(np.arange(len(labels)), np.diff(self.indptr))
+        for u, v, w in zip(sources.tolist(), self.indices.tolist(), self.weights.tolist()):
+            yield labels[u], labels[v], w
+
+    def edge_weight(self, u, v):
+        """Weight of the edge u -> v, or None if there is no such edge"""
+        targets, weights = self.out_slice(self.index[u])
+        hits = np.flatnonzero(targets == self.index[v])
+        return weights[hits[0]].item() if len(hits) else None
+
+    def has_edge(self, u, v):
+        return u in self.index and v in self.index and self.edge_weight(u, v) is not None
+
+    def has_negative_weight(self):
+        return bool(len(self.weights)) and bool(self.weights.min() < 0)
+
+    def out_slice(self, i):
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.weights[start:end]
+
+    def __contains__(self, label):
+        return label in self.index
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, label):
+        """Adjacency list of a node as [(neighbor_label, weight), ...]"""
+        targets, weights = self.out_slice(self.index[label])
+        labels = self.labels
+        return [(labels[v], w) for v, w in zip(targets.tolist(), weights.tolist())]
@@ -1,24 +1,90 @@
 import heapq
+import time
+
+
+def build_adjacency(graph):
+    """Return {node: [(neighbor, weight), ...]} for a CSRGraph or a NetworkX DiGraph"""
+    if hasattr(graph, 'to_adjacency'):
+        return graph.to_adjacency()
+    adjacency = {}
+    for u in graph.nodes():
+        adjacency[u] = [(v, d['weight']) for v, d in graph[u].items()]
+    return adjacency
+
+
+class SearchLimits:
+    """
+    Resource budget for one search; None disables a limit.
+
+    Args:
+        max_settled: stop after settling this many nodes
+        radius: never label nodes farther than this (isochrone "within cost R")
+        time_budget: wall-clock seconds per search
+        max_queue: stop when the priority queue grows past this many entries
+
+    A search that hits a limit stops with stopped_by set to 'settled', 'time'
+    or 'queue'; its settled nodes are exact, the other labels are only upper
+    bounds. The radius is a cut-off rather than a stop: the search ends
+    normally with every node within the radius settled (stopped_by 'radius'
+    when some node was left out).
+    """
+
+    def __init__(self, max_settled=None, radius=None, time_budget=None, max_queue=None):
+        self.max_settled = max_settled
+        self.radius = radius
+        self.time_budget = time_budget
+        self.max_queue = max_queue
+
+    def deadline(self):
+        if self.time_budget is None:
+            return None
+        return time.perf_counter() + self.time_budget
+
+    def exceeded(self, settled, queue_size, deadline):
+        """Name of the first limit reached, or None"""
+        if self.max_settled is not None and settled >= self.max_settled:
+            return 'settled'
+        if self.max_queue is not None and queue_size > self.max_queue:
+            return 'queue'
+        if deadline is not None and time.perf_counter() > deadline:
+            return 'time'
+        return None
+
 
 class DijkstraStepByStep:
-    def __init__(self, graph, source):
+    def __init__(self, graph, source, limits=None):
         self.source = source
   
-        self.graph = {}
-        for u in graph.nodes():
-            self.graph[u] = [(v, d['weight']) for v, d in graph[u].items()]
-        self.distances = {node: float('inf') for node in self.graph}
+        self.graph = build_adjacency(graph)
+        self.limits = limits
+        if limits is None:
+            self.distances = {node: float('inf') for node in self.graph}
+            self.predecessors = {node: None for node in self.graph}
+        else:
+            # Bounded searches only store the nodes they reach
+            self.distances = {}
+            self.predecessors = {source: None}
         self.distances[source] = 0
-        self.predecessors = {node: None for node in self.graph}
         self.visited = set()
         self.queue = [(0, source)]
         self.current_node = None
         self.finished = False
+        self.stopped_by = None
+        # Arcs examined so far (one per out-edge of every settled node)
+        self.relaxations = 0
+        self._deadline = limits.deadline() if limits is not None else None
 
     def has_next(self):
         return not self.finished
 
     def step_forward(self):
+        if self.limits is not None and self.queue:
+            reason = self.limits.exceeded(len(self.visited), len(self.queue), self._deadline)
+            if reason is not None:
+                self.stopped_by = reason
+                self.finished = True
+                self.current_node = None
+                return
         if not self.queue:
             self.finished = True
             self.current_node = None
@@ -32,11 +98,16 @@ class DijkstraStepByStep:
         self.current_node = current_node
         self.visited.add(current_node)
 
+        radius = self.limits.radius if self.limits is not None else None
+        self.relaxations += len(self.graph[current_node])
         for neighbor, weight in self.graph[current_node]:
             if neighbor in self.visited:
                 continue
             new_distance = current_distance + weight
-            if new_distance < self.distances[neighbor]:
+            if new_distance < self.distances.get(neighbor, float('inf')):
+                if radius is not None and new_distance > radius:
+                    self.stopped_by = 'radius'
+                    continue
                 self.distances[neighbor] = new_distance
                 self.predecessors[neighbor] = current_node
                 heapq.heappush(self.queue, (new_distance, neighbor))
@@ -50,4 +121,4 @@ class DijkstraStepByStep:
             'visited': set(self.visited),
             'current_node': self.current_node,
             'predecessors': dict(self.predecessors),
-        }
\ No newline at end of file
+        }
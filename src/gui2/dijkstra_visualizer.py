@@ -1,18 +1,55 @@
+import os
+
+import numpy as np
+
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
-    QGroupBox, QFrame, QTextEdit, QSlider, QMessageBox, QInputDialog,QProgressBar,QDialog,QPlainTextEdit,QApplication
+    QGroupBox, QFrame, QTextEdit, QSlider, QMessageBox, QInputDialog,QProgressBar,QDialog,QPlainTextEdit,QApplication,
+    QFileDialog, QCheckBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QFont
 
-import networkx as nx
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
 from matplotlib import patheffects
+from matplotlib.patches import FancyArrowPatch, Circle
+
+from .engine_comparison import BASELINE, compare_engines
+from .engines import create_engine
+from .focused_renderer import FocusedRenderer
+from .isochrones import isochrones
+from .k_shortest_paths import YenKShortestPaths
+from .memory_profile import MemoryTracker, artists_footprint, deep_sizeof, engine_footprint, format_bytes
+from .state_history import StateHistory
+
+# Au-delà de ce nombre d'arcs, le rendu focalisé est activé par défaut
+SEUIL_RENDU_FOCALISE = 500
+# Au-delà de ce nombre d'arcs, le fond statique du rendu focalisé est en tuiles
+SEUIL_TUILES = 50000
+# Une couleur par itinéraire alternatif (le plus court en premier)
+COULEURS_ALTERNATIVES = ['#e15759', '#f28e2b', '#b07aa1', '#76b7b2', '#edc948',
+                         '#ff9da7', '#9c755f', '#4e79a7']
+
+
+class ComparaisonWorker(QThread):
+    """Lance compare_engines() hors du thread de l'interface"""
+
+    comparaison_prete = pyqtSignal(object)
+    comparaison_echouee = pyqtSignal(str)
+
+    def __init__(self, graphe, source, parent=None):
+        super().__init__(parent)
+        self.graphe = graphe
+        self.source = source
+
+    def run(self):
+        try:
+            self.comparaison_prete.emit(compare_engines(self.graphe, self.source))
+        except Exception as e:
+            self.comparaison_echouee.emit(str(e))
 
-from .dijkstra_algorithm import DijkstraStepByStep
 
 class DijkstraVisualisateur(QWidget):
     def __init__(self, parent=None, graphe=None, source=0):
@@ -21,7 +58,7 @@ class DijkstraVisualisateur(QWidget):
         
         Args:
             parent: Widget parent Qt
-            graphe: Objet NetworkX (DiGraph ou Graph)
+            graphe: CSRGraph (voir csr_graph.py)
             source: Nœud de départ (par défaut: 0)
         """
         super().__init__(parent)
@@ -49,6 +86,18 @@ class DijkstraVisualisateur(QWidget):
 
         self._layout_seed = 42
         self.positions = None
+        self.mode_focalise = graphe.number_of_edges() > SEUIL_RENDU_FOCALISE
+        self.rendu_focalise = None
+        self.noeud_chemin = None
+        self.chemins_alternatifs = []
+        self.isochrones = None
+        # Relecture : étape de l'historique affichée, None pour l'état courant
+        self.historique = None
+        self.etape_relue = None
+        # Pics tracemalloc par étape de traitement (inactif tant que le suivi est décoché)
+        self.memoire = MemoryTracker()
+        # Comparaison des moteurs en cours (ComparaisonWorker), None sinon
+        self.comparaison = None
         
         self.setup_ui()
         self.configurer_algorithme()
@@ -188,6 +237,18 @@ class DijkstraVisualisateur(QWidget):
         button_layout.addWidget(self.auto_button)
         
         control_layout.addLayout(button_layout)
+
+        # Relecture des étapes déjà calculées
+        history_layout = QHBoxLayout()
+        history_layout.addWidget(QLabel("Historique :"))
+        self.history_slider = QSlider(Qt.Horizontal)
+        self.history_slider.setRange(0, 0)
+        self.history_slider.valueChanged.connect(self.relire_etape)
+        history_layout.addWidget(self.history_slider)
+        self.history_label = QLabel("0 / 0")
+        self.history_label.setMinimumWidth(110)
+        history_layout.addWidget(self.history_label)
+        control_layout.addLayout(history_layout)
         
         self.reset_button = QPushButton("↻ Réinitialiser")
         self.reset_button.clicked.connect(self.reinitialiser_algorithme)
@@ -196,6 +257,42 @@ class DijkstraVisualisateur(QWidget):
         self.change_source_button = QPushButton("🎯 Changer le sommet source")
         self.change_source_button.clicked.connect(self.changer_source)
         control_layout.addWidget(self.change_source_button)
+
+        self.path_button = QPushButton("🔍 Chemin vers un nœud")
+        self.path_button.clicked.connect(self.demander_chemin)
+        control_layout.addWidget(self.path_button)
+
+        self.alternatives_button = QPushButton("🛣 Itinéraires alternatifs")
+        self.alternatives_button.clicked.connect(self.calculer_alternatives)
+        control_layout.addWidget(self.alternatives_button)
+
+        self.isochrones_button = QPushButton("🌐 Isochrones")
+        self.isochrones_button.clicked.connect(self.calculer_isochrones)
+        control_layout.addWidget(self.isochrones_button)
+
+        self.compare_button = QPushButton("⚖ Comparer les moteurs")
+        self.compare_button.setToolTip(
+            "Exécute tous les moteurs depuis la source en parallèle et vérifie leurs distances")
+        self.compare_button.clicked.connect(self.comparer_moteurs)
+        control_layout.addWidget(self.compare_button)
+
+        self.focus_checkbox = QCheckBox("Rendu focalisé (grands graphes)")
+        self.focus_checkbox.setToolTip(
+            "Dessine le graphe une seule fois, puis seulement les nœuds traités et l'arbre")
+        self.focus_checkbox.setChecked(self.mode_focalise)
+        self.focus_checkbox.toggled.connect(self.basculer_rendu_focalise)
+        control_layout.addWidget(self.focus_checkbox)
+
+        memory_layout = QHBoxLayout()
+        self.memory_checkbox = QCheckBox("Suivi mémoire (tracemalloc)")
+        self.memory_checkbox.setToolTip(
+            "Mesure le pic d'allocation de chaque étape de traitement (ralentit l'exécution)")
+        self.memory_checkbox.toggled.connect(self.basculer_suivi_memoire)
+        memory_layout.addWidget(self.memory_checkbox)
+        self.memory_button = QPushButton("📊 Mémoire")
+        self.memory_button.clicked.connect(self.afficher_memoire)
+        memory_layout.addWidget(self.memory_button)
+        control_layout.addLayout(memory_layout)
         
         control_group.setLayout(control_layout)
         left_panel.addWidget(control_group)
@@ -297,15 +394,36 @@ class DijkstraVisualisateur(QWidget):
         
     def configurer_algorithme(self):
         """Initialise l'algorithme avec le graphe et la source fournis"""
-        self.algorithme = DijkstraStepByStep(self.graphe_initial, source=self.source_initial)
+        with self.memoire.stage("création du moteur"):
+            self.algorithme = create_engine(self.graphe_initial, source=self.source_initial)
+        with self.memoire.stage("historique des états"):
+            self.historique = StateHistory(self.graphe_initial.nodes())
+            self.historique.record(self.algorithme)
+        self.etape_relue = None
+        self.mettre_a_jour_historique()
         self.auto_etape = False
         self.id_auto_etape = None
-        self.arbre_couvrant_minimal = nx.DiGraph()  # Pour stocker l'arbre couvrant minimal
-        self.dessiner_graphe()
+        # Arbre des plus courts chemins : {nœud: (prédécesseur, poids)}
+        self.arbre_couvrant_minimal = {}
+        self.noeud_chemin = None
+        self.chemins_alternatifs = []
+        # Nouvelle source : le fond statique doit être redessiné
+        self.abandonner_rendu_focalise()
+        with self.memoire.stage("dessin"):
+            self.dessiner_graphe()
         
     def etape_suivante(self):
         if self.algorithme.has_next():
-            self.algorithme.step_forward()
+            with self.memoire.stage("étape de l'algorithme"):
+                self.algorithme.step_forward()
+            with self.memoire.stage("historique des états"):
+                self.historique.record(self.algorithme)
+            if self.etape_relue is not None:
+                # Retour de relecture : le rendu focalisé repart de l'état courant
+                self.etape_relue = None
+                if self.rendu_focalise is not None:
+                    self.rendu_focalise.synchroniser(self.etat_affiche(), self.arbre_couvrant_minimal)
+            self.mettre_a_jour_historique()
             
             # Update spanning tree
             etat = self.algorithme.get_current_state()
@@ -313,23 +431,35 @@ class DijkstraVisualisateur(QWidget):
             predecesseur = etat['predecessors'].get(noeud_courant)
             
             if predecesseur is not None and noeud_courant is not None:
-                if not self.arbre_couvrant_minimal.has_edge(predecesseur, noeud_courant):
-                    poids = next(d['weight'] for u, v, d in self.graphe_initial.edges(data=True) 
-                            if u == predecesseur and v == noeud_courant)
-                    self.arbre_couvrant_minimal.add_edge(predecesseur, noeud_courant, weight=poids)
+                # Avec des poids négatifs un nœud peut changer de prédécesseur :
+                # l'entrée est simplement remplacée
+                poids = self.graphe_initial.edge_weight(predecesseur, noeud_courant)
+                self.arbre_couvrant_minimal[noeud_courant] = (predecesseur, poids)
             
             # Update progress
-            total_nodes = len(self.graphe_initial.nodes())
+            total_nodes = self.graphe_initial.number_of_nodes()
             visited_nodes = len(etat['visited'])
             progress = int((visited_nodes / total_nodes) * 100)
             self.progress_bar.setValue(progress)
             
             self.mettre_a_jour_statut()
-            self.dessiner_graphe()
+            with self.memoire.stage("dessin"):
+                self.dessiner_graphe()
             
             if not self.algorithme.has_next():
-                self.status_banner.setText("Algorithme terminé !")
-                self.status_banner.setStyleSheet("""
+                cycle = getattr(self.algorithme, 'negative_cycle', None)
+                if cycle is not None:
+                    self.status_banner.setText(
+                        "Cycle absorbant : " + " → ".join(map(str, cycle)))
+                    self.status_banner.setStyleSheet(f"""
+                        background-color: {self.couleur_surlignage};
+                        color: white;
+                        padding: 8px;
+                        border-radius: 4px;
+                    """)
+                else:
+                    self.status_banner.setText("Algorithme terminé !")
+                    self.status_banner.setStyleSheet("""
                     background-color: #59a14f;
                     color: white;
                     padding: 8px;
@@ -417,8 +547,45 @@ class DijkstraVisualisateur(QWidget):
         if event.timerId() == self.id_auto_etape:
             self.boucle_auto_etape()
             
+    def mettre_a_jour_historique(self):
+        """Recale le curseur d'historique sur la dernière étape"""
+        derniere = len(self.historique) - 1
+        self.history_slider.blockSignals(True)
+        self.history_slider.setRange(0, derniere)
+        self.history_slider.setValue(derniere)
+        self.history_slider.blockSignals(False)
+        self.history_label.setText(f"{derniere} / {derniere} ({self.historique.nbytes / 1024:.0f} Ko)")
+
+    def relire_etape(self, etape):
+        """Affiche une étape passée ; la dernière revient à l'état courant"""
+        derniere = len(self.historique) - 1
+        self.etape_relue = None if etape >= derniere else etape
+        self.history_label.setText(f"{etape} / {derniere} ({self.historique.nbytes / 1024:.0f} Ko)")
+        if self.rendu_focalise is not None:
+            self.rendu_focalise.synchroniser(self.etat_affiche(), self.arbre_affiche())
+        self.mettre_a_jour_statut()
+        self.dessiner_graphe()
+
+    def etat_affiche(self):
+        """État de l'étape relue, ou état courant de l'algorithme"""
+        if self.etape_relue is None:
+            return self.algorithme.get_current_state()
+        return self.historique[self.etape_relue].to_state(self.historique.labels)
+
+    def arbre_affiche(self):
+        """Arbre des plus courts chemins de l'étape affichée : {nœud: (prédécesseur, poids)}"""
+        if self.etape_relue is None:
+            return self.arbre_couvrant_minimal
+        etat = self.historique[self.etape_relue]
+        labels = self.historique.labels
+        arbre = {}
+        for i in np.flatnonzero(etat.visited_mask() & (etat.predecessors >= 0)).tolist():
+            u, v = labels[etat.predecessors[i]], labels[i]
+            arbre[v] = (u, self.graphe_initial.edge_weight(u, v))
+        return arbre
+
     def mettre_a_jour_statut(self):
-        etat = self.algorithme.get_current_state()
+        etat = self.etat_affiche()
         
         # Mettre à jour l'affichage du nœud courant
         courant = etat['current_node']
@@ -443,8 +610,8 @@ class DijkstraVisualisateur(QWidget):
         self.visited_display.clear()
         self.visited_display.setPlainText(', '.join(map(str, visites))) if visites else "Aucun"
         
-        # Mettre à jour l'affichage de la file de priorité
-        file = [(d, n) for d, n in self.algorithme.queue]
+        # Mettre à jour l'affichage de la file de priorité (non conservée dans l'historique)
+        file = [(d, n) for d, n in self.algorithme.queue] if self.etape_relue is None else []
         self.queue_display.clear()
         if file:
             for d, n in sorted(file):
@@ -462,15 +629,252 @@ class DijkstraVisualisateur(QWidget):
         self.final_dist_display.setPlainText('\n'.join(lines))
         # --- Fin nouvelle section ---
             
-    def dessiner_graphe(self, force_new_layout=False):
-        self.axes.clear()
+    def basculer_rendu_focalise(self, actif):
+        self.mode_focalise = actif
+        self.abandonner_rendu_focalise()
+        self.dessiner_graphe()
+
+    def abandonner_rendu_focalise(self):
+        if self.rendu_focalise is not None:
+            self.rendu_focalise.fermer()
+            self.rendu_focalise = None
+
+    def dessiner_graphe_focalise(self, etat):
+        """Rendu des grands graphes : fond statique mis en cache, surcouches par étape"""
+        if self.rendu_focalise is None:
+            coordonnees = getattr(self.graphe_initial, 'coordinates', None)
+            if coordonnees is not None:
+                positions = dict(zip(self.graphe_initial.labels, coordonnees))
+            else:
+                positions = self.positions
+            self.rendu_focalise = FocusedRenderer(
+                self.figure, self.axes, self.canvas, self.graphe_initial, positions, {
+                    'arete': self.couleur_arete,
+                    'noeud': self.couleur_noeud_non_visite,
+                    'visite': self.couleur_noeud_visite,
+                    'courant': self.couleur_noeud_courant,
+                    'source': self.couleur_noeud_source,
+                    'arbre': self.couleur_succes,
+                    'chemin': self.couleur_arete_surlignee,
+                    'fond': self.couleur_fond,
+                }, tuiles=self.graphe_initial.number_of_edges() > SEUIL_TUILES)
+            self.rendu_focalise.dessiner_fond(
+                self.source_initial, "Visualisation de l'Algorithme de Dijkstra (rendu focalisé)")
+            self.rendu_focalise.synchroniser(etat, self.arbre_affiche())
+        self.rendu_focalise.mettre_a_jour(etat, self.arbre_affiche())
+        if self.noeud_chemin is not None:
+            self.rendu_focalise.afficher_chemin(self.noeud_chemin, etat['predecessors'])
+        if self.isochrones is not None:
+            self.rendu_focalise.afficher_isochrones(*self.zones_isochrones())
+        if self.chemins_alternatifs:
+            self.rendu_focalise.afficher_alternatives(
+                [chemin for _, chemin in self.chemins_alternatifs], COULEURS_ALTERNATIVES)
+
+    def demander_chemin(self):
+        """Surligne le chemin actuel de la source vers un nœud choisi"""
+        texte, ok = QInputDialog.getText(self, "Chemin vers un nœud", "Nœud de destination :")
+        if not ok or not texte.strip():
+            return
+        texte = texte.strip()
+        noeud = int(texte) if texte.lstrip('-').isdigit() else texte
+        if noeud not in self.graphe_initial:
+            QMessageBox.warning(self, "Erreur", f"Le nœud {texte} n'existe pas.")
+            return
+        etat = self.algorithme.get_current_state()
+        if etat['distances'].get(noeud, float('inf')) == float('inf'):
+            QMessageBox.information(self, "Chemin", f"Le nœud {noeud} n'est pas encore atteint.")
+            return
+        self.noeud_chemin = noeud
+        self.dessiner_graphe()
+
+    def calculer_alternatives(self):
+        """Les k plus courts chemins sans boucle (Yen) de la source vers un nœud"""
+        texte, ok = QInputDialog.getText(self, "Itinéraires alternatifs", "Nœud de destination :")
+        if not ok or not texte.strip():
+            return
+        texte = texte.strip()
+        cible = int(texte) if texte.lstrip('-').isdigit() else texte
+        if cible not in self.graphe_initial:
+            QMessageBox.warning(self, "Erreur", f"Le nœud {texte} n'existe pas.")
+            return
+        k, ok = QInputDialog.getInt(self, "Itinéraires alternatifs", "Nombre d'itinéraires (k) :",
+                                    value=3, min=1, max=len(COULEURS_ALTERNATIVES))
+        if not ok:
+            return
+        try:
+            with YenKShortestPaths(self.graphe_initial, self.source_initial, cible) as yen:
+                self.chemins_alternatifs = yen.paths(k)
+        except ValueError as e:
+            QMessageBox.warning(self, "Erreur", str(e))
+            return
+        if not self.chemins_alternatifs:
+            QMessageBox.information(self, "Itinéraires alternatifs",
+                                    f"Le nœud {cible} n'est pas accessible depuis la source.")
+            return
+        self.dessiner_graphe()
+        self.status_banner.setText(" | ".join(
+            f"#{rang} : {cout}" for rang, (cout, _) in enumerate(self.chemins_alternatifs, 1)))
+
+    def calculer_isochrones(self):
+        """Nœuds à coût au plus R de plusieurs sources, colorés par source la plus proche"""
+        texte, ok = QInputDialog.getText(self, "Isochrones", "Sources (séparées par des virgules) :",
+                                         text=str(self.source_initial))
+        if not ok or not texte.strip():
+            return
+        sources = []
+        for morceau in texte.split(','):
+            morceau = morceau.strip()
+            noeud = int(morceau) if morceau.lstrip('-').isdigit() else morceau
+            if noeud not in self.graphe_initial:
+                QMessageBox.warning(self, "Erreur", f"Le nœud {morceau} n'existe pas.")
+                return
+            sources.append(noeud)
+        rayon, ok = QInputDialog.getDouble(self, "Isochrones", "Coût maximal R :",
+                                           value=10.0, min=0.0, max=1e12, decimals=2)
+        if not ok:
+            return
+        try:
+            self.isochrones = isochrones(self.graphe_initial, sources, rayon)
+        except ValueError as e:
+            QMessageBox.warning(self, "Erreur", str(e))
+            return
+        self.dessiner_graphe()
+        self.status_banner.setText(f"Isochrones R = {rayon:g} : " + " | ".join(
+            f"{source} → {nombre} nœud(s)"
+            for source, nombre in zip(self.isochrones.sources, self.isochrones.counts().tolist())))
+
+    def comparer_moteurs(self):
+        """
+        Course de tous les moteurs sur le graphe et la source courants, chacun
+        dans son processus. La course est suivie depuis un ComparaisonWorker :
+        l'interface reste utilisable et le rapport s'affiche à son arrivée.
+        """
+        if self.comparaison is not None:
+            return
+        worker = ComparaisonWorker(self.graphe_initial, self.source_initial, self)
+        self.comparaison = worker
+        worker.comparaison_prete.connect(
+            lambda rapport: self.afficher_comparaison(worker.source, rapport))
+        worker.comparaison_echouee.connect(
+            lambda message: QMessageBox.warning(self, "Erreur", message))
+        worker.finished.connect(self.fin_comparaison)
+        self.compare_button.setEnabled(False)
+        self.compare_button.setText("⚖ Comparaison en cours…")
+        worker.start()
+
+    def fin_comparaison(self):
+        self.comparaison.deleteLater()
+        self.comparaison = None
+        self.compare_button.setEnabled(True)
+        self.compare_button.setText("⚖ Comparer les moteurs")
+
+    def afficher_comparaison(self, source, rapport):
+        """Rapport de compare_engines() dans une boîte de dialogue"""
+        lignes = [f"Source : {source}", "",
+                  f"{'moteur':<16}{'temps (s)':>10}{'traités':>10}{'relâchements':>14}{'mémoire max':>13}  résultat",
+                  "-" * 75]
+        for stats in rapport:
+            if 'error' in stats:
+                lignes.append(f"{stats['engine']:<16}  échec : {stats['error']}")
+                continue
+            if stats['engine'] == BASELINE:
+                verdict = "référence"
+            elif stats['matches']:
+                verdict = "identique"
+            else:
+                verdict = f"ÉCART sur {stats['mismatches']} nœud(s), max {stats['max_error']:g}"
+            memoire = (f"{stats['peak_memory'] / 2 ** 20:.1f} Mo"
+                       if stats['peak_memory'] is not None else "n/d")
+            relachements = stats['relaxations'] if stats['relaxations'] is not None else "n/d"
+            lignes.append(f"{stats['engine']:<16}{stats['seconds']:>10.3f}{stats['settled']:>10}"
+                          f"{relachements:>14}{memoire:>13}  {verdict}")
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Comparaison des moteurs")
+        dialog.setMinimumWidth(720)
+        layout = QVBoxLayout(dialog)
+        texte = QPlainTextEdit("\n".join(lignes))
+        texte.setReadOnly(True)
+        texte.setFont(QFont("Consolas", 10))
+        layout.addWidget(texte)
+        close_button = QPushButton("❌ Fermer")
+        close_button.clicked.connect(dialog.close)
+        layout.addWidget(close_button)
+        dialog.exec_()
+
+    def basculer_suivi_memoire(self, actif):
+        if actif:
+            self.memoire.reset()
+            self.memoire.start()
+        else:
+            self.memoire.stop()
+
+    def afficher_memoire(self):
+        """Tailles estimées des structures et pics mémoire par étape de traitement"""
+        def taille(octets):
+            return format_bytes(octets, ('o', 'Ko', 'Mo', 'Go'))
+
+        noms = {'graph copy': "copie du graphe", 'distances': "distances",
+                'predecessors': "prédécesseurs", 'visited': "nœuds visités",
+                'queue': "file de priorité"}
+        lignes = ["Tailles estimées des structures :",
+                  f"  {'graphe (' + type(self.graphe_initial).__name__ + ')':<32}"
+                  f"{taille(deep_sizeof(self.graphe_initial)):>12}"]
+        for partie, octets in engine_footprint(self.algorithme, self.graphe_initial).items():
+            lignes.append(f"  {'moteur : ' + noms.get(partie, partie):<32}{taille(octets):>12}")
+        lignes.append(f"  {'historique des états':<32}{taille(self.historique.nbytes):>12}")
+        if self.positions is not None:
+            lignes.append(f"  {'positions des nœuds':<32}{taille(deep_sizeof(self.positions)):>12}")
+        rendu = self.rendu_focalise
+        if rendu is not None:
+            tampons = sum(a.nbytes for a in (rendu.xy, rendu.traites, rendu.ordre_traites,
+                                             rendu.segments_arbre, rendu.dans_arbre))
+            lignes.append(f"  {'rendu focalisé : tampons':<32}{taille(tampons):>12}")
+            if rendu.fond_tuile is not None:
+                lignes.append(f"  {'rendu focalisé : tuiles':<32}"
+                              f"{taille(rendu.fond_tuile.cache.octets()):>12}")
+        lignes.append(f"  {'artistes matplotlib (données)':<32}{taille(artists_footprint(self.figure)):>12}")
+
+        lignes += ["", "Pics tracemalloc par étape (appels, pic max, croissance cumulée) :"]
+        if not self.memoire.stages:
+            lignes.append("  aucun : cochez « Suivi mémoire » puis relancez le parcours")
+        for nom, (appels, pic, croissance) in self.memoire.stages.items():
+            lignes.append(f"  {nom:<26}{appels:>6}{taille(pic):>12}{taille(croissance):>12}")
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Mémoire")
+        dialog.setMinimumWidth(560)
+        layout = QVBoxLayout(dialog)
+        texte = QPlainTextEdit("\n".join(lignes))
+        texte.setReadOnly(True)
+        texte.setFont(QFont("Consolas", 10))
+        layout.addWidget(texte)
+        close_button = QPushButton("❌ Fermer")
+        close_button.clicked.connect(dialog.close)
+        layout.addWidget(close_button)
+        dialog.exec_()
+
+    def zones_isochrones(self):
+        """(labels des nœuds couverts, couleur de leur source la plus proche)"""
+        plus_proche = self.isochrones.nearest_source()
+        couverts = np.flatnonzero(plus_proche >= 0)
+        labels = self.isochrones.graph.labels
+        return ([labels[i] for i in couverts.tolist()],
+                [COULEURS_ALTERNATIVES[r % len(COULEURS_ALTERNATIVES)]
+                 for r in plus_proche[couverts].tolist()])
 
+    def dessiner_graphe(self, force_new_layout=False):
         # Calculer ou réutiliser la disposition des nœuds
         if force_new_layout or self.positions is None:
             self.positions = self.calculate_optimal_layout(force_new_seed=force_new_layout)
         positions = self.positions
 
-        etat = self.algorithme.get_current_state()
+        etat = self.etat_affiche()
+        if self.mode_focalise:
+            self.dessiner_graphe_focalise(etat)
+            return
+
+        self.axes.clear()
 
         # Style des nœuds
         couleurs_noeuds = []
@@ -490,16 +894,33 @@ class DijkstraVisualisateur(QWidget):
                 tailles_noeuds.append(600)
 
         # Dessiner les arêtes avec évitement de chevauchement
+        self.tailles_noeuds = dict(zip(self.graphe_initial.nodes(), tailles_noeuds))
         self.draw_edges_with_avoidance(positions, etat)
 
+        # Halo des isochrones, sous les nœuds
+        if self.isochrones is not None:
+            couverts, teintes = self.zones_isochrones()
+            self.axes.scatter(
+                [positions[n][0] for n in couverts],
+                [positions[n][1] for n in couverts],
+                c=teintes,
+                s=[self.tailles_noeuds[n] + 900 for n in couverts],
+                alpha=0.35,
+                linewidths=0,
+                zorder=1.5
+            )
+
         # Dessiner les nœuds
-        nx.draw_networkx_nodes(
-            self.graphe_initial, positions, ax=self.axes,
-            node_color=couleurs_noeuds,
-            node_size=tailles_noeuds,
+        noeuds = self.graphe_initial.nodes()
+        self.axes.scatter(
+            [positions[n][0] for n in noeuds],
+            [positions[n][1] for n in noeuds],
+            c=couleurs_noeuds,
+            s=tailles_noeuds,
             edgecolors='#333333',
             linewidths=1.5,
-            alpha=0.9
+            alpha=0.9,
+            zorder=2
         )
 
         # Dessiner les étiquettes des arêtes avec placement amélioré
@@ -616,44 +1037,71 @@ class DijkstraVisualisateur(QWidget):
                 scale * 2 * (pos[node][1] - min_y) / y_range - scale + padding/2
             )
 
+    def draw_edge_list(self, pos, edges, color, width, arrowsize, alpha):
+        """Dessine des arcs orientés (u, v) avec des flèches s'arrêtant au bord des nœuds"""
+        for u, v in edges:
+            (x1, y1), (x2, y2) = pos[u], pos[v]
+            if u == v:
+                # Boucle : petit cercle au-dessus du nœud
+                self.axes.add_patch(Circle(
+                    (x1, y1 + 0.06), 0.05, fill=False,
+                    edgecolor=color, linewidth=width, alpha=alpha, zorder=1))
+                continue
+            # Rayon du marqueur en points (la taille scatter est une aire)
+            self.axes.add_patch(FancyArrowPatch(
+                (x1, y1), (x2, y2),
+                arrowstyle='-|>',
+                mutation_scale=arrowsize,
+                color=color,
+                linewidth=width,
+                alpha=alpha,
+                shrinkA=self.tailles_noeuds.get(u, 600) ** 0.5 / 2,
+                shrinkB=self.tailles_noeuds.get(v, 600) ** 0.5 / 2,
+                connectionstyle='arc3,rad=0',  # <-- lignes droites
+                zorder=1
+            ))
+
     def draw_edges_with_avoidance(self, pos, state):
-        nx.draw_networkx_edges(
-            self.graphe_initial, pos, ax=self.axes,
-            edge_color=self.couleur_arete,
-            width=1.5,
-            arrows=True,
-            arrowsize=30,
-            alpha=1,
-            connectionstyle='arc3,rad=0'  # <-- lignes droites
+        self.draw_edge_list(
+            pos, [(u, v) for u, v, _ in self.graphe_initial.weighted_edges()],
+            color=self.couleur_arete, width=1.5, arrowsize=30, alpha=1
         )
         # Highlight current edges only if the algorithm is not finished
         if state['current_node'] is not None and self.algorithme.has_next():
             current_edges = [(state['current_node'], v) for v, _ in self.algorithme.graph[state['current_node']]]
-            nx.draw_networkx_edges(
-                self.graphe_initial, pos, ax=self.axes,
-                edgelist=current_edges,
-                edge_color=self.couleur_arete_surlignee,
-                width=3.0,
-                arrows=True,
-                arrowsize=35,
-                alpha=0.8,
-                connectionstyle='arc3,rad=0'  # <-- lignes droites
+            self.draw_edge_list(
+                pos, current_edges,
+                color=self.couleur_arete_surlignee, width=3.0, arrowsize=35, alpha=0.8
             )
         # Always show the minimum spanning tree in green
-        if self.arbre_couvrant_minimal.number_of_edges() > 0:
-            nx.draw_networkx_edges(
-                self.arbre_couvrant_minimal, pos, ax=self.axes,
-                edge_color=self.couleur_succes,
-                width=3.5,
-                arrows=True,
-                arrowsize=35,
-                alpha=0.8,
-                connectionstyle='arc3,rad=0'  # <-- lignes droites
+        arbre = self.arbre_affiche()
+        if arbre:
+            self.draw_edge_list(
+                pos, [(u, v) for v, (u, _) in arbre.items()],
+                color=self.couleur_succes, width=3.5, arrowsize=35, alpha=0.8
+            )
+        # Itinéraires alternatifs, le plus court dessiné en dernier (au-dessus)
+        for (_, chemin), couleur in reversed(list(zip(self.chemins_alternatifs, COULEURS_ALTERNATIVES))):
+            self.draw_edge_list(
+                pos, list(zip(chemin, chemin[1:])),
+                color=couleur, width=4.0, arrowsize=30, alpha=0.75
+            )
+        # Chemin demandé avec « Chemin vers un nœud »
+        if self.noeud_chemin is not None:
+            chemin, vus, noeud = [], set(), self.noeud_chemin
+            while noeud is not None and noeud not in vus:
+                vus.add(noeud)
+                chemin.append(noeud)
+                noeud = state['predecessors'].get(noeud)
+            chemin.reverse()
+            self.draw_edge_list(
+                pos, list(zip(chemin, chemin[1:])),
+                color=self.couleur_arete_surlignee, width=5.0, arrowsize=35, alpha=0.9
             )
 
     def draw_edge_labels(self, pos):
         """Affiche les poids directement sur les arêtes (arcs), bien centrés et superposés à l'arc"""
-        edge_labels = {(u, v): f"{d['weight']}" for u, v, d in self.graphe_initial.edges(data=True)}
+        edge_labels = {(u, v): f"{w}" for u, v, w in self.graphe_initial.weighted_edges()}
         for edge, label in edge_labels.items():
             x1, y1 = pos[edge[0]]
             x2, y2 = pos[edge[1]]
@@ -685,21 +1133,26 @@ class DijkstraVisualisateur(QWidget):
             dist = state['distances'].get(node, float('inf'))
             text_dist = f"{dist:.0f}" if dist < float('inf') else "∞"
             node_labels[node] = f"{node}\n(d={text_dist})"
-        textes = nx.draw_networkx_labels(
-            self.graphe_initial, pos, labels=node_labels,
-            ax=self.axes, font_size=10,
-            font_color=self.couleur_texte,
-            font_weight='bold'
-        )
-        for _, text in textes.items():
-            text.set_path_effects([
-                patheffects.withStroke(linewidth=3, foreground='white')
-            ])
+        for node, label in node_labels.items():
+            x, y = pos[node]
+            self.axes.text(
+                x, y, label,
+                fontsize=10,
+                color=self.couleur_texte,
+                fontweight='bold',
+                ha='center',
+                va='center',
+                zorder=11,
+                path_effects=[patheffects.withStroke(linewidth=3, foreground='white')]
+            )
 
     def display_path_info(self, state):
         path = []
+        vus = set()
         node = state['current_node']
-        while node is not None:
+        # Un cycle absorbant peut boucler la chaîne des prédécesseurs
+        while node is not None and node not in vus:
+            vus.add(node)
             path.append(node)
             node = state['predecessors'].get(node)
         path.reverse()
@@ -740,7 +1193,14 @@ class DijkstraVisualisateur(QWidget):
     def closeEvent(self, event):
         if self.auto_etape and self.id_auto_etape:
             self.killTimer(self.id_auto_etape)
-        plt.close('all')
+        self.abandonner_rendu_focalise()
+        if self.comparaison is not None:
+            # Le thread appartient à la fenêtre : attendre la fin des processus
+            self.comparaison.comparaison_prete.disconnect()
+            self.comparaison.comparaison_echouee.disconnect()
+            self.comparaison.wait()
+        self.memoire.stop()
+        self.figure.clear()
         event.accept()
 
     def exporter_structure(self):
@@ -752,7 +1212,7 @@ class DijkstraVisualisateur(QWidget):
         etat = self.algorithme.get_current_state()
         
         # Get edges from the minimum spanning tree
-        edges = [(u, v, d['weight']) for u, v, d in self.arbre_couvrant_minimal.edges(data=True)]
+        edges = [(u, v, weight) for v, (u, weight) in self.arbre_couvrant_minimal.items()]
         edges.sort()  # Sort for consistent output
         
         # Format as Python code
@@ -767,6 +1227,10 @@ class DijkstraVisualisateur(QWidget):
                                     for node, dist in sorted(distances.items()))
         
         complete_output = formatted_edges + formatted_distances
+        if self.chemins_alternatifs:
+            complete_output += "\n\nItinéraires alternatifs (Yen):\n" + "\n".join(
+                f"  #{rang} coût {cout}: " + " → ".join(map(str, chemin))
+                for rang, (cout, chemin) in enumerate(self.chemins_alternatifs, 1))
         
         # Create the export dialog
         dialog = QDialog(self)
@@ -827,13 +1291,39 @@ class DijkstraVisualisateur(QWidget):
         """)
         copy_button.clicked.connect(lambda: QApplication.clipboard().setText(complete_output))
         
+        save_button = QPushButton("💾 Enregistrer")
+        save_button.setStyleSheet("padding: 6px 12px;")
+        save_button.clicked.connect(self.enregistrer_resultats)
+
         close_button = QPushButton("❌ Fermer")
         close_button.setStyleSheet("padding: 8px 16px; font-size: 13px;")
         close_button.clicked.connect(dialog.close)
         
         button_box.addWidget(copy_button)
+        button_box.addWidget(save_button)
         button_box.addStretch()
         button_box.addWidget(close_button)
         layout.addLayout(button_box)
         
-        dialog.exec_()
\ No newline at end of file
+        dialog.exec_()
+
+    def enregistrer_resultats(self):
+        """Écrit les distances et prédécesseurs courants dans un fichier CSV, NPY ou Parquet"""
+        chemin, _ = QFileDialog.getSaveFileName(
+            self, "Enregistrer les distances", "distances.csv",
+            "CSV (*.csv);;NumPy (*.npy);;Parquet (*.parquet)"
+        )
+        if not chemin:
+            return
+
+        from .result_writers import RowWriter, distance_row, predecessor_row
+        base, extension = os.path.splitext(chemin)
+        labels = self.graphe_initial.labels
+        try:
+            with RowWriter(chemin, labels, rows=1, column='distance') as writer:
+                writer.write(self.source_initial, distance_row(self.graphe_initial, self.algorithme))
+            with RowWriter(base + '_predecessors' + extension, labels, 'int64', rows=1,
+                           column='predecessor') as writer:
+                writer.write(self.source_initial, predecessor_row(self.graphe_initial, self.algorithme))
+        except (ImportError, ValueError, OSError) as e:
+            QMessageBox.critical(self, "Erreur", f"Échec de l'enregistrement :\n{str(e)}")
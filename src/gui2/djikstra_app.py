@@ -1,26 +1,21 @@
 # djikstra_app.py
-import networkx as nx
+from .csr_graph import CSRGraph
 from .dijkstra_visualizer import DijkstraVisualisateur
 
 class DijkstraApp:
-    def __init__(self, edge_list, source, parent=None):
+    def __init__(self, graph, source, parent=None):
         """
         Initialize without creating QApplication
 
         Args:
-            edge_list: list of (u, v, weight) tuples
+            graph: CSRGraph, or a list of (u, v, weight) tuples
+                   (parallel edges keep their minimum weight)
             source: node label (int or str)
             parent: Parent QWidget
         """
-        # Keep only the minimum weight for each (u, v)
-        min_edges = {}
-        for u, v, w in edge_list:
-            if (u, v) not in min_edges or w < min_edges[(u, v)]:
-                min_edges[(u, v)] = w
-
-        self.graph = nx.DiGraph()
-        for (u, v), w in min_edges.items():
-            self.graph.add_edge(u, v, weight=w)
+        if not isinstance(graph, CSRGraph):
+            graph = CSRGraph.from_edges(graph)
+        self.graph = graph
         self.source = source
         self.parent = parent
 
@@ -31,4 +26,4 @@ class DijkstraApp:
             source=self.source,
             parent=self.parent  # Pass the parent
         )
-        self.visualizer.show()
\ No newline at end of file
+        self.visualizer.show()
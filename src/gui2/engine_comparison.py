@@ -0,0 +1,157 @@
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+
+from .engines import ENGINES, create_engine
+from .result_writers import distance_row, settled_row
+
+try:
+    import resource
+except ImportError:  # Windows: no peak memory figures
+    resource = None
+
+# Every engine is checked against this one
+BASELINE = 'dijkstra'
+
+
+def _peak_rss():
+    """Peak resident set size of this process in bytes, None when unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_engine(graph, source, engine):
+    """
+    Run one engine to the end in this process and measure it.
+
+    Returns (stats, distances): stats is a dict with the engine name, wall
+    seconds (construction included), steps, settled nodes, arcs relaxed and
+    the growth of the peak resident memory during the run; distances is the
+    row aligned with graph.labels.
+    """
+    baseline = _peak_rss()
+    start = time.perf_counter()
+    runner = create_engine(graph, source, engine)
+    steps = 0
+    while runner.has_next():
+        runner.step_forward()
+        steps += 1
+    seconds = time.perf_counter() - start
+    peak = _peak_rss()
+    if hasattr(runner, 'close'):
+        runner.close()
+    stats = {
+        'engine': engine,
+        'seconds': seconds,
+        'steps': steps,
+        'settled': int(settled_row(graph, runner).sum()),
+        'relaxations': getattr(runner, 'relaxations', None),
+        'peak_memory': peak - baseline if peak is not None else None,
+    }
+    return stats, distance_row(graph, runner)
+
+
+def _race(connection, graph, source, engine):
+    try:
+        connection.send(('ok',) + run_engine(graph, source, engine))
+    except Exception as e:
+        connection.send(('error', {'engine': engine, 'error': f"{type(e).__name__}: {e}"}, None))
+    finally:
+        connection.close()
+
+
+def _run_parallel(graph, source, engines, workers):
+    """
+    One fresh process per engine, at most `workers` at a time. A fresh
+    process (rather than a pool worker) keeps each peak memory figure to a
+    single run; the processes are not daemonic, so parallel-delta can still
+    start its own pool.
+    """
+    results = {}
+    for start in range(0, len(engines), workers):
+        batch = []
+        for engine in engines[start:start + workers]:
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_race, args=(sender, graph, source, engine))
+            process.start()
+            sender.close()
+            batch.append((engine, receiver, process))
+        for engine, receiver, process in batch:
+            try:
+                results[engine] = receiver.recv()
+            except EOFError:
+                results[engine] = ('error', {'engine': engine, 'error': "worker process died"}, None)
+            process.join()
+    return results
+
+
+def compare_engines(graph, source, engines=None, workers=None, rtol=1e-9, atol=1e-9):
+    """
+    Race several engines on the same graph and source and check their answers.
+
+    Every engine runs to completion in its own process (workers at a time,
+    default: all at once; workers=1 runs them one after the other, which
+    gives undisturbed timings). Distances are compared with the BASELINE
+    engine (DijkstraStepByStep) node by node: unreachable nodes must agree
+    exactly, finite distances within rtol/atol (vectorized engines sum in a
+    different order).
+
+    Args:
+        graph: CSRGraph with non-negative weights
+        engines: engine names (default: every engine of ENGINES)
+
+    Returns one stats dict per engine, baseline first (see run_engine), with
+    'matches' (bool), 'mismatches' (number of nodes that disagree) and
+    'max_error' added, or 'error' (message) for an engine that failed.
+    """
+    if graph.has_negative_weight():
+        raise ValueError("Engine comparison needs non-negative weights (Dijkstra baseline)")
+    engines = [BASELINE] + [e for e in (engines or ENGINES) if e != BASELINE]
+    workers = max(1, min(workers or len(engines), len(engines)))
+    results = _run_parallel(graph, source, engines, workers)
+
+    status, baseline_stats, expected = results[BASELINE]
+    if status != 'ok':
+        raise RuntimeError(f"Baseline engine failed: {baseline_stats['error']}")
+    reachable = np.isfinite(expected)
+    report = []
+    for engine in engines:
+        status, stats, distances = results[engine]
+        if status == 'ok':
+            same_reach = np.isfinite(distances) == reachable
+            both = reachable & same_reach
+            close = np.isclose(distances[both], expected[both], rtol=rtol, atol=atol)
+            stats['mismatches'] = int((~same_reach).sum() + (~close).sum())
+            stats['matches'] = stats['mismatches'] == 0
+            stats['max_error'] = float(np.abs(distances[both] - expected[both]).max()) if both.any() else 0.0
+        report.append(stats)
+    return report
+
+
+def _memory_text(size):
+    if size is None:
+        return "n/a"
+    return f"{size / 2 ** 20:.1f} MB"
+
+
+def format_comparison(report):
+    """Side-by-side text table of a compare_engines() report"""
+    header = f"{'engine':<16}{'seconds':>10}{'settled':>10}{'relaxations':>13}{'peak memory':>13}  result"
+    lines = [header, '-' * len(header)]
+    for stats in report:
+        if 'error' in stats:
+            lines.append(f"{stats['engine']:<16}  failed: {stats['error']}")
+            continue
+        verdict = "ok" if stats['matches'] else (
+            f"MISMATCH on {stats['mismatches']} node(s), max error {stats['max_error']:g}")
+        if stats['engine'] == BASELINE:
+            verdict = "baseline"
+        relaxations = stats['relaxations'] if stats['relaxations'] is not None else "n/a"
+        lines.append(f"{stats['engine']:<16}{stats['seconds']:>10.3f}{stats['settled']:>10}"
+                     f"{relaxations:>13}{_memory_text(stats['peak_memory']):>13}  {verdict}")
+    return "\n".join(lines)
@@ -0,0 +1,47 @@
+from .dijkstra_algorithm import DijkstraStepByStep, SearchLimits
+from .negative_weights import SPFAStepByStep
+from .parallel_delta_stepping import ParallelDeltaStepping
+from .vectorized_dijkstra import VectorizedDijkstra
+
+# Engines accepting a limits=SearchLimits(...) argument
+BOUNDED_ENGINES = ('dijkstra', 'vectorized')
+
+ENGINES = {
+    'dijkstra': DijkstraStepByStep,
+    'spfa': SPFAStepByStep,
+    'vectorized': VectorizedDijkstra,
+    'delta': lambda graph, source: VectorizedDijkstra(graph, source, mode='delta'),
+    'parallel-delta': ParallelDeltaStepping,
+}
+
+
+def create_engine(graph, source, engine=None, reorder=None, limits=None):
+    """
+    Build a step-by-step engine for graph. With engine=None the choice comes
+    from a single scan of the weights: Dijkstra when every weight is
+    non-negative, SPFA (Bellman-Ford) otherwise.
+
+    reorder ('rcm' or 'bfs') renumbers a CSRGraph for cache locality first;
+    labels are unchanged, so states still refer to the original nodes.
+
+    limits (a SearchLimits) bounds settled nodes, radius, time and queue size;
+    only BOUNDED_ENGINES support it, and only with non-negative weights.
+    """
+    if reorder is not None:
+        from .reordering import reordered
+        graph = reordered(graph, reorder)
+    if engine is not None and limits is None:
+        return ENGINES[engine](graph, source)
+    if hasattr(graph, 'has_negative_weight'):
+        negative = graph.has_negative_weight()
+    else:
+        negative = any(d['weight'] < 0 for _, _, d in graph.edges(data=True))
+    if limits is not None:
+        if engine is not None and engine not in BOUNDED_ENGINES:
+            raise ValueError(f"Engine {engine} does not support search limits")
+        if negative:
+            raise ValueError("Search limits need non-negative weights")
+        return ENGINES[engine or 'dijkstra'](graph, source, limits=limits)
+    if negative:
+        return SPFAStepByStep(graph, source)
+    return DijkstraStepByStep(graph, source)
@@ -0,0 +1,412 @@
+import heapq
+import os
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+RUN_DTYPE = np.dtype([('distance', np.float64), ('node', np.int64)])
+
+
+def save_csr(graph, directory):
+    """
+    Write a CSRGraph as .npy files (indptr, indices, weights, labels) that
+    ExternalDijkstra can memory-map. Labels must be integers; label_order.npy
+    keeps them searchable when the graph has been renumbered (reordering.py).
+    """
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, 'indptr.npy'), graph.indptr)
+    np.save(os.path.join(directory, 'indices.npy'), graph.indices)
+    np.save(os.path.join(directory, 'weights.npy'), graph.weights)
+    labels = np.asarray(graph.labels, dtype=np.int64)
+    np.save(os.path.join(directory, 'labels.npy'), labels)
+    order = np.argsort(labels, kind='stable')
+    np.save(os.path.join(directory, 'label_order.npy'), order)
+    np.save(os.path.join(directory, 'sorted_labels.npy'), labels[order])
+
+
+class MappedCSR:
+    """Read-only CSR arrays memory-mapped from a directory written by save_csr()"""
+
+    def __init__(self, directory):
+        self.indptr = np.load(os.path.join(directory, 'indptr.npy'), mmap_mode='r')
+        self.indices = np.load(os.path.join(directory, 'indices.npy'), mmap_mode='r')
+        self.weights = np.load(os.path.join(directory, 'weights.npy'), mmap_mode='r')
+        self.labels = np.load(os.path.join(directory, 'labels.npy'), mmap_mode='r')
+        self.label_order = np.load(os.path.join(directory, 'label_order.npy'), mmap_mode='r')
+        self.sorted_labels = np.load(os.path.join(directory, 'sorted_labels.npy'), mmap_mode='r')
+
+    def number_of_nodes(self):
+        return len(self.labels)
+
+    def index_of(self, label):
+        position = int(np.searchsorted(self.sorted_labels, label))
+        if position >= len(self.labels) or self.sorted_labels[position] != label:
+            raise KeyError(label)
+        return int(self.label_order[position])
+
+
+class BlockCache:
+    """
+    LRU cache of adjacency blocks (block_size consecutive node ids each).
+    Blocks requested through prefetch() are read by a background thread in
+    node-id order, so reads hit the CSR file sequentially.
+
+    Blocks being read count against max_blocks like loaded ones: a prefetch
+    evicts least recently used blocks to make room, never asks for more
+    than max_blocks - 1 blocks (one slot stays free for a block read on
+    demand) and drops the reads of an earlier prefetch that are no longer
+    wanted.
+    """
+
+    def __init__(self, csr, block_size=4096, max_blocks=64):
+        self.csr = csr
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.blocks = OrderedDict()
+        self.pending = {}
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.hits = 0
+        self.misses = 0
+
+    def _read(self, block):
+        first = block * self.block_size
+        last = min(first + self.block_size, len(self.csr.indptr) - 1)
+        indptr = np.array(self.csr.indptr[first:last + 1])
+        start, end = indptr[0], indptr[-1]
+        return (indptr - start,
+                np.array(self.csr.indices[start:end]),
+                np.array(self.csr.weights[start:end]))
+
+    def _store(self, block, data):
+        self.blocks[block] = data
+        self.blocks.move_to_end(block)
+        while len(self.blocks) > 1 and len(self.blocks) + len(self.pending) > self.max_blocks:
+            self.blocks.popitem(last=False)
+
+    def prefetch(self, nodes):
+        """Start reading the blocks of nodes (most wanted first) that are not loaded"""
+        wanted = []
+        for node in nodes:
+            block = node // self.block_size
+            if block not in wanted:
+                wanted.append(block)
+        wanted = set(wanted[:max(self.max_blocks - 1, 0)])
+        for block in list(self.pending):
+            if block not in wanted:
+                # A read already running finishes in the background, unused
+                self.pending.pop(block).cancel()
+        for block in sorted(wanted):
+            if block in self.blocks:
+                self.blocks.move_to_end(block)
+            elif block not in self.pending:
+                self.pending[block] = self.executor.submit(self._read, block)
+        while self.blocks and len(self.blocks) + len(self.pending) > self.max_blocks:
+            self.blocks.popitem(last=False)
+
+    def out_edges(self, node):
+        block = node // self.block_size
+        if block in self.blocks:
+            self.hits += 1
+            self.blocks.move_to_end(block)
+        else:
+            self.misses += 1
+            future = self.pending.pop(block, None)
+            self._store(block, future.result() if future else self._read(block))
+        indptr, indices, weights = self.blocks[block]
+        local = node - block * self.block_size
+        start, end = indptr[local], indptr[local + 1]
+        return indices[start:end], weights[start:end]
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+class _Run:
+    """A sorted spill file read back through a small in-memory buffer"""
+
+    def __init__(self, path, buffer_size):
+        self.path = path
+        self.data = np.load(path, mmap_mode='r')
+        self.position = 0
+        self.buffer_size = buffer_size
+        self._fill()
+
+    def _fill(self):
+        end = min(self.position + self.buffer_size, len(self.data))
+        self.buffer = np.array(self.data[self.position:end])
+        self.offset = 0
+
+    def head(self):
+        row = self.buffer[self.offset]
+        return row['distance'].item(), row['node'].item()
+
+    def advance(self):
+        self.offset += 1
+        self.position += 1
+        if self.offset == len(self.buffer) and self.position < len(self.data):
+            self._fill()
+
+    def remaining(self):
+        return len(self.data) - self.position
+
+    def close(self):
+        self.data = None
+        self.buffer = None
+        os.remove(self.path)
+
+
+class SpillingHeap:
+    """
+    Priority queue holding at most max_items entries in memory. When it
+    overflows, the larger half is sorted and written to a run file; pop()
+    merges the in-memory heap with the heads of all runs.
+    """
+
+    def __init__(self, directory, max_items=1_000_000, buffer_size=8192):
+        self.directory = directory
+        self.max_items = max(max_items, 2)
+        self.buffer_size = buffer_size
+        self.heap = []
+        self.runs = {}
+        # (head entry, run id) of every open run, so pop() needs no scan
+        self.heads = []
+        self.spilled = 0
+        # Entries in memory and in runs, kept up to date by push() and pop()
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, distance, node):
+        self.size += 1
+        heapq.heappush(self.heap, (distance, node))
+        if len(self.heap) > self.max_items:
+            self._spill()
+
+    def _spill(self):
+        items = sorted(self.heap)
+        keep = self.max_items // 2
+        # A sorted list is already a valid heap
+        self.heap = items[:keep]
+        path = os.path.join(self.directory, f"run_{self.spilled}.npy")
+        np.save(path, np.array(items[keep:], dtype=RUN_DTYPE))
+        run = _Run(path, self.buffer_size)
+        self.runs[self.spilled] = run
+        heapq.heappush(self.heads, (run.head(), self.spilled))
+        self.spilled += 1
+
+    def pop(self):
+        if not self.size:
+            raise IndexError("pop from an empty SpillingHeap")
+        self.size -= 1
+        if not self.heads or (self.heap and self.heap[0] <= self.heads[0][0]):
+            return heapq.heappop(self.heap)
+        best, run_id = heapq.heappop(self.heads)
+        run = self.runs[run_id]
+        run.advance()
+        if run.remaining():
+            heapq.heappush(self.heads, (run.head(), run_id))
+        else:
+            run.close()
+            del self.runs[run_id]
+        return best
+
+    def peek_nodes(self, count):
+        return [node for _, node in self.heap[:count]]
+
+    def close(self):
+        for run in self.runs.values():
+            run.close()
+        self.runs = {}
+        self.heads = []
+        self.heap = []
+        self.size = 0
+
+
+class _LabelView:
+    """Read-only mapping {label: value} over a disk-backed array (no full copy)"""
+
+    def __init__(self, csr, values, convert):
+        self.csr = csr
+        self.values = values
+        self.convert = convert
+
+    def __getitem__(self, label):
+        return self.convert(self.values[self.csr.index_of(label)])
+
+    def get(self, label, default=None):
+        try:
+            return self[label]
+        except KeyError:
+            return default
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return (label.item() for label in self.csr.labels)
+
+    def __contains__(self, label):
+        try:
+            return bool(self.convert(self.values[self.csr.index_of(label)]) is not None)
+        except KeyError:
+            return False
+
+    def items(self):
+        return ((label, self[label]) for label in self)
+
+
+class _SettledView(_LabelView):
+    """Set-like view of the settled labels"""
+
+    def __init__(self, csr, settled):
+        super().__init__(csr, settled, lambda s: True if s else None)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.values))
+
+    def __iter__(self):
+        return (self.csr.labels[i].item() for i in np.flatnonzero(self.values))
+
+
+class ExternalDijkstra:
+    """
+    Dijkstra for graphs larger than RAM, over a CSR directory written by save_csr().
+
+    Distances, predecessors and the settled flags are np.memmap files in a work
+    directory, the priority queue spills to sorted run files past
+    max_heap_items, and adjacency is read through a BlockCache that prefetches
+    the blocks of the next queued nodes. Same step interface as
+    DijkstraStepByStep; get_current_state() returns lazy views instead of copies.
+
+    Results are never loaded into RAM as a whole: read them through
+    iter_rows() before close(), or pass a work_dir to keep distances.dat,
+    predecessors.dat and settled.dat (and the memmaps) after close().
+    """
+
+    def __init__(self, csr_directory, source, work_dir=None, max_heap_items=1_000_000,
+                 block_size=4096, max_blocks=64, prefetch=32):
+        self.csr = MappedCSR(csr_directory)
+        self.graph = self
+        self.source = source
+        self.prefetch_count = prefetch
+        self._own_work_dir = work_dir is None
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix='dijkstra_ext_')
+        os.makedirs(self.work_dir, exist_ok=True)
+
+        n = self.csr.number_of_nodes()
+        self.dist = np.memmap(os.path.join(self.work_dir, 'distances.dat'),
+                              dtype=np.float64, mode='w+', shape=(max(n, 1),))
+        self.pred = np.memmap(os.path.join(self.work_dir, 'predecessors.dat'),
+                              dtype=np.int64, mode='w+', shape=(max(n, 1),))
+        self.settled = np.memmap(os.path.join(self.work_dir, 'settled.dat'),
+                                 dtype=np.bool_, mode='w+', shape=(max(n, 1),))
+        chunk = 1 << 20
+        for start in range(0, n, chunk):
+            self.dist[start:start + chunk] = np.inf
+            self.pred[start:start + chunk] = -1
+
+        self.blocks = BlockCache(self.csr, block_size, max_blocks)
+        self.heap = SpillingHeap(self.work_dir, max_heap_items)
+        s = self.csr.index_of(source)
+        self.dist[s] = 0
+        self.heap.push(0.0, s)
+        self.settled_count = 0
+        self.current_node = None
+        self.finished = False
+
+    @property
+    def queue(self):
+        labels = self.csr.labels
+        return [(d, labels[i].item()) for d, i in self.heap.heap]
+
+    def __getitem__(self, label):
+        targets, weights = self.blocks.out_edges(self.csr.index_of(label))
+        labels = self.csr.labels
+        return [(labels[v].item(), w) for v, w in zip(targets.tolist(), weights.tolist())]
+
+    def has_next(self):
+        return not self.finished
+
+    def progress(self):
+        """Fraction of nodes settled so far"""
+        return self.settled_count / max(self.csr.number_of_nodes(), 1)
+
+    def step_forward(self):
+        while len(self.heap):
+            distance, node = self.heap.pop()
+            if not self.settled[node] and distance <= self.dist[node]:
+                break
+        else:
+            self.finished = True
+            self.current_node = None
+            return
+
+        self.settled[node] = True
+        self.settled_count += 1
+        self.current_node = self.csr.labels[node].item()
+
+        targets, weights = self.blocks.out_edges(node)
+        candidates = distance + weights
+        improved = (candidates < self.dist[targets]) & ~self.settled[targets]
+        targets, candidates = targets[improved], candidates[improved]
+        self.dist[targets] = candidates
+        self.pred[targets] = node
+        for target, candidate in zip(targets.tolist(), candidates.tolist()):
+            self.heap.push(candidate, target)
+
+        self.blocks.prefetch(self.heap.peek_nodes(self.prefetch_count))
+        if not len(self.heap):
+            self.finished = True
+
+    def run(self, callback=None, every=100000):
+        """Run to completion, calling callback(self) every `every` settled nodes"""
+        while self.has_next():
+            self.step_forward()
+            if callback is not None and self.settled_count % every == 0:
+                callback(self)
+        return self.dist
+
+    def get_current_state(self):
+        labels = self.csr.labels
+        return {
+            'distances': _LabelView(self.csr, self.dist, lambda d: d.item()),
+            'visited': _SettledView(self.csr, self.settled),
+            'current_node': self.current_node,
+            'predecessors': _LabelView(
+                self.csr, self.pred, lambda p: labels[p].item() if p >= 0 else None),
+        }
+
+    def iter_rows(self, chunk_size=1 << 20):
+        """
+        Yield (labels, distances, predecessor labels) in chunks of chunk_size
+        nodes; only one chunk is in memory at a time. Predecessors are -1
+        where there is none.
+        """
+        labels = self.csr.labels
+        for start in range(0, self.csr.number_of_nodes(), chunk_size):
+            end = start + chunk_size
+            pred = np.array(self.pred[start:end])
+            has_pred = pred >= 0
+            pred[has_pred] = labels[pred[has_pred]]
+            yield np.array(labels[start:end]), np.array(self.dist[start:end]), pred
+
+    def close(self):
+        """
+        Flush and release the work files. With a caller-supplied work_dir the
+        result files and memmaps stay available; with the default temporary
+        directory they are deleted, so read them (iter_rows) first.
+        """
+        self.blocks.close()
+        self.heap.close()
+        for array in (self.dist, self.pred, self.settled):
+            array.flush()
+        if self._own_work_dir:
+            # Drop the maps before deleting their files (required on Windows)
+            self.dist = self.pred = self.settled = None
+            for name in ('distances.dat', 'predecessors.dat', 'settled.dat'):
+                os.remove(os.path.join(self.work_dir, name))
+            os.rmdir(self.work_dir)
+            self._own_work_dir = False
@@ -0,0 +1,213 @@
+import numpy as np
+from matplotlib.collections import LineCollection
+
+from .tiled_background import TiledBackground
+
+
+class FocusedRenderer:
+    """
+    Rendu « focalisé » pour les grands graphes.
+
+    Le graphe statique (toutes les arêtes en une LineCollection, tous les
+    nœuds en un seul scatter) n'est dessiné qu'une fois puis mémorisé comme
+    image de fond. À chaque étape on restaure ce fond et on ne redessine que
+    les surcouches animées : nœuds traités, nœud courant, arbre des plus
+    courts chemins (une LineCollection) et chemin demandé, par blitting.
+
+    Le fond est recapturé à chaque redessin complet (zoom, déplacement,
+    redimensionnement), via l'événement 'draw_event' de matplotlib.
+
+    Avec tuiles=True le graphe statique n'est plus vectoriel : c'est un
+    TiledBackground, dont le coût de zoom et de déplacement ne dépend que du
+    nombre de tuiles visibles et non du nombre d'arêtes.
+    """
+
+    def __init__(self, figure, axes, canvas, graph, positions, couleurs, tuiles=False):
+        """
+        Args:
+            graph: CSRGraph
+            positions: {nœud: (x, y)}
+            couleurs: dict avec les clés 'arete', 'noeud', 'visite', 'courant',
+                      'source', 'arbre', 'chemin' et 'fond'
+            tuiles: dessiner le fond statique en tuiles raster (très grands graphes)
+        """
+        self.figure = figure
+        self.axes = axes
+        self.canvas = canvas
+        self.graph = graph
+        self.couleurs = couleurs
+        self.xy = np.array([positions[label] for label in graph.labels], dtype=np.float64)
+        self.xy = self.xy.reshape(-1, 2)
+        n = len(self.xy)
+
+        # Tampons de taille fixe : une étape ne fait qu'écrire une ligne
+        self.traites = np.zeros(n, dtype=bool)
+        self.ordre_traites = np.empty(n, dtype=np.int64)
+        self.nb_traites = 0
+        self.segments_arbre = np.zeros((n, 2, 2))
+        self.dans_arbre = np.zeros(n, dtype=bool)
+        self.fond = None
+        self.tuiles = tuiles
+        self.fond_tuile = None
+        self._cid = canvas.mpl_connect('draw_event', self._sur_redessin)
+
+    def dessiner_fond(self, source, titre):
+        """Dessine le graphe statique une fois et prépare les surcouches animées"""
+        ax = self.axes
+        if self.fond_tuile is not None:
+            self.fond_tuile.fermer()
+            self.fond_tuile = None
+        ax.clear()
+        n = len(self.xy)
+        taille = max(2.0, min(60.0, 20000.0 / max(n, 1)))
+
+        if self.tuiles:
+            self.fond_tuile = TiledBackground(ax, self.canvas, self.graph, self.xy, self.couleurs)
+        else:
+            origines = np.repeat(np.arange(n), np.diff(self.graph.indptr))
+            segments = np.stack((self.xy[origines], self.xy[self.graph.indices]), axis=1)
+            ax.add_collection(LineCollection(
+                segments, colors=self.couleurs['arete'], linewidths=0.5, alpha=0.35, zorder=1))
+            ax.scatter(self.xy[:, 0], self.xy[:, 1], s=taille, c=self.couleurs['noeud'],
+                       linewidths=0, zorder=2)
+        if source in self.graph.index:
+            x, y = self.xy[self.graph.index[source]]
+            ax.scatter([x], [y], s=taille * 6 + 40, c=self.couleurs['source'],
+                       edgecolors='#333333', zorder=7)
+
+        self.arbre = LineCollection([], colors=self.couleurs['arbre'], linewidths=1.5,
+                                    animated=True, zorder=3)
+        self.chemin = LineCollection([], colors=self.couleurs['chemin'], linewidths=3.5,
+                                     animated=True, zorder=6)
+        self.alternatives = LineCollection([], linewidths=2.5, alpha=0.8,
+                                           animated=True, zorder=5.5)
+        ax.add_collection(self.arbre)
+        ax.add_collection(self.alternatives)
+        ax.add_collection(self.chemin)
+        self.points_traites = ax.scatter(np.empty(0), np.empty(0), s=taille * 1.5,
+                                         c=self.couleurs['visite'], linewidths=0,
+                                         animated=True, zorder=4)
+        self.zones = ax.scatter(np.empty(0), np.empty(0), s=taille * 4, alpha=0.45,
+                                linewidths=0, animated=True, zorder=3.5)
+        self.point_courant = ax.scatter(np.empty(0), np.empty(0), s=taille * 6 + 40,
+                                        c=self.couleurs['courant'], edgecolors='#333333',
+                                        animated=True, zorder=5)
+
+        ax.set_facecolor(self.couleurs['fond'])
+        ax.set_title(titre, fontsize=12, pad=20)
+        if self.fond_tuile is None:
+            ax.autoscale_view()
+            ax.set_aspect('equal', adjustable='datalim')
+        else:
+            # 'box' : l'aspect ne touche pas aux limites, donc pas aux tuiles choisies
+            ax.set_aspect('equal', adjustable='box')
+        ax.axis('off')
+        self.figure.tight_layout()
+        # Déclenche _sur_redessin, qui capture le fond
+        self.canvas.draw()
+
+    def _surcouches(self):
+        return (self.arbre, self.zones, self.alternatives, self.points_traites,
+                self.point_courant, self.chemin)
+
+    def _sur_redessin(self, event):
+        self.fond = self.canvas.copy_from_bbox(self.figure.bbox)
+        for artiste in self._surcouches():
+            self.axes.draw_artist(artiste)
+
+    def _blit(self):
+        if self.fond is None:
+            return
+        self.canvas.restore_region(self.fond)
+        for artiste in self._surcouches():
+            self.axes.draw_artist(artiste)
+        self.canvas.blit(self.figure.bbox)
+
+    def synchroniser(self, etat, arbre):
+        """Reprend un parcours déjà commencé (changement de mode en cours de route)"""
+        index = self.graph.index
+        self.traites[:] = False
+        self.dans_arbre[:] = False
+        visites = [index[noeud] for noeud in etat['visited']]
+        self.traites[visites] = True
+        self.ordre_traites[:len(visites)] = visites
+        self.nb_traites = len(visites)
+        for noeud, (predecesseur, _) in arbre.items():
+            i = index[noeud]
+            self.segments_arbre[i] = (self.xy[index[predecesseur]], self.xy[i])
+            self.dans_arbre[i] = True
+
+    def mettre_a_jour(self, etat, arbre):
+        """
+        Ajoute le nœud courant et son arc d'arbre, puis redessine les surcouches.
+
+        Args:
+            etat: état de l'algorithme (get_current_state())
+            arbre: {nœud: (prédécesseur, poids)}
+        """
+        courant = etat['current_node']
+        index = self.graph.index
+        if courant is not None:
+            i = index[courant]
+            if not self.traites[i]:
+                self.traites[i] = True
+                self.ordre_traites[self.nb_traites] = i
+                self.nb_traites += 1
+            if courant in arbre:
+                # Remplacé tel quel si le prédécesseur change (poids négatifs)
+                self.segments_arbre[i] = (self.xy[index[arbre[courant][0]]], self.xy[i])
+                self.dans_arbre[i] = True
+            self.point_courant.set_offsets(self.xy[i:i + 1])
+        else:
+            self.point_courant.set_offsets(np.empty((0, 2)))
+
+        self.points_traites.set_offsets(self.xy[self.ordre_traites[:self.nb_traites]])
+        self.arbre.set_segments(self.segments_arbre[self.dans_arbre])
+        self._blit()
+
+    def afficher_chemin(self, noeud, predecessors):
+        """
+        Surligne le chemin source → noeud en remontant les prédécesseurs,
+        sans toucher au reste du dessin. Renvoie la liste des nœuds du chemin.
+        """
+        chemin = []
+        vus = set()
+        while noeud is not None and noeud not in vus:
+            vus.add(noeud)
+            chemin.append(noeud)
+            noeud = predecessors.get(noeud)
+        chemin.reverse()
+        points = self.xy[[self.graph.index[n] for n in chemin]]
+        self.chemin.set_segments(np.stack((points[:-1], points[1:]), axis=1)
+                                 if len(points) > 1 else [])
+        self._blit()
+        return chemin
+
+    def afficher_alternatives(self, chemins, couleurs):
+        """
+        Superpose plusieurs chemins (k plus courts chemins), un couleur par chemin.
+
+        Args:
+            chemins: listes de nœuds
+            couleurs: une couleur par chemin
+        """
+        segments, teintes = [], []
+        for chemin, couleur in zip(chemins, couleurs):
+            points = self.xy[[self.graph.index[n] for n in chemin]]
+            segments.extend(np.stack((points[:-1], points[1:]), axis=1))
+            teintes.extend([couleur] * (len(points) - 1))
+        self.alternatives.set_segments(segments)
+        self.alternatives.set_color(teintes)
+        self._blit()
+
+    def afficher_isochrones(self, noeuds, couleurs):
+        """Colore les nœuds couverts par des isochrones (une couleur par nœud)"""
+        self.zones.set_offsets(self.xy[[self.graph.index[n] for n in noeuds]].reshape(-1, 2))
+        self.zones.set_facecolor(couleurs)
+        self._blit()
+
+    def fermer(self):
+        self.canvas.mpl_disconnect(self._cid)
+        if self.fond_tuile is not None:
+            self.fond_tuile.fermer()
+            self.fond_tuile = None
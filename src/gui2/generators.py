@@ -0,0 +1,224 @@
+"""
+Seeded, reproducible graph generators writing straight into CSR arrays.
+
+Every generator returns a CSRGraph whose labels are 0 .. n-1; the spatial
+ones (grid, geometric, Delaunay) also set graph.coordinates, an (n, 2) array
+in the unit square. Undirected models are stored as two opposite arcs.
+
+    python -m src.gui2.generators geometric 1e6 --seed 1 -o /tmp/geo
+"""
+import numpy as np
+
+from .csr_graph import CSRGraph
+
+
+def _finish(n, u, v, weights, coordinates=None):
+    graph = CSRGraph.from_arrays(u, v, weights, nodes=np.arange(n))
+    graph.coordinates = coordinates
+    return graph
+
+
+def _both_ways(u, v, weights):
+    return np.concatenate((u, v)), np.concatenate((v, u)), np.concatenate((weights, weights))
+
+
+def _random_weights(rng, count, max_weight):
+    return rng.integers(1, max_weight + 1, count)
+
+
+def _length_weights(points, u, v):
+    """Integer weights proportional to edge length, the median edge weighing 10"""
+    lengths = np.hypot(*(points[u] - points[v]).T)
+    scale = 10 / max(np.median(lengths), 1e-12) if len(lengths) else 1
+    return np.maximum(1, np.rint(lengths * scale)).astype(np.int64)
+
+
+def grid_graph(rows, cols, seed=0, max_weight=10):
+    """rows x cols 4-neighbour grid with random weights in 1..max_weight"""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(rows * cols).reshape(rows, cols)
+    u = np.concatenate((ids[:, :-1].ravel(), ids[:-1, :].ravel()))
+    v = np.concatenate((ids[:, 1:].ravel(), ids[1:, :].ravel()))
+    u, v, weights = _both_ways(u, v, _random_weights(rng, len(u), max_weight))
+    r, c = np.divmod(np.arange(rows * cols), cols)
+    coordinates = np.column_stack((c / max(cols - 1, 1), r / max(rows - 1, 1)))
+    return _finish(rows * cols, u, v, weights, coordinates)
+
+
+def random_geometric_graph(n, degree=6, seed=0):
+    """
+    n random points in the unit square joined when closer than the radius
+    giving `degree` neighbours on average. Neighbours are found by binning
+    the points into radius-sized cells and comparing adjacent cells only.
+    """
+    rng = np.random.default_rng(seed)
+    points = rng.random((n, 2))
+    radius = np.sqrt(degree / (np.pi * max(n, 1)))
+    side = max(1, int(1 / radius))
+    cells = np.minimum((points * side).astype(np.int64), side - 1)
+    cell_id = cells[:, 0] * side + cells[:, 1]
+    order = np.argsort(cell_id, kind='stable')
+    sorted_ids = cell_id[order]
+    starts = np.searchsorted(sorted_ids, np.arange(side * side))
+    ends = np.searchsorted(sorted_ids, np.arange(side * side), side='right')
+
+    us, vs = [], []
+    # Half of the 3x3 neighbourhood: every pair of cells is visited once
+    for dx, dy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        nx, ny = cells[:, 0] + dx, cells[:, 1] + dy
+        valid = (nx >= 0) & (nx < side) & (ny >= 0) & (ny < side)
+        neighbor_cell = np.where(valid, nx * side + ny, 0)
+        first = np.where(valid, starts[neighbor_cell], 0)
+        counts = np.where(valid, ends[neighbor_cell] - first, 0)
+        i = np.repeat(np.arange(n), counts)
+        offsets = np.arange(len(i)) - np.repeat(np.cumsum(counts) - counts, counts)
+        j = order[np.repeat(first, counts) + offsets]
+        keep = np.hypot(*(points[i] - points[j]).T) <= radius
+        keep &= (i < j) if (dx, dy) == (0, 0) else (i != j)
+        us.append(i[keep])
+        vs.append(j[keep])
+    u, v = np.concatenate(us), np.concatenate(vs)
+    u, v, weights = _both_ways(u, v, _length_weights(points, u, v))
+    return _finish(n, u, v, weights, points)
+
+
+def erdos_renyi_graph(n, m, seed=0, max_weight=10):
+    """Directed G(n, m): m arcs drawn uniformly (self-loops and repeats dropped)"""
+    rng = np.random.default_rng(seed)
+    u = rng.integers(0, n, m)
+    v = rng.integers(0, n, m)
+    keep = u != v
+    return _finish(n, u[keep], v[keep], _random_weights(rng, int(keep.sum()), max_weight))
+
+
+def barabasi_albert_graph(n, m=3, seed=0, max_weight=10):
+    """
+    Preferential attachment: each new node links to m existing nodes chosen
+    proportionally to their degree.
+
+    Uses the edge-endpoint formulation of Batagelj and Brandes: the target of
+    edge e is a uniformly drawn endpoint of an earlier edge. Draws that land
+    on an earlier target are resolved by pointer jumping, so the whole graph
+    is built with array operations.
+    """
+    rng = np.random.default_rng(seed)
+    m = max(1, m)
+    seed_nodes = m + 1
+    # Start from a ring on the first m + 1 nodes
+    ring = np.arange(seed_nodes)
+    first_u, first_v = ring, (ring + 1) % seed_nodes
+    k0 = len(first_u)
+    new = max(n - seed_nodes, 0) * m
+    total = k0 + new
+
+    sources = np.concatenate((first_u, seed_nodes + np.arange(new) // m))
+    draws = np.empty(total, dtype=np.int64)
+    edge_ids = np.arange(k0, total)
+    draws[k0:] = (rng.random(new) * (2 * edge_ids)).astype(np.int64)
+
+    targets = np.empty(total, dtype=np.int64)
+    targets[:k0] = first_v
+    pointer = draws[k0:].copy()
+    resolved = np.zeros(new, dtype=bool)
+    value = np.empty(new, dtype=np.int64)
+    while not resolved.all():
+        open_ = np.flatnonzero(~resolved)
+        p = pointer[open_]
+        even = p % 2 == 0
+        edge = p // 2
+        # Even positions are sources, odd positions of seed edges are known targets
+        done = even | (edge < k0)
+        seed_target = first_v[np.minimum(edge[done], k0 - 1)]
+        value[open_[done]] = np.where(even[done], sources[edge[done]], seed_target)
+        resolved[open_[done]] = True
+        # Odd positions of generated edges: follow that edge's own draw
+        pointer[open_[~done]] = draws[edge[~done]]
+    targets[k0:] = value
+
+    keep = sources != targets
+    u, v = sources[keep], targets[keep]
+    u, v, weights = _both_ways(u, v, _random_weights(rng, len(u), max_weight))
+    return _finish(max(n, seed_nodes), u, v, weights)
+
+
+def delaunay_graph(n, seed=0):
+    """
+    Road-like planar graph: Delaunay triangulation of n random points, edge
+    weights proportional to length. Uses scipy.spatial when available and
+    otherwise triangulates a jittered grid (also planar, similar degrees).
+    """
+    rng = np.random.default_rng(seed)
+    try:
+        from scipy.spatial import Delaunay
+    except ImportError:
+        Delaunay = None
+
+    if Delaunay is not None:
+        points = rng.random((n, 2))
+        triangles = Delaunay(points).simplices
+    else:
+        side = max(2, int(np.ceil(np.sqrt(n))))
+        r, c = np.divmod(np.arange(side * side), side)
+        points = (np.column_stack((c, r)) + rng.uniform(-0.35, 0.35, (side * side, 2)) + 0.5) / side
+        ids = np.arange(side * side).reshape(side, side)
+        a, b = ids[:-1, :-1].ravel(), ids[:-1, 1:].ravel()
+        c_, d = ids[1:, :-1].ravel(), ids[1:, 1:].ravel()
+        flip = rng.random(len(a)) < 0.5
+        triangles = np.concatenate((
+            np.column_stack((a, b, np.where(flip, c_, d))),
+            np.column_stack((np.where(flip, b, a), d, c_))))
+        n = side * side
+
+    triangles = triangles.astype(np.int64)
+    u = triangles[:, [0, 1, 2]].ravel()
+    v = triangles[:, [1, 2, 0]].ravel()
+    # Each interior side appears in two triangles: keep it once
+    low, high = np.minimum(u, v), np.maximum(u, v)
+    pairs = np.unique(low * n + high)
+    u, v = pairs // n, pairs % n
+    u, v, weights = _both_ways(u, v, _length_weights(points, u, v))
+    return _finish(n, u, v, weights, points)
+
+
+# name -> (menu label, builder from an approximate number of arcs and a seed)
+GENERATORS = {
+    'grid': ("Grille 4-voisins",
+             lambda edges, seed: grid_graph(*(2 * [max(2, int(np.sqrt(edges / 4)))]), seed=seed)),
+    'geometric': ("Géométrique aléatoire",
+                  lambda edges, seed: random_geometric_graph(max(2, edges // 6), seed=seed)),
+    'erdos-renyi': ("Erdős–Rényi G(n, m)",
+                    lambda edges, seed: erdos_renyi_graph(max(2, edges // 5), edges, seed=seed)),
+    'barabasi-albert': ("Barabási–Albert (m = 3)",
+                        lambda edges, seed: barabasi_albert_graph(max(4, edges // 6), 3, seed=seed)),
+    'delaunay': ("Routier (Delaunay)",
+                 lambda edges, seed: delaunay_graph(max(3, edges // 6), seed=seed)),
+}
+
+SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7)
+
+
+def generate(kind, edges, seed=0):
+    """Build a GENERATORS graph with about `edges` arcs"""
+    return GENERATORS[kind][1](int(edges), seed)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from .external_memory import save_csr
+
+    parser = argparse.ArgumentParser(description="Generate a test graph.")
+    parser.add_argument('kind', choices=sorted(GENERATORS))
+    parser.add_argument('edges', type=float, help="approximate number of arcs, e.g. 1e6")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', '-o', help="save_csr() directory (usable by run_cli.py)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graph = generate(args.kind, args.edges, args.seed)
+    print(f"{args.kind}: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} arcs "
+          f"in {time.perf_counter() - start:.2f}s")
+    if args.output:
+        save_csr(graph, args.output)
+        print(f"written to {args.output}")
@@ -0,0 +1,475 @@
+"""
+Headless entry point: load a graph file, run shortest-path queries, write results.
+
+Nothing here imports PyQt5 or matplotlib, so the module can be used from batch
+jobs, servers or notebooks:
+
+    from src.gui2.headless import load_graph, single_source, point_to_point
+    graph = load_graph('roads.txt')
+    distances, predecessors = single_source(graph, 0)
+
+or from a shell:
+
+    python run_cli.py roads.txt --source 0 --target 42 --engine ch --profile
+"""
+import argparse
+import ast
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+from .csr_graph import CSRGraph
+from .result_writers import export_shortest_paths, iter_source_rows
+
+# Point-to-point only engines, on top of engines.ENGINES
+QUERY_ENGINES = ('ch', 'alt')
+
+
+def load_graph(path):
+    """
+    Load a CSRGraph from path.
+
+    Accepted inputs:
+        - a directory written by external_memory.save_csr()
+        - a Python list of (src, dst, weight) tuples, as typed in the editor
+        - a text edge list, one 'src dst weight' per line (comma separated
+          for .csv files, '#' starts a comment)
+    """
+    if os.path.isdir(path):
+        def part(name):
+            return np.load(os.path.join(path, f'{name}.npy'))
+        return CSRGraph(part('labels').tolist(), part('indptr'),
+                        part('indices'), part('weights'))
+
+    with open(path) as f:
+        head = f.read(256).lstrip()
+    if head.startswith('['):
+        with open(path) as f:
+            edges = ast.literal_eval(f.read().strip())
+        return CSRGraph.from_edges(edges)
+
+    delimiter = ',' if path.lower().endswith('.csv') else None
+    data = np.loadtxt(path, delimiter=delimiter, comments='#', ndmin=2)
+    if data.size == 0:
+        return CSRGraph.from_edges([])
+    if data.shape[1] < 3:
+        raise ValueError(f"{path}: expected 'src dst weight' on every line")
+    weights = data[:, 2]
+    if np.all(weights == np.round(weights)):
+        weights = weights.astype(np.int64)
+    return CSRGraph.from_arrays(data[:, 0].astype(np.int64), data[:, 1].astype(np.int64), weights)
+
+
+def single_source(graph, source, engine=None, limits=None):
+    """Return (distances, predecessors) arrays aligned with graph.labels"""
+    _, distances, predecessors = next(iter_source_rows(graph, [source], engine, limits))
+    return distances, predecessors
+
+
+def report_stop(source, reason):
+    """on_stop callback of iter_source_rows: one warning line on stderr"""
+    print(f"warning: search from {source} stopped by the {reason} limit, "
+          f"only settled nodes are reported", file=sys.stderr)
+
+
+_worker_graph = None
+_worker_engine = None
+_worker_limits = None
+
+
+def _init_worker(graph, engine, limits=None):
+    global _worker_graph, _worker_engine, _worker_limits
+    _worker_graph, _worker_engine, _worker_limits = graph, engine, limits
+
+
+def solve_source(graph, source, engine=None, limits=None):
+    """(source, distances, predecessors) of one search, warnings on stderr"""
+    return next(iter_source_rows(graph, [source], engine, limits, report_stop))
+
+
+def _solve(source):
+    return solve_source(_worker_graph, source, _worker_engine, _worker_limits)
+
+
+def multi_source(graph, sources, engine=None, workers=None, limits=None):
+    """
+    Yield (source, distances, predecessors) for every source, in order.
+
+    With workers > 1 the searches run in a process pool; the graph is sent
+    once to each worker and at most 4 results per worker are in flight, so
+    memory stays bounded however many sources there are.
+    """
+    if not workers or workers <= 1:
+        yield from iter_source_rows(graph, sources, engine, limits, report_stop)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(graph, engine, limits)) as executor:
+        pending = deque()
+        for source in sources:
+            pending.append(executor.submit(_solve, source))
+            if len(pending) >= 4 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def walk_path(graph, predecessors, target):
+    """Path to target (labels) from a predecessor index array, [] if unreachable"""
+    path = []
+    node = graph.index[target]
+    while node != -1 and len(path) <= len(graph.labels):
+        path.append(graph.labels[node])
+        node = predecessors[node]
+    path.reverse()
+    return path
+
+
+def point_to_point(graph, pairs, engine=None, workers=None, limits=None):
+    """
+    Yield (source, target, distance, path) for every (source, target) pair.
+
+    Args:
+        engine: 'ch' (Contraction Hierarchies, preprocessed once),
+                'alt' (A* with landmarks, built once with `workers` processes)
+                or any engines.ENGINES name / None for a full single-source run
+        limits: SearchLimits for the single-source runs (not used by 'ch'/'alt')
+    """
+    if engine == 'ch':
+        from .contraction_hierarchies import ContractionHierarchy
+        hierarchy = ContractionHierarchy(graph)
+        for source, target in pairs:
+            distance, path = hierarchy.query(source, target)
+            yield source, target, distance, path
+        return
+    if engine == 'alt':
+        from .alt_landmarks import ALTStepByStep, LandmarkTable
+        landmarks = LandmarkTable(graph, workers=workers)
+        for source, target in pairs:
+            search = ALTStepByStep(graph, source, target, landmarks)
+            distance = search.run()
+            path = []
+            if distance != float('inf'):
+                node = target
+                while node is not None and len(path) <= len(graph.labels):
+                    path.append(node)
+                    node = search.predecessors[node]
+                path.reverse()
+            yield source, target, distance, path
+        return
+
+    # One search per distinct source serves every target of that source
+    trees = {}
+    for source, target in pairs:
+        if source not in trees:
+            trees[source] = single_source(graph, source, engine, limits)
+        distances, predecessors = trees[source]
+        distance = distances[graph.index[target]].item()
+        path = walk_path(graph, predecessors, target) if np.isfinite(distance) else []
+        yield source, target, distance, path
+
+
+def alternative_paths(graph, pairs, k, method='yen', workers=None):
+    """
+    Yield (source, target, rank, distance, path) for the k shortest paths of
+    every pair (rank 1 is the shortest); see k_shortest_paths.
+    """
+    from .k_shortest_paths import k_shortest_paths
+    for source, target in pairs:
+        for rank, (distance, path) in enumerate(
+                k_shortest_paths(graph, source, target, k, method, workers or 1), 1):
+            yield source, target, rank, distance, path
+
+
+class Profiler:
+    """
+    Wall-clock timings of named stages, printed to stderr by report().
+
+    With memory=True each stage also records its tracemalloc peak (see
+    MemoryTracker; worker processes are not traced), and sizes() adds
+    structural size estimates to the report.
+    """
+
+    def __init__(self, enabled=True, memory=False):
+        self.enabled = enabled or memory
+        self.stages = []
+        self.structures = []
+        self.memory = None
+        if memory:
+            from .memory_profile import MemoryTracker
+            self.memory = MemoryTracker()
+            self.memory.start()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            if self.memory is None:
+                yield
+            else:
+                with self.memory.stage(name):
+                    yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def sizes(self, name, parts):
+        """Record estimated sizes in bytes: {structure: bytes}"""
+        self.structures.append((name, dict(parts)))
+
+    def report(self, stream=None):
+        if not self.enabled:
+            return
+        stream = stream or sys.stderr
+        if self.memory is None:
+            print("Profile (seconds):", file=stream)
+            for name, seconds in self.stages:
+                print(f"  {name:<30} {seconds:8.3f}", file=stream)
+        else:
+            from .memory_profile import format_bytes
+            print("Profile (seconds, tracemalloc peak and growth):", file=stream)
+            for name, seconds in self.stages:
+                _, peak, growth = self.memory.stages.get(name, (0, 0, 0))
+                print(f"  {name:<30} {seconds:8.3f} {format_bytes(peak):>10} {format_bytes(growth):>10}",
+                      file=stream)
+        print(f"  {'total':<30} {sum(s for _, s in self.stages):8.3f}", file=stream)
+        if self.structures:
+            from .memory_profile import format_bytes
+            print("Estimated structure sizes:", file=stream)
+            for name, parts in self.structures:
+                print(f"  {name}:", file=stream)
+                for part, size in parts.items():
+                    print(f"    {part:<28} {format_bytes(size):>10}", file=stream)
+
+
+def engine_structures(graph, source, engine, limits, profiler):
+    """
+    One extra search from source, only to measure it: its tracemalloc peak as
+    a stage and the estimated size of every engine structure at the end.
+    """
+    from .engines import create_engine
+    from .memory_profile import engine_footprint
+
+    if engine is None:
+        engine = 'spfa' if graph.has_negative_weight() else 'vectorized'
+    with profiler.stage(f"measured {engine} search"):
+        runner = create_engine(graph, source, engine, limits=limits)
+        while runner.has_next():
+            runner.step_forward()
+    profiler.sizes(f"{engine} engine from {source}", engine_footprint(runner, graph))
+    if hasattr(runner, 'close'):
+        runner.close()
+
+
+def parse_label(graph, text):
+    """Map a node name given as text to a graph label (integer labels first)"""
+    try:
+        value = int(text)
+        if value in graph.index:
+            return value
+    except ValueError:
+        pass
+    if text in graph.index:
+        return text
+    raise KeyError(f"unknown node {text!r}")
+
+
+def _label(graph, text):
+    try:
+        return parse_label(graph, text)
+    except KeyError as e:
+        raise SystemExit(f"error: {e.args[0]}")
+
+
+def _json_number(value):
+    return value if np.isfinite(value) else None
+
+
+def add_limit_arguments(parser):
+    """--max-settled/--radius/--time-budget/--max-queue, shared with the query service"""
+    group = parser.add_argument_group("search limits (partial results when reached)")
+    group.add_argument('--max-settled', type=int, metavar='N', help="settle at most N nodes per search")
+    group.add_argument('--radius', type=float, metavar='R', help="only nodes within cost R")
+    group.add_argument('--time-budget', type=float, metavar='SECONDS', help="wall-clock budget per search")
+    group.add_argument('--max-queue', type=int, metavar='N', help="stop when the heap exceeds N entries")
+
+
+def limits_from_args(args):
+    """SearchLimits from add_limit_arguments options, None when none is set"""
+    from .engines import SearchLimits
+    values = (args.max_settled, args.radius, args.time_budget, args.max_queue)
+    if all(value is None for value in values):
+        return None
+    return SearchLimits(*values)
+
+
+def build_parser():
+    from .engines import ENGINES
+
+    parser = argparse.ArgumentParser(
+        prog='run_cli.py',
+        description="Shortest paths on a graph file, without the graphical interface.")
+    parser.add_argument('graph', help="edge list (.txt/.csv), editor list file or save_csr() directory")
+    sources = parser.add_mutually_exclusive_group(required=True)
+    sources.add_argument('--source', nargs='+', metavar='NODE', help="source node(s)")
+    sources.add_argument('--sources-file', metavar='FILE', help="one source node per line")
+    sources.add_argument('--all', action='store_true', help="every node as a source")
+    parser.add_argument('--target', nargs='+', metavar='NODE',
+                        help="point-to-point queries from each source to these nodes")
+    parser.add_argument('--engine', choices=sorted(ENGINES) + list(QUERY_ENGINES),
+                        help="default: vectorized, or spfa when a weight is negative")
+    parser.add_argument('--k', type=int, default=1, metavar='K',
+                        help="with --target: the K shortest paths of every pair")
+    parser.add_argument('--k-method', choices=('yen', 'eppstein'), default='yen',
+                        help="yen: loopless paths (default), eppstein: walks, faster for large K")
+    parser.add_argument('--output', '-o', metavar='PATH',
+                        help="output directory (single/multi-source) or CSV file "
+                             "(point-to-point); JSON lines on stdout otherwise")
+    parser.add_argument('--format', choices=('npy', 'csv', 'parquet'), default='npy',
+                        help="format of the distance/predecessor matrices (default: npy)")
+    parser.add_argument('--paths', action='store_true', help="also write paths.csv")
+    parser.add_argument('--chunk-size', type=int, default=256, help="rows buffered per write")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes (default: 1)")
+    parser.add_argument('--profile', action='store_true', help="print stage timings to stderr")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="also trace memory: tracemalloc peak per stage and estimated sizes of "
+                             "the graph and of one search's engine structures (slower; workers "
+                             "are not traced)")
+    add_limit_arguments(parser)
+    parser.add_argument('--isochrones', action='store_true',
+                        help="with --radius: nodes within R of every source in one shared sweep "
+                             "(--output writes an .npz of sparse membership arrays)")
+    parser.add_argument('--compare', nargs='*', choices=sorted(ENGINES), metavar='ENGINE',
+                        help="race these engines (default: all) against dijkstra from each source, "
+                             "--workers at a time, and report time, settled nodes, relaxations, "
+                             "peak memory and whether the distances match (--output: JSON report)")
+    return parser
+
+
+def main(argv=None):
+    from .negative_weights import NegativeCycleError
+    try:
+        return _main(argv)
+    except NegativeCycleError as e:
+        raise SystemExit("error: negative cycle reachable from the source: "
+                         + " -> ".join(map(str, e.cycle)))
+
+
+def _main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.engine in QUERY_ENGINES and not args.target:
+        raise SystemExit(f"error: --engine {args.engine} needs --target")
+    if args.k > 1 and not args.target:
+        raise SystemExit("error: --k needs --target")
+    profiler = Profiler(args.profile, args.profile_memory)
+    if args.isochrones and (args.radius is None or args.target):
+        raise SystemExit("error: --isochrones needs --radius and no --target")
+    limits = limits_from_args(args)
+    if limits is not None and (args.engine in QUERY_ENGINES or args.k > 1):
+        raise SystemExit("error: search limits apply to single-source engines only")
+    if args.compare is not None and (args.target or args.isochrones or limits is not None):
+        raise SystemExit("error: --compare runs plain single-source searches only")
+
+    with profiler.stage("load graph"):
+        graph = load_graph(args.graph)
+    if args.profile_memory:
+        from .memory_profile import deep_sizeof
+        profiler.sizes("graph", {type(graph).__name__: deep_sizeof(graph)})
+    if args.all:
+        sources = list(graph.labels)
+    elif args.sources_file:
+        with open(args.sources_file) as f:
+            sources = [_label(graph, line.strip()) for line in f if line.strip()]
+    else:
+        sources = [_label(graph, text) for text in args.source]
+
+    if args.compare is not None:
+        from .engine_comparison import compare_engines, format_comparison
+        reports = {}
+        for source in sources:
+            with profiler.stage(f"engine comparison from {source}"):
+                try:
+                    reports[source] = compare_engines(graph, source, args.compare, args.workers)
+                except ValueError as e:
+                    raise SystemExit(f"error: {e}")
+            print(f"source {source}")
+            print(format_comparison(reports[source]))
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump([{'source': source, 'engines': report}
+                           for source, report in reports.items()], f, indent=2)
+        profiler.report()
+        # Non-zero exit status when an engine disagrees with the baseline
+        return int(any(not stats.get('matches', False)
+                       for report in reports.values() for stats in report))
+    elif args.isochrones:
+        from .isochrones import isochrones
+        with profiler.stage(f"isochrones of {len(sources)} source(s)"):
+            result = isochrones(graph, sources, args.radius)
+        if args.output:
+            result.save(args.output)
+        else:
+            for i, source in enumerate(result.sources):
+                nodes, distances = result.row(i)
+                print(json.dumps({'source': source,
+                                  'nodes': [graph.labels[v] for v in nodes.tolist()],
+                                  'distances': [_json_number(d) for d in distances.tolist()]}))
+    elif args.target and args.k > 1:
+        targets = [_label(graph, text) for text in args.target]
+        pairs = [(s, t) for s in sources for t in targets]
+        with profiler.stage(f"{args.k} shortest paths for {len(pairs)} pair(s)"):
+            results = alternative_paths(graph, pairs, args.k, args.k_method, args.workers)
+            if args.output:
+                with open(args.output, 'w', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(['source', 'target', 'rank', 'distance', 'path'])
+                    for source, target, rank, distance, path in results:
+                        writer.writerow([source, target, rank, distance, ' '.join(map(str, path))])
+            else:
+                for source, target, rank, distance, path in results:
+                    print(json.dumps({'source': source, 'target': target, 'rank': rank,
+                                      'distance': _json_number(distance), 'path': path}))
+    elif args.target:
+        targets = [_label(graph, text) for text in args.target]
+        pairs = [(s, t) for s in sources for t in targets]
+        with profiler.stage(f"{len(pairs)} point-to-point queries"):
+            results = point_to_point(graph, pairs, args.engine, args.workers, limits)
+            if args.output:
+                with open(args.output, 'w', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(['source', 'target', 'distance', 'path'])
+                    for source, target, distance, path in results:
+                        writer.writerow([source, target, distance, ' '.join(map(str, path))])
+            else:
+                for source, target, distance, path in results:
+                    print(json.dumps({'source': source, 'target': target,
+                                      'distance': _json_number(distance), 'path': path}))
+    else:
+        if args.profile_memory and sources:
+            engine_structures(graph, sources[0], args.engine, limits, profiler)
+        with profiler.stage(f"{len(sources)} single-source searches"):
+            rows = multi_source(graph, sources, args.engine, args.workers, limits)
+            if args.output:
+                files = export_shortest_paths(graph, sources, args.output, args.format,
+                                              args.chunk_size, paths=args.paths, rows=rows)
+                for path in files:
+                    print(path, file=sys.stderr)
+            else:
+                for source, distances, predecessors in rows:
+                    print(json.dumps({
+                        'source': source,
+                        'distances': {str(label): _json_number(d)
+                                      for label, d in zip(graph.labels, distances.tolist())},
+                    }))
+
+    profiler.report()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
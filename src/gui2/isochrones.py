@@ -0,0 +1,121 @@
+import heapq
+
+import numpy as np
+
+from .csr_graph import CSRGraph
+
+
+class Isochrones:
+    """
+    Nodes within cost `radius` of every source, as compact sparse arrays.
+
+    Row i (source sources[i]) is nodes[indptr[i]:indptr[i + 1]] (indices into
+    graph.labels, sorted) with the matching exact distances, like a CSR
+    matrix of shape (len(sources), number of nodes).
+    """
+
+    def __init__(self, graph, sources, radius, indptr, nodes, distances):
+        self.graph = graph
+        self.sources = list(sources)
+        self.radius = radius
+        self.indptr = indptr
+        self.nodes = nodes
+        self.distances = distances
+
+    def __len__(self):
+        return len(self.sources)
+
+    def row(self, i):
+        """(node indices, distances) reachable from sources[i]"""
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.nodes[start:end], self.distances[start:end]
+
+    def members(self, source):
+        """Labels of the nodes within the radius of source"""
+        nodes, _ = self.row(self.sources.index(source))
+        return [self.graph.labels[i] for i in nodes.tolist()]
+
+    def counts(self):
+        return np.diff(self.indptr)
+
+    def nearest_source(self):
+        """
+        For every node, the row of its closest source within the radius, or -1.
+        Ties go to the earlier source.
+        """
+        rows = np.repeat(np.arange(len(self.sources)), self.counts())
+        order = np.lexsort((rows, self.distances, self.nodes))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = self.nodes[order][1:] != self.nodes[order][:-1]
+        nearest = np.full(self.graph.number_of_nodes(), -1, dtype=np.int64)
+        nearest[self.nodes[order][first]] = rows[order][first]
+        return nearest
+
+    def save(self, path):
+        """Write the arrays to an .npz file"""
+        np.savez(path, sources=np.asarray(self.sources), radius=self.radius,
+                 indptr=self.indptr, nodes=self.nodes, distances=self.distances)
+
+
+def isochrones(graph, sources, radius):
+    """
+    Every node within cost `radius` of each source, in one bounded sweep.
+
+    All sources share one combined frontier: a single heap of
+    (distance, source row, node) labels, settled in distance order whatever
+    source they belong to. Labels are sparse, keyed by (source row, node), so
+    nothing is allocated or scanned beyond the isochrones themselves, and
+    the adjacency of a node is read from the CSR arrays once however many
+    overlapping regions reach it. Work and memory scale with the total size
+    of the isochrones, not with the number of nodes times the number of
+    sources.
+
+    Args:
+        graph: CSRGraph or NetworkX DiGraph with non-negative weights
+        sources: source labels
+        radius: cost bound R (inclusive)
+
+    Returns an Isochrones.
+    """
+    csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph)
+    if csr.has_negative_weight():
+        raise ValueError("Isochrones need non-negative weights")
+    sources = list(sources)
+    n = csr.number_of_nodes()
+
+    # (row * n + node) -> tentative distance of that source's label
+    labels = {}
+    heap = []
+    for row, source in enumerate(sources):
+        node = csr.index[source]
+        labels[row * n + node] = 0.0
+        heap.append((0.0, row, node))
+    heapq.heapify(heap)
+    adjacency = {}
+
+    while heap:
+        distance, row, node = heapq.heappop(heap)
+        if distance > labels[row * n + node]:
+            # Stale entry: the label was improved after it was pushed
+            continue
+        out = adjacency.get(node)
+        if out is None:
+            targets, weights = csr.out_slice(node)
+            out = adjacency[node] = (targets.tolist(), weights.tolist())
+        base = row * n
+        for target, weight in zip(*out):
+            candidate = distance + weight
+            if candidate > radius:
+                continue
+            target_key = base + target
+            if candidate < labels.get(target_key, np.inf):
+                labels[target_key] = candidate
+                heapq.heappush(heap, (candidate, row, target))
+
+    # Membership arrays straight from the touched labels, in row-major order
+    keys = np.fromiter(labels.keys(), dtype=np.int64, count=len(labels))
+    values = np.fromiter(labels.values(), dtype=np.float64, count=len(labels))
+    order = np.argsort(keys, kind='stable')
+    rows, nodes = np.divmod(keys[order], max(n, 1))
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(sources)))))
+    return Isochrones(csr, sources, radius, indptr, nodes, values[order])
@@ -0,0 +1,372 @@
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+
+from .alt_landmarks import reverse_adjacency, shortest_path_tree
+from .dijkstra_algorithm import build_adjacency
+
+
+def _tree_to_target(adjacency, target):
+    """
+    Shortest-path tree towards target: ({node: d(node, target)}, {node: next hop}).
+    Computed once on the reversed graph and shared by every spur search.
+    """
+    reverse = reverse_adjacency(adjacency)
+    reverse.setdefault(target, [])
+    return shortest_path_tree(reverse, target)
+
+
+def _check_weights(adjacency):
+    if any(w < 0 for neighbors in adjacency.values() for _, w in neighbors):
+        raise ValueError("k-shortest paths need non-negative weights")
+
+
+def _edge_weight(adjacency, u, v):
+    return min(w for x, w in adjacency[u] if x == v)
+
+
+def _tree_path(next_hop, node, removed_nodes):
+    """Tree path node -> target, or None when it runs through a removed node"""
+    path = [node]
+    while next_hop[node] is not None:
+        node = next_hop[node]
+        if node in removed_nodes:
+            return None
+        path.append(node)
+    return path
+
+
+def spur_search(adjacency, to_target, next_hop, target, spur, removed_nodes, removed_edges):
+    """
+    Shortest spur -> target path avoiding removed_nodes and the arcs in
+    removed_edges (all of which leave spur). Returns (cost, path) or None.
+
+    Removing nodes and arcs can only lengthen paths, so when the cached tree
+    path from spur is untouched it is the answer without any search. Otherwise
+    the search is an A* guided by the same tree distances, which stay a
+    consistent lower bound on the restricted graph.
+    """
+    first = next_hop.get(spur)
+    if first is not None and (spur, first) not in removed_edges:
+        path = _tree_path(next_hop, spur, removed_nodes)
+        if path is not None:
+            return to_target[spur], path
+    if spur == target:
+        return 0, [spur]
+
+    distances = {spur: 0}
+    parents = {spur: None}
+    queue = [(to_target[spur], 0, spur)]
+    settled = set()
+    while queue:
+        _, dist, node = heapq.heappop(queue)
+        if node in settled:
+            continue
+        if node == target:
+            path = []
+            while node is not None:
+                path.append(node)
+                node = parents[node]
+            return dist, path[::-1]
+        settled.add(node)
+        for neighbor, weight in adjacency[node]:
+            if neighbor in removed_nodes or neighbor not in to_target:
+                continue
+            if node == spur and (spur, neighbor) in removed_edges:
+                continue
+            new_distance = dist + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                parents[neighbor] = node
+                heapq.heappush(queue, (new_distance + to_target[neighbor], new_distance, neighbor))
+    return None
+
+
+# Worker process state, set once by _init_worker
+_worker = None
+
+
+def _init_worker(adjacency, to_target, next_hop, target):
+    global _worker
+    _worker = (adjacency, to_target, next_hop, target)
+
+
+def _spur_job(job):
+    spur, removed_nodes, removed_edges = job
+    return spur_search(*_worker, spur, removed_nodes, removed_edges)
+
+
+class YenKShortestPaths:
+    """
+    Yen's algorithm: loopless paths from source to target by increasing cost.
+
+    Iterating yields (cost, path) lazily, so asking for more alternatives only
+    costs the extra iterations. Spur searches reuse the shortest-path tree
+    towards target (see spur_search); those that still need a search are
+    independent within an iteration and run in `workers` processes.
+    """
+
+    def __init__(self, graph, source, target, workers=1):
+        """
+        Args:
+            graph: CSRGraph or NetworkX DiGraph with non-negative weights
+            workers: processes for the spur searches (1 = in this process)
+        """
+        self.adjacency = build_adjacency(graph)
+        _check_weights(self.adjacency)
+        self.source = source
+        self.target = target
+        self.workers = workers
+        self.to_target, self.next_hop = _tree_to_target(self.adjacency, target)
+        self.executor = None
+
+    def _spur_paths(self, jobs):
+        state = (self.adjacency, self.to_target, self.next_hop, self.target)
+        if self.workers == 1 or len(jobs) < 2:
+            return [spur_search(*state, *job) for job in jobs]
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                initargs=state)
+        return list(self.executor.map(_spur_job, jobs, chunksize=max(1, len(jobs) // (4 * self.workers))))
+
+    def __iter__(self):
+        if self.source not in self.to_target:
+            return
+        first = _tree_path(self.next_hop, self.source, ())
+        found = [first]
+        yield self.to_target[self.source], first
+
+        candidates, seen = [], {tuple(first)}
+        while True:
+            previous = found[-1]
+            # Cost of every prefix of the previous path
+            prefix = [0]
+            for u, v in zip(previous, previous[1:]):
+                prefix.append(prefix[-1] + _edge_weight(self.adjacency, u, v))
+
+            jobs = []
+            for i, spur in enumerate(previous[:-1]):
+                root = previous[:i + 1]
+                removed_edges = {(p[i], p[i + 1]) for p in found
+                                 if len(p) > i + 1 and p[:i + 1] == root}
+                jobs.append((spur, frozenset(root[:-1]), frozenset(removed_edges)))
+
+            for i, result in enumerate(self._spur_paths(jobs)):
+                if result is None:
+                    continue
+                cost, spur_path = result
+                path = previous[:i] + spur_path
+                key = tuple(path)
+                if key not in seen:
+                    seen.add(key)
+                    heapq.heappush(candidates, (prefix[i] + cost, len(path), path))
+
+            if not candidates:
+                return
+            cost, _, path = heapq.heappop(candidates)
+            found.append(path)
+            yield cost, path
+
+    def paths(self, k):
+        """The (up to) k shortest loopless paths as [(cost, path), ...]"""
+        result = []
+        for item in self:
+            result.append(item)
+            if len(result) >= k:
+                break
+        return result
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ImplicitPath:
+    """
+    A path stored as its last sidetrack plus a pointer to the path it extends:
+    O(1) memory per path, expanded to nodes only on demand.
+    """
+
+    __slots__ = ('cost', 'sidetrack', 'parent')
+
+    def __init__(self, cost, sidetrack, parent):
+        self.cost = cost
+        self.sidetrack = sidetrack
+        self.parent = parent
+
+    def sidetracks(self):
+        arcs = []
+        path = self
+        while path is not None and path.sidetrack is not None:
+            arcs.append(path.sidetrack)
+            path = path.parent
+        return arcs[::-1]
+
+
+def _heap_insert(heap, key, item):
+    """Persistent leftist heap insert: nodes are (rank, key, item, left, right), never mutated"""
+    return _heap_merge(heap, (1, key, item, None, None))
+
+
+def _heap_merge(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if b[1] < a[1]:
+        a, b = b, a
+    rank, key, item, left, right = a
+    right = _heap_merge(right, b)
+    if left is None or left[0] < right[0]:
+        left, right = right, left
+    return (1 + (right[0] if right is not None else 0), key, item, left, right)
+
+
+class EppsteinKShortestPaths:
+    """
+    Eppstein-style enumeration of the k shortest source -> target walks.
+
+    Every walk is the tree path towards target with a few sidetracks (arcs
+    off the tree); its cost is d(source) plus the sidetracks' detours. For
+    each node v, H(v) is a persistent heap of the best sidetrack of every
+    node on the tree path from v, sharing structure with H(next(v)), so all
+    heaps together take O(n log n). Walks are then popped from one priority
+    queue over that heap structure and returned as ImplicitPath records.
+
+    Unlike Yen, walks may repeat nodes (they are not loopless), but each
+    further walk costs O(log k) instead of a round of spur searches, which is
+    what makes large k affordable.
+    """
+
+    def __init__(self, graph, source, target):
+        self.adjacency = build_adjacency(graph)
+        _check_weights(self.adjacency)
+        self.source = source
+        self.target = target
+        self.to_target, self.next_hop = _tree_to_target(self.adjacency, target)
+
+        d = self.to_target
+        # Sorted sidetracks out of every node: (detour, u, v)
+        self.outgoing = {}
+        for u in d:
+            tree_arc = self.next_hop[u]
+            arcs = []
+            for v, w in self.adjacency.get(u, ()):
+                if v not in d:
+                    continue
+                if v == tree_arc and w + d[v] == d[u]:
+                    # The tree arc itself is not a sidetrack (only once)
+                    tree_arc = None
+                    continue
+                arcs.append((w + d[v] - d[u], u, v))
+            arcs.sort()
+            self.outgoing[u] = arcs
+
+        # H(v) = H(next(v)) + best sidetrack of v, built breadth-first from
+        # target down the tree so next(v) is always done before v (sorting by
+        # distance does not ensure it once zero-weight arcs make ties)
+        children = {}
+        for u in d:
+            if self.next_hop[u] is not None:
+                children.setdefault(self.next_hop[u], []).append(u)
+        self.heaps = {}
+        order = [target]
+        for u in order:
+            parent_heap = self.heaps.get(self.next_hop[u])
+            arcs = self.outgoing[u]
+            self.heaps[u] = _heap_insert(parent_heap, arcs[0][0], u) if arcs else parent_heap
+            order.extend(children.get(u, ()))
+
+    def __iter__(self):
+        if self.source not in self.to_target:
+            return
+        base = ImplicitPath(self.to_target[self.source], None, None)
+        yield base
+
+        # Queue entries: (cost, tie, heap node, index in that node's sidetrack list, parent path)
+        queue = []
+        counter = 0
+        root = self.heaps.get(self.source)
+        if root is not None:
+            queue.append((base.cost + root[1], counter, root, 0, base))
+        while queue:
+            cost, _, node, j, parent = heapq.heappop(queue)
+            detour, u, v = self.outgoing[node[2]][j]
+            path = ImplicitPath(cost, (u, v), parent)
+            yield path
+
+            successors = []
+            if j == 0:
+                # Other nodes of the same heap replace this sidetrack
+                for child in (node[3], node[4]):
+                    if child is not None:
+                        successors.append((cost - detour + child[1], child, 0, parent))
+            if j + 1 < len(self.outgoing[node[2]]):
+                # The next sidetrack out of the same node replaces it
+                successors.append((cost - detour + self.outgoing[node[2]][j + 1][0], node, j + 1, parent))
+            head_heap = self.heaps.get(v)
+            if head_heap is not None:
+                # A further sidetrack after this one
+                successors.append((cost + head_heap[1], head_heap, 0, path))
+            for entry in successors:
+                counter += 1
+                heapq.heappush(queue, (entry[0], counter) + entry[1:])
+
+    def expand(self, path):
+        """Node list of an ImplicitPath"""
+        nodes = [self.source]
+        for u, v in path.sidetracks():
+            while nodes[-1] != u:
+                nodes.append(self.next_hop[nodes[-1]])
+            nodes.append(v)
+        while nodes[-1] != self.target:
+            nodes.append(self.next_hop[nodes[-1]])
+        return nodes
+
+    def paths(self, k):
+        """The (up to) k shortest walks as [(cost, path), ...]"""
+        result = []
+        for path in self:
+            result.append((path.cost, self.expand(path)))
+            if len(result) >= k:
+                break
+        return result
+
+
+def k_shortest_paths(graph, source, target, k, method='yen', workers=1):
+    """
+    The k shortest source -> target paths as [(cost, [nodes]), ...].
+
+    Args:
+        method: 'yen' (loopless paths) or 'eppstein' (walks, faster for large k)
+        workers: processes for Yen's spur searches
+    """
+    if method == 'eppstein':
+        return EppsteinKShortestPaths(graph, source, target).paths(k)
+    if method != 'yen':
+        raise ValueError(f"Unknown k-shortest paths method: {method}")
+    with YenKShortestPaths(graph, source, target, workers) as yen:
+        return yen.paths(k)
+
+
+if __name__ == '__main__':
+    # python -m src.gui2.k_shortest_paths : regression check on zero-weight
+    # ties, where node 0 and its tree parent 1 are both at distance 0 from
+    # the target. Building H(0) before H(1) used to lose the sidetrack 2 -> 0
+    # and skip every walk through the zero-weight cycle.
+    from .csr_graph import CSRGraph
+
+    graph = CSRGraph.from_edges([(0, 1, 0), (1, 2, 0), (2, 0, 0), (0, 2, 2)])
+    walks = k_shortest_paths(graph, 0, 2, 4, method='eppstein')
+    for cost, path in walks:
+        print(f"{cost}  {path}")
+    assert walks == [(0, [0, 1, 2]), (0, [0, 1, 2, 0, 1, 2]),
+                     (0, [0, 1, 2, 0, 1, 2, 0, 1, 2]), (0, [0, 1, 2, 0, 1, 2, 0, 1, 2, 0, 1, 2])], walks
+    assert k_shortest_paths(graph, 0, 2, 4) == [(0, [0, 1, 2]), (2, [0, 2])]
+    print("ok")
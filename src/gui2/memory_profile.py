@@ -0,0 +1,173 @@
+import sys
+import tracemalloc
+import types
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# Shared code and types, never counted as part of a structure
+_SKIPPED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Estimated bytes held by obj and everything it references: NumPy arrays
+    count their buffer, containers and plain objects (__dict__/__slots__)
+    are followed. Objects already in `seen` (a set of ids) are not counted
+    again, so several structures can share one seen set.
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    pending = [obj]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen or isinstance(item, _SKIPPED):
+            continue
+        seen.add(id(item))
+        if isinstance(item, np.ndarray):
+            # An array owning its buffer includes it in getsizeof; a view
+            # leads to the array that owns it
+            total += sys.getsizeof(item)
+            if item.base is not None:
+                pending.append(item.base)
+            continue
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            pending.extend(item)
+        elif not isinstance(item, (str, bytes, int, float, complex, bool)):
+            if hasattr(item, '__dict__'):
+                pending.append(item.__dict__)
+            for slot in getattr(type(item), '__slots__', ()):
+                if hasattr(item, slot):
+                    pending.append(getattr(item, slot))
+    return total
+
+
+def engine_footprint(engine, graph=None):
+    """
+    Estimated bytes of the structures of a step engine, as an ordered dict:
+    its own graph copy (0 when it shares `graph`), distances, predecessors,
+    visited set and priority queue. A queue that has been drained shows its
+    final size; the largest it reached is in the tracemalloc stage peaks.
+    """
+    seen = set() if graph is None else {id(graph)}
+    parts = {}
+    own_graph = getattr(engine, 'csr', None)
+    if own_graph is None:
+        own_graph = engine.graph
+    parts['graph copy'] = 0 if own_graph is graph else deep_sizeof(own_graph, seen)
+    if hasattr(engine, 'dist') and getattr(engine, 'csr', None) is not None:
+        parts['distances'] = engine.dist.nbytes
+        parts['predecessors'] = engine.pred.nbytes
+        parts['visited'] = engine.settled.nbytes
+        if engine.mode == 'delta':
+            parts['queue'] = deep_sizeof(engine._buckets, seen) + engine._light.nbytes + engine._heavy.nbytes
+        else:
+            parts['queue'] = deep_sizeof(engine._heap, seen)
+    else:
+        parts['distances'] = deep_sizeof(engine.distances, seen)
+        parts['predecessors'] = deep_sizeof(engine.predecessors, seen)
+        parts['visited'] = deep_sizeof(engine.visited, seen)
+        queue = getattr(engine, '_deque', None)
+        parts['queue'] = deep_sizeof(queue if queue is not None else engine.queue, seen)
+    return parts
+
+
+def artists_footprint(figure):
+    """
+    Estimated bytes of the data held by the matplotlib artists of a figure:
+    collection offsets and paths, line data and image arrays. Only the
+    drawing data is counted, not the artists' own Python objects.
+    """
+    total = 0
+    for axes in figure.axes:
+        for artist in axes.get_children():
+            if hasattr(artist, 'get_offsets'):
+                total += np.asarray(artist.get_offsets()).nbytes
+            if hasattr(artist, 'get_paths'):
+                total += sum(path.vertices.nbytes for path in artist.get_paths())
+            if hasattr(artist, 'get_xydata'):
+                total += np.asarray(artist.get_xydata()).nbytes
+            if hasattr(artist, 'get_array') and artist.get_array() is not None:
+                total += np.asarray(artist.get_array()).nbytes
+    return total
+
+
+class MemoryTracker:
+    """
+    tracemalloc peaks per named stage.
+
+    Each stage records the largest traced allocation above its starting
+    point (peak) and what it left allocated (growth); a stage run several
+    times keeps its largest peak, its total growth and a call count. Stages
+    may nest: an inner stage resets the tracemalloc peak, but the outer one
+    still sees it. When tracemalloc is not tracing, stage() does nothing, so
+    callers can keep their stages in place at no cost.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._stack = []
+        self._started = False
+
+    @property
+    def active(self):
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+
+    def stop(self):
+        """Stop tracing if start() began it (recorded stages are kept)"""
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+        self._stack = []
+
+    def reset(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        if not tracemalloc.is_tracing():
+            yield
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1][1] = max(self._stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        entry = [current, current]
+        self._stack.append(entry)
+        try:
+            yield
+        finally:
+            if tracemalloc.is_tracing() and self._stack and self._stack[-1] is entry:
+                self._stack.pop()
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, entry[1])
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], peak)
+                calls, largest, growth = self.stages.get(name, (0, 0, 0))
+                self.stages[name] = (calls + 1, max(largest, peak - entry[0]),
+                                     growth + current - entry[0])
+
+    def peak(self, name):
+        """Largest peak of a stage in bytes, 0 if it never ran"""
+        return self.stages.get(name, (0, 0, 0))[1]
+
+
+def format_bytes(size, units=('B', 'KB', 'MB', 'GB')):
+    """Human-readable size; units names bytes, then each step of 1024"""
+    for unit in units[:-1]:
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == units[0] else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} {units[-1]}"
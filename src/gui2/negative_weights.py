@@ -0,0 +1,211 @@
+import heapq
+from collections import deque
+
+from .dijkstra_algorithm import build_adjacency
+
+
+class NegativeCycleError(ValueError):
+    def __init__(self, cycle):
+        super().__init__(f"Cycle absorbant détecté : {' -> '.join(map(str, cycle))}")
+        self.cycle = cycle
+
+    def __reduce__(self):
+        # Rebuilt from the cycle when sent back by a worker process
+        return type(self), (self.cycle,)
+
+
+def has_negative_weight(adjacency):
+    return any(w < 0 for neighbors in adjacency.values() for _, w in neighbors)
+
+
+def _extract_cycle(predecessors, node, node_count):
+    # Walking back n times guarantees we end up on the cycle itself
+    for _ in range(node_count):
+        node = predecessors[node]
+    cycle = [node]
+    current = predecessors[node]
+    while current != node:
+        cycle.append(current)
+        current = predecessors[current]
+    cycle.append(node)
+    cycle.reverse()
+    return cycle
+
+
+class SPFAStepByStep:
+    """
+    Queue-based Bellman-Ford (SPFA) with the Small Label First and Large Label
+    Last heuristics. Handles negative weights and stops with self.negative_cycle
+    set when a cycle of negative total weight is reachable from the source.
+    Exposes the same step interface as DijkstraStepByStep.
+    """
+
+    def __init__(self, graph, source):
+        self.source = source
+
+        self.graph = build_adjacency(graph)
+        self.distances = {node: float('inf') for node in self.graph}
+        self.distances[source] = 0
+        self.predecessors = {node: None for node in self.graph}
+        self.visited = set()
+        self.current_node = None
+        self.finished = False
+        self.negative_cycle = None
+        # Arcs examined so far (a node's out-edges count again at every scan)
+        self.relaxations = 0
+
+        self._deque = deque([source])
+        self._in_queue = {source}
+        self._queued_sum = 0
+        self._edge_count = {source: 0}
+
+    @property
+    def queue(self):
+        return [(self.distances[n], n) for n in self._deque]
+
+    def has_next(self):
+        return not self.finished
+
+    def _pop(self):
+        # LLL: rotate nodes whose label is above the queue average to the back
+        average = self._queued_sum / len(self._deque)
+        for _ in range(len(self._deque)):
+            if self.distances[self._deque[0]] <= average:
+                break
+            self._deque.rotate(-1)
+        node = self._deque.popleft()
+        self._in_queue.discard(node)
+        self._queued_sum -= self.distances[node]
+        return node
+
+    def _push(self, node):
+        self._in_queue.add(node)
+        self._queued_sum += self.distances[node]
+        # SLF: a label smaller than the front's goes to the front
+        if self._deque and self.distances[node] < self.distances[self._deque[0]]:
+            self._deque.appendleft(node)
+        else:
+            self._deque.append(node)
+
+    def step_forward(self):
+        if not self._deque:
+            self.finished = True
+            self.current_node = None
+            return
+
+        current_node = self._pop()
+        self.current_node = current_node
+        self.visited.add(current_node)
+        current_distance = self.distances[current_node]
+
+        self.relaxations += len(self.graph[current_node])
+        for neighbor, weight in self.graph[current_node]:
+            new_distance = current_distance + weight
+            if new_distance < self.distances[neighbor]:
+                if neighbor in self._in_queue:
+                    self._queued_sum += new_distance - self.distances[neighbor]
+                self.distances[neighbor] = new_distance
+                self.predecessors[neighbor] = current_node
+                self._edge_count[neighbor] = self._edge_count[current_node] + 1
+                if self._edge_count[neighbor] >= len(self.graph):
+                    self.negative_cycle = _extract_cycle(
+                        self.predecessors, neighbor, len(self.graph))
+                    self.finished = True
+                    return
+                if neighbor not in self._in_queue:
+                    self._push(neighbor)
+
+        if not self._deque:
+            self.finished = True
+
+    def run(self):
+        while self.has_next():
+            self.step_forward()
+        if self.negative_cycle is not None:
+            raise NegativeCycleError(self.negative_cycle)
+        return self.distances
+
+    def get_current_state(self):
+        return {
+            'distances': dict(self.distances),
+            'visited': set(self.visited),
+            'current_node': self.current_node,
+            'predecessors': dict(self.predecessors),
+        }
+
+
+def johnson_potentials(adjacency):
+    """
+    Bellman-Ford from a virtual node joined to every node with weight 0.
+    Returns h such that w(u, v) + h(u) - h(v) >= 0 for every edge.
+    """
+    potentials = {node: 0 for node in adjacency}
+    queue = deque(adjacency)
+    in_queue = set(adjacency)
+    edge_count = {node: 0 for node in adjacency}
+    predecessors = {node: None for node in adjacency}
+    while queue:
+        u = queue.popleft()
+        in_queue.discard(u)
+        for v, w in adjacency[u]:
+            if potentials[u] + w < potentials[v]:
+                potentials[v] = potentials[u] + w
+                predecessors[v] = u
+                edge_count[v] = edge_count[u] + 1
+                if edge_count[v] >= len(adjacency):
+                    raise NegativeCycleError(
+                        _extract_cycle(predecessors, v, len(adjacency)))
+                if v not in in_queue:
+                    in_queue.add(v)
+                    queue.append(v)
+    return potentials
+
+
+class JohnsonAllPairs:
+    """
+    All-pairs shortest paths with Johnson's reweighting: one Bellman-Ford pass
+    computes potentials, then every source runs plain Dijkstra on the
+    non-negative reduced weights. Raises NegativeCycleError on absorbing cycles.
+    """
+
+    def __init__(self, graph):
+        self.graph = build_adjacency(graph)
+        if has_negative_weight(self.graph):
+            self.potentials = johnson_potentials(self.graph)
+        else:
+            self.potentials = {node: 0 for node in self.graph}
+        h = self.potentials
+        self.reduced = {
+            u: [(v, w + h[u] - h[v]) for v, w in neighbors]
+            for u, neighbors in self.graph.items()
+        }
+
+    def distances_from(self, source):
+        """Return (distances, predecessors) from source with the original weights"""
+        distances = {node: float('inf') for node in self.reduced}
+        predecessors = {node: None for node in self.reduced}
+        distances[source] = 0
+        visited = set()
+        queue = [(0, source)]
+        while queue:
+            dist, node = heapq.heappop(queue)
+            if node in visited:
+                continue
+            visited.add(node)
+            for neighbor, weight in self.reduced[node]:
+                new_distance = dist + weight
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    predecessors[neighbor] = node
+                    heapq.heappush(queue, (new_distance, neighbor))
+        h = self.potentials
+        for node, dist in distances.items():
+            if dist != float('inf'):
+                distances[node] = dist - h[source] + h[node]
+        return distances, predecessors
+
+    def matrix(self, sources=None):
+        """Return {source: {node: distance}} for the given sources (all nodes by default)"""
+        if sources is None:
+            sources = list(self.graph)
+        return {s: self.distances_from(s)[0] for s in sources}
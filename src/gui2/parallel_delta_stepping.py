@@ -0,0 +1,167 @@
+import os
+import time
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from .csr_graph import CSRGraph
+from .vectorized_dijkstra import VectorizedDijkstra, gather_out_edges, min_per_target
+
+# Arrays attached by each worker process (see _attach_worker)
+_shared = {}
+
+
+def _share(array):
+    """Copy an array into a new shared memory block, return (block, view)"""
+    block = SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[...] = array
+    return block, view
+
+
+def _attach_worker(specs):
+    for name, (block_name, shape, dtype) in specs.items():
+        block = SharedMemory(name=block_name)
+        _shared[name] = (block, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+
+
+def _relax_chunk(args):
+    nodes, mask_name = args
+    csr = CSRGraph.__new__(CSRGraph)
+    csr.indptr = _shared['indptr'][1]
+    csr.indices = _shared['indices'][1]
+    csr.weights = _shared['weights'][1]
+    dist = _shared['dist'][1]
+    sources, targets, weights = gather_out_edges(csr, nodes, _shared[mask_name][1])
+    sources, targets, candidates = min_per_target(sources, targets, dist[sources] + weights)
+    improved = candidates < dist[targets]
+    return sources[improved], targets[improved], candidates[improved], len(weights)
+
+
+class ParallelDeltaStepping(VectorizedDijkstra):
+    """
+    Delta-stepping where the light and heavy relaxations of each bucket are
+    split across worker processes. The CSR arrays and the distance array live
+    in shared memory, so workers only receive frontier node ids and send back
+    their improved (source, target, distance) triples; the parent merges them
+    with a min-reduction, which keeps the result identical to Dijkstra.
+
+    After each step self.phases[-1] describes the bucket that was just settled
+    (bucket index, light rounds, nodes settled, edges relaxed, distance updates,
+    elapsed seconds) so the visualizer can animate bucket by bucket.
+
+    The pool and the shared memory are only set up when a batch first reaches
+    min_parallel_edges, so small graphs never start a process. They are
+    released when the search finishes, by close(), or on leaving a with
+    block:
+
+        with ParallelDeltaStepping(graph, source) as engine:
+            distances = engine.run()
+    """
+
+    def __init__(self, graph, source, delta=None, workers=None, min_parallel_edges=20000):
+        """
+        Args:
+            graph: NetworkX DiGraph or CSRGraph with non-negative weights
+            source: source node label
+            delta: bucket width (None = max weight / average degree)
+            workers: number of worker processes (None = CPU count)
+            min_parallel_edges: batches with fewer out-edges are relaxed in-process
+        """
+        super().__init__(graph, source, mode='delta', delta=delta)
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_edges = min_parallel_edges
+        self.phases = []
+        self._phase = None
+        self._pool = None
+        self._blocks = {}
+
+    def _start_pool(self):
+        """Copy the arrays into shared memory and start the workers"""
+        specs = {}
+        arrays = {
+            'indptr': self.csr.indptr, 'indices': self.csr.indices,
+            'weights': self.csr.weights, 'light': self._light,
+            'heavy': self._heavy, 'dist': self.dist,
+        }
+        for name, array in arrays.items():
+            block, view = _share(array)
+            self._blocks[name] = block
+            specs[name] = (block.name, array.shape, array.dtype)
+            if name == 'dist':
+                # The parent writes distances straight into shared memory
+                self.dist = view
+        self._pool = Pool(self.workers, initializer=_attach_worker, initargs=(specs,))
+
+    def _candidates(self, nodes, weight_mask):
+        mask_name = 'light' if weight_mask is self._light else 'heavy'
+        counts = self.csr.indptr[nodes + 1] - self.csr.indptr[nodes]
+        if int(counts.sum()) < self.min_parallel_edges:
+            sources, targets, weights = gather_out_edges(self.csr, nodes, weight_mask)
+            self._phase['relaxations'] += len(weights)
+            self.relaxations += len(weights)
+            return min_per_target(sources, targets, self.dist[sources] + weights)
+        if self._pool is None:
+            self._start_pool()
+
+        # Split so that every worker gets roughly the same number of edges
+        cumulative = np.cumsum(counts)
+        bounds = np.searchsorted(cumulative, np.linspace(0, cumulative[-1], self.workers + 1)[1:-1])
+        chunks = [c for c in np.split(nodes, bounds) if len(c)]
+        results = self._pool.map(_relax_chunk, [(c, mask_name) for c in chunks])
+        self._phase['relaxations'] += sum(r[3] for r in results)
+        self.relaxations += sum(r[3] for r in results)
+        return min_per_target(np.concatenate([r[0] for r in results]),
+                              np.concatenate([r[1] for r in results]),
+                              np.concatenate([r[2] for r in results]))
+
+    def _relax_batch(self, nodes, weight_mask):
+        if weight_mask is self._light:
+            self._phase['light_rounds'] += 1
+        updates = super()._relax_batch(nodes, weight_mask)
+        self._phase['updates'] += updates
+        return updates
+
+    def _step_bucket(self):
+        self._phase = {'bucket': None, 'light_rounds': 0, 'settled': 0,
+                       'relaxations': 0, 'updates': 0, 'seconds': 0.0}
+        start = time.perf_counter()
+        super()._step_bucket()
+        if self.current_bucket:
+            self._phase['bucket'] = int(self.dist[self.csr.index[self.current_node]] // self.delta)
+            self._phase['settled'] = len(self.current_bucket)
+            self._phase['seconds'] = time.perf_counter() - start
+            self.phases.append(self._phase)
+        if self.finished:
+            self.close()
+
+    def run(self):
+        while self.has_next():
+            self.step_forward()
+        return self.distances
+
+    def close(self):
+        """Stop the workers and release shared memory if they were started (distances are kept)"""
+        if self._pool is None:
+            return
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+        self.dist = np.array(self.dist)
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
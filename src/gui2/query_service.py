@@ -0,0 +1,448 @@
+"""
+Local HTTP/JSON shortest-path service (asyncio, standard library only).
+
+The graph is loaded and preprocessed once; requests are answered from warm
+state on keep-alive connections:
+
+    GET  /route?s=0&t=42            {"source", "target", "distance", "path", "ms"}
+    GET  /matrix?sources=0,1&targets=5,6
+    POST /matrix  {"sources": [...], "targets": [...]}
+                                    {"sources", "targets", "distances": [[...]], "ms"}
+    GET  /metrics                   request latencies, cache and connection counters
+    GET  /health
+
+With --engine ch, /route uses Contraction Hierarchies in the event loop (a
+query settles a few hundred nodes). Everything else is served from cached
+single-source trees; missing trees are computed in a process pool (or a
+thread when --workers is 1), and concurrent requests for the same source
+share one computation.
+
+    python -m src.gui2.query_service graph.txt --port 8765 --engine ch --workers 4
+    python -m src.gui2.query_service graph.txt --self-test 500
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import random
+import socket
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from .headless import (_init_worker, _solve, add_limit_arguments, limits_from_args,
+                       load_graph, parse_label, solve_source, walk_path)
+from .negative_weights import NegativeCycleError
+
+ENDPOINTS = ('/route', '/matrix', '/metrics', '/health')
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           422: 'Unprocessable Entity', 500: 'Internal Server Error'}
+
+
+class LatencyMetrics:
+    """
+    Per-endpoint latency samples (last `window` requests) and counters.
+    Paths outside `endpoints` all count under 'other', so clients cannot
+    grow the tables by requesting arbitrary paths.
+    """
+
+    def __init__(self, window=10000, endpoints=ENDPOINTS):
+        self.endpoints = frozenset(endpoints)
+        self.samples = {endpoint: deque(maxlen=window) for endpoint in (*endpoints, 'other')}
+        self.counts = dict.fromkeys(self.samples, 0)
+        self.errors = dict.fromkeys(self.samples, 0)
+        self.connections = 0
+        self.requests = 0
+        self.started = time.time()
+
+    def record(self, endpoint, seconds, status):
+        if endpoint not in self.endpoints:
+            endpoint = 'other'
+        self.samples[endpoint].append(seconds)
+        self.counts[endpoint] += 1
+        self.requests += 1
+        if status >= 400:
+            self.errors[endpoint] += 1
+
+    def summary(self):
+        endpoints = {}
+        for endpoint, samples in self.samples.items():
+            if not samples:
+                continue
+            ms = np.asarray(samples) * 1000
+            endpoints[endpoint] = {
+                'count': self.counts[endpoint],
+                'errors': self.errors[endpoint],
+                'mean_ms': round(float(ms.mean()), 3),
+                'p50_ms': round(float(np.percentile(ms, 50)), 3),
+                'p95_ms': round(float(np.percentile(ms, 95)), 3),
+                'p99_ms': round(float(np.percentile(ms, 99)), 3),
+                'max_ms': round(float(ms.max()), 3),
+            }
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'connections': self.connections,
+            'requests': self.requests,
+            'requests_per_connection': round(self.requests / max(self.connections, 1), 2),
+            'endpoints': endpoints,
+        }
+
+
+class QueryService:
+    """
+    Keeps a graph, an optional Contraction Hierarchy and an LRU of
+    single-source trees warm between requests.
+
+    Args:
+        graph: CSRGraph
+        engine: 'ch' to answer /route with Contraction Hierarchies, otherwise
+                an engines.ENGINES name (None: automatic) used for the trees
+        workers: size of the process pool computing trees (1: a worker thread)
+        cache_size: number of single-source trees kept in memory
+        limits: SearchLimits applied to every tree, so that one pathological
+                query cannot exhaust a worker; nodes beyond them read as unreachable
+
+    A source that reaches a negative cycle has no shortest paths: its queries
+    are answered with a 422 error naming the cycle.
+    """
+
+    def __init__(self, graph, engine=None, workers=1, cache_size=64, idle_timeout=30, limits=None):
+        self.graph = graph
+        self.tree_engine = None if engine == 'ch' else engine
+        self.cache_size = cache_size
+        self.idle_timeout = idle_timeout
+        self.limits = limits
+        self.trees = OrderedDict()
+        self.inflight = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.metrics = LatencyMetrics()
+
+        self.hierarchy = None
+        if engine == 'ch':
+            if graph.has_negative_weight():
+                raise ValueError("Contraction Hierarchies need non-negative weights")
+            from .contraction_hierarchies import ContractionHierarchy
+            self.hierarchy = ContractionHierarchy(graph)
+
+        if workers and workers > 1:
+            # Each worker process keeps its own copy in headless' worker globals
+            self.executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                                initargs=(graph, self.tree_engine, limits))
+            self._solve = _solve
+        else:
+            # In this process the graph stays on the instance, so several
+            # services (or a headless run) never overwrite each other's state
+            self.executor = ThreadPoolExecutor(max_workers=1)
+            self._solve = self._solve_here
+
+    def _solve_here(self, source):
+        return solve_source(self.graph, source, self.tree_engine, self.limits)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    async def tree(self, source):
+        """(distances, predecessors) arrays for source, from the cache or the pool"""
+        if source in self.trees:
+            self.cache_hits += 1
+            self.trees.move_to_end(source)
+            return self.trees[source]
+        if source not in self.inflight:
+            self.cache_misses += 1
+            future = asyncio.get_running_loop().run_in_executor(self.executor, self._solve, source)
+            self.inflight[source] = future
+            try:
+                _, distances, predecessors = await future
+            finally:
+                del self.inflight[source]
+            self.trees[source] = (distances, predecessors)
+            while len(self.trees) > self.cache_size:
+                self.trees.popitem(last=False)
+            return distances, predecessors
+        # Another request is already computing this tree
+        self.cache_hits += 1
+        _, distances, predecessors = await asyncio.shield(self.inflight[source])
+        return distances, predecessors
+
+    async def route(self, source, target):
+        if self.hierarchy is not None:
+            distance, path = self.hierarchy.query(source, target)
+        else:
+            distances, predecessors = await self.tree(source)
+            distance = distances[self.graph.index[target]].item()
+            path = walk_path(self.graph, predecessors, target) if np.isfinite(distance) else []
+        return {'source': source, 'target': target,
+                'distance': distance if np.isfinite(distance) else None, 'path': path}
+
+    async def matrix(self, sources, targets):
+        columns = np.array([self.graph.index[t] for t in targets], dtype=np.int64)
+        trees = await asyncio.gather(*(self.tree(s) for s in dict.fromkeys(sources)))
+        rows = dict(zip(dict.fromkeys(sources), trees))
+        distances = [[d if np.isfinite(d) else None
+                      for d in rows[s][0][columns].tolist()] for s in sources]
+        return {'sources': sources, 'targets': targets, 'distances': distances}
+
+    def status(self):
+        summary = self.metrics.summary()
+        summary.update({
+            'nodes': self.graph.number_of_nodes(),
+            'edges': self.graph.number_of_edges(),
+            'cached_trees': len(self.trees),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        })
+        return summary
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def _labels(self, values):
+        if isinstance(values, str):
+            values = [v for v in values.split(',') if v]
+        return [parse_label(self.graph, str(v)) for v in values]
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == '/route':
+            if 's' not in query or 't' not in query:
+                return 400, {'error': "usage: /route?s=<node>&t=<node>"}
+            source, target = self._labels([query['s'], query['t']])
+            return 200, await self.route(source, target)
+        if url.path == '/matrix':
+            if method == 'POST':
+                query = json.loads(body or b'{}')
+            elif method != 'GET':
+                return 405, {'error': "use GET or POST"}
+            if 'sources' not in query or 'targets' not in query:
+                return 400, {'error': "sources and targets are required"}
+            return 200, await self.matrix(self._labels(query['sources']),
+                                          self._labels(query['targets']))
+        if url.path == '/metrics':
+            return 200, self.status()
+        if url.path == '/health':
+            return 200, {'status': 'ok'}
+        return 404, {'error': f"unknown endpoint {url.path}"}
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until it is closed or idle"""
+        self.metrics.connections += 1
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+                started = time.perf_counter()
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+
+                try:
+                    status, payload = await self.dispatch(method, target, body)
+                except NegativeCycleError as e:
+                    status, payload = 422, {'error': "negative cycle reachable from the source",
+                                            'cycle': e.cycle}
+                except (KeyError, ValueError) as e:
+                    status, payload = 400, {'error': str(e.args[0] if e.args else e)}
+                except Exception as e:
+                    status, payload = 500, {'error': repr(e)}
+                elapsed = time.perf_counter() - started
+                if isinstance(payload, dict) and status == 200 and 'error' not in payload:
+                    payload.setdefault('ms', round(elapsed * 1000, 3))
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' \
+                    else connection == 'keep-alive'
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode('latin-1') + data)
+                await writer.drain()
+                self.metrics.record(urlsplit(target).path, elapsed, status)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765, unix_path=None):
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle_connection, unix_path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def serve_in_thread(service, host='127.0.0.1', port=0):
+    """Run service on a background event loop; returns (port, stop function)"""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    holder = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        server = loop.run_until_complete(service.start(host, port))
+        holder['server'] = server
+        holder['port'] = server.sockets[0].getsockname()[1]
+        ready.set()
+        loop.run_forever()
+        loop.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    ready.wait()
+
+    async def shutdown():
+        holder['server'].close()
+        # Drop idle keep-alive connections before the loop goes away
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await holder['server'].wait_closed()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    return holder['port'], stop
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__('localhost')
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_path)
+
+
+class QueryClient:
+    """Minimal client reusing one keep-alive connection (TCP or Unix socket)"""
+
+    def __init__(self, host='127.0.0.1', port=8765, unix_path=None):
+        if unix_path:
+            self.connection = _UnixHTTPConnection(unix_path)
+        else:
+            self.connection = http.client.HTTPConnection(host, port)
+
+    def _request(self, method, url, payload=None):
+        body = json.dumps(payload) if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body else {}
+        self.connection.request(method, url, body=body, headers=headers)
+        response = self.connection.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"{response.status}: {data.get('error')}")
+        return data
+
+    def route(self, source, target):
+        return self._request('GET', f'/route?s={source}&t={target}')
+
+    def matrix(self, sources, targets):
+        return self._request('POST', '/matrix', {'sources': list(sources),
+                                                 'targets': list(targets)})
+
+    def metrics(self):
+        return self._request('GET', '/metrics')
+
+    def close(self):
+        self.connection.close()
+
+
+def self_test(service, queries=200, seed=0):
+    """Fire random /route and /matrix queries at service over one connection"""
+    port, stop = serve_in_thread(service)
+    client = QueryClient(port=port)
+    labels = service.graph.labels
+    rng = random.Random(seed)
+    # A small pool of sources, so that repeated queries hit the tree cache
+    sources = rng.sample(labels, min(8, len(labels)))
+    try:
+        started = time.perf_counter()
+        for _ in range(queries):
+            client.route(rng.choice(sources), rng.choice(labels))
+        client.matrix(sources, rng.sample(labels, min(16, len(labels))))
+        elapsed = time.perf_counter() - started
+        print(f"{queries} routes + 1 matrix in {elapsed:.3f}s over one connection")
+        print(json.dumps(client.metrics(), indent=2))
+    finally:
+        client.close()
+        stop()
+
+
+def main(argv=None):
+    from .engines import ENGINES
+
+    parser = argparse.ArgumentParser(description="Local shortest-path HTTP service.")
+    parser.add_argument('graph', help="graph file, see headless.load_graph()")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help="listen on a Unix socket instead")
+    parser.add_argument('--engine', choices=sorted(ENGINES) + ['ch'])
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--cache-size', type=int, default=64, help="cached single-source trees")
+    parser.add_argument('--self-test', type=int, metavar='N',
+                        help="serve on a free port, run N test queries and exit")
+    add_limit_arguments(parser)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        service = QueryService(load_graph(args.graph), args.engine, args.workers, args.cache_size,
+                               limits=limits_from_args(args))
+    except ValueError as e:
+        raise SystemExit(f"error: {e}")
+    print(f"Graph ready in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    try:
+        if args.self_test:
+            self_test(service, args.self_test)
+            return 0
+
+        async def serve():
+            server = await service.start(args.host, args.port, args.unix)
+            where = args.unix or f"http://{args.host}:{args.port}"
+            print(f"Listening on {where}", file=sys.stderr)
+            async with server:
+                await server.serve_forever()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
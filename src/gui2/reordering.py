@@ -0,0 +1,209 @@
+import time
+from collections import deque
+
+import numpy as np
+
+from .csr_graph import CSRGraph
+
+
+def _symmetric_csr(graph):
+    """Undirected view (indptr, indices) of a CSRGraph, used to walk neighbourhoods"""
+    n = graph.number_of_nodes()
+    sources = np.repeat(np.arange(n), np.diff(graph.indptr))
+    u = np.concatenate((sources, graph.indices))
+    v = np.concatenate((graph.indices, sources))
+    keys = np.unique(u * n + v)
+    u, v = keys // n, keys % n
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(u, minlength=n), out=indptr[1:])
+    return indptr, v
+
+
+def bfs_order(graph, start=None):
+    """Breadth-first numbering (undirected), one component after the other"""
+    return _breadth_first(graph, start, by_degree=False)
+
+
+def cuthill_mckee_order(graph, reverse=True):
+    """(Reverse) Cuthill-McKee: BFS from a minimum-degree node, neighbours by increasing degree"""
+    order = _breadth_first(graph, None, by_degree=True)
+    return order[::-1].copy() if reverse else order
+
+
+def _breadth_first(graph, start, by_degree):
+    n = graph.number_of_nodes()
+    indptr, indices = _symmetric_csr(graph)
+    degree = np.diff(indptr)
+    visited = np.zeros(n, dtype=bool)
+    order = np.empty(n, dtype=np.int64)
+    count = 0
+    starts = np.argsort(degree, kind='stable') if by_degree else np.arange(n)
+    if start is not None:
+        starts = np.concatenate(([graph.index[start]], starts))
+    for root in starts.tolist():
+        if visited[root]:
+            continue
+        visited[root] = True
+        queue = deque([root])
+        while queue:
+            u = queue.popleft()
+            order[count] = u
+            count += 1
+            neighbors = indices[indptr[u]:indptr[u + 1]]
+            neighbors = neighbors[~visited[neighbors]]
+            if by_degree:
+                neighbors = neighbors[np.argsort(degree[neighbors], kind='stable')]
+            visited[neighbors] = True
+            queue.extend(neighbors.tolist())
+    return order
+
+
+def hilbert_order(coordinates, bits=16):
+    """
+    Order nodes along a Hilbert curve through their (x, y) coordinates.
+
+    Args:
+        coordinates: array of shape (n, 2), in node index order
+        bits: grid resolution (2**bits cells per axis)
+    """
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    side = 1 << bits
+    low = coordinates.min(axis=0)
+    span = np.maximum(coordinates.max(axis=0) - low, 1e-12)
+    cells = ((coordinates - low) / span * (side - 1)).astype(np.int64)
+    x, y = cells[:, 0].copy(), cells[:, 1].copy()
+    d = np.zeros(len(cells), dtype=np.int64)
+    s = side // 2
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        swap = ~ry
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        s //= 2
+    return np.argsort(d, kind='stable')
+
+
+def reorder(graph, order):
+    """
+    Renumber the nodes of a CSRGraph so that new index i is old index order[i].
+
+    Labels travel with their nodes, so graph.labels / graph.index still map
+    original labels both ways. The returned graph also carries old_of_new and
+    new_of_old index arrays.
+    """
+    n = graph.number_of_nodes()
+    old_of_new = np.asarray(order, dtype=np.int64)
+    new_of_old = np.empty(n, dtype=np.int64)
+    new_of_old[old_of_new] = np.arange(n)
+
+    old_sources = np.repeat(np.arange(n), np.diff(graph.indptr))
+    sources = new_of_old[old_sources]
+    targets = new_of_old[graph.indices]
+    # Rows in the new order, targets ascending inside each row
+    edge_order = np.lexsort((targets, sources))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+    labels = [graph.labels[i] for i in old_of_new.tolist()]
+    reordered = CSRGraph(labels, indptr, targets[edge_order], graph.weights[edge_order])
+    reordered.old_of_new = old_of_new
+    reordered.new_of_old = new_of_old
+    return reordered
+
+
+def reordered(graph, method='rcm', coordinates=None):
+    """
+    Return graph renumbered for cache locality.
+
+    Args:
+        graph: CSRGraph
+        method: 'rcm' (reverse Cuthill-McKee), 'bfs' or 'hilbert'
+        coordinates: {label: (x, y)} or an (n, 2) array, required for 'hilbert'
+    """
+    if method == 'hilbert':
+        if coordinates is None:
+            raise ValueError("La méthode 'hilbert' nécessite des coordonnées")
+        if isinstance(coordinates, dict):
+            coordinates = [coordinates[label] for label in graph.labels]
+        order = hilbert_order(coordinates)
+    elif method == 'bfs':
+        order = bfs_order(graph)
+    elif method == 'rcm':
+        order = cuthill_mckee_order(graph)
+    else:
+        raise ValueError(f"Unknown reordering method: {method}")
+    return reorder(graph, order)
+
+
+def mean_edge_span(graph):
+    """Average |u - v| over all edges: a cheap proxy for adjacency locality"""
+    sources = np.repeat(np.arange(graph.number_of_nodes()), np.diff(graph.indptr))
+    return float(np.abs(sources - graph.indices).mean()) if len(sources) else 0.0
+
+
+def benchmark(graph, source, methods=('rcm', 'bfs'), coordinates=None, engine='vectorized'):
+    """
+    Time a full run of an engine on graph before and after each reordering.
+
+    Args:
+        engine: a create_engine() name, or 'external' for ExternalDijkstra
+                with a small block cache (where locality matters most)
+        coordinates: {label: (x, y)}, required for 'hilbert'
+
+    Returns [(name, edge span, reorder seconds, run seconds), ...].
+    """
+    import tempfile
+    from .engines import create_engine
+    from .external_memory import ExternalDijkstra, save_csr
+
+    def run(g):
+        start = time.perf_counter()
+        if engine == 'external':
+            with tempfile.TemporaryDirectory() as directory:
+                save_csr(g, directory)
+                runner = ExternalDijkstra(directory, source, max_blocks=8, block_size=1024)
+                runner.run()
+                runner.close()
+        else:
+            runner = create_engine(g, source, engine)
+            while runner.has_next():
+                runner.step_forward()
+        return time.perf_counter() - start
+
+    # Start from a shuffled numbering, like ids typed in by hand
+    shuffled = reorder(graph, np.random.default_rng(0).permutation(graph.number_of_nodes()))
+    results = [('shuffled', mean_edge_span(shuffled), 0.0, run(shuffled))]
+    for method in methods:
+        start = time.perf_counter()
+        candidate = reordered(shuffled, method, coordinates)
+        elapsed = time.perf_counter() - start
+        results.append((method, mean_edge_span(candidate), elapsed, run(candidate)))
+    return results
+
+
+if __name__ == '__main__':
+    # python -m src.gui2.reordering : road-like random geometric graph
+    rng = np.random.default_rng(1)
+    n = 200000
+    points = rng.random((n, 2))
+    cells = (points * 300).astype(np.int64)
+    buckets = np.argsort(cells[:, 0] * 300 + cells[:, 1], kind='stable')
+    u = np.concatenate((buckets[:-1], buckets[1:]))
+    v = np.concatenate((buckets[1:], buckets[:-1]))
+    extra = rng.integers(0, n, (n, 2))
+    near = np.abs(points[extra[:, 0]] - points[extra[:, 1]]).sum(axis=1) < 0.05
+    u = np.concatenate((u, extra[near, 0]))
+    v = np.concatenate((v, extra[near, 1]))
+    weights = np.maximum(1, (np.abs(points[u] - points[v]).sum(axis=1) * 1000).astype(np.int64))
+    graph = CSRGraph.from_arrays(u, v, weights)
+    coords = {label: points[label] for label in graph.labels}
+    print(f"{graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
+    for engine in ('vectorized', 'external'):
+        print(f"engine: {engine}")
+        for name, span, seconds, run_seconds in benchmark(
+                graph, graph.labels[0], ('rcm', 'bfs', 'hilbert'), coords, engine):
+            print(f"  {name:<10} edge span {span:12.1f}  "
+                  f"reorder {seconds:6.2f}s  run {run_seconds:6.2f}s")
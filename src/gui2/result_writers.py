@@ -0,0 +1,259 @@
+import csv
+import os
+
+import numpy as np
+
+from .negative_weights import NegativeCycleError
+
+
+def distance_row(graph, engine):
+    """
+    Distances of a finished engine as a float64 array aligned with graph.labels
+    (always a copy: callers may overwrite it without touching the engine)
+    """
+    if getattr(engine, 'csr', None) is graph:
+        return np.array(engine.dist, dtype=np.float64)
+    distances = engine.distances
+    return np.array([distances.get(label, np.inf) for label in graph.labels], dtype=np.float64)
+
+
+def predecessor_row(graph, engine):
+    """Predecessor indices (into graph.labels, -1 for none) of a finished engine, as a copy"""
+    if getattr(engine, 'csr', None) is graph:
+        return np.array(engine.pred, dtype=np.int64)
+    predecessors = engine.predecessors
+    return np.array([graph.index[p] if p is not None else -1
+                     for p in (predecessors.get(label) for label in graph.labels)],
+                    dtype=np.int64)
+
+
+def settled_row(graph, engine):
+    """Boolean array aligned with graph.labels: nodes whose distance is final"""
+    if getattr(engine, 'csr', None) is graph:
+        return np.asarray(engine.settled, dtype=bool)
+    visited = engine.visited
+    return np.array([label in visited for label in graph.labels], dtype=bool)
+
+
+class RowWriter:
+    """
+    Streams one row per source to disk, chunk_size rows at a time.
+
+    Formats:
+        'npy'     - (sources, nodes) array written through np.lib.format.open_memmap
+                    (the number of rows must be known up front)
+        'csv'     - header 'source,<label>,...' then one line per source
+        'parquet' - long table (source, node, <column>) with one line per source
+                    and node, one row group per chunk (needs pyarrow); source
+                    and node are dictionary-encoded labels
+    """
+
+    def __init__(self, path, labels, dtype=np.float64, fmt=None, rows=None, chunk_size=256,
+                 column='value'):
+        self.path = path
+        self.labels = list(labels)
+        self.dtype = np.dtype(dtype)
+        self.format = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+        self.chunk_size = chunk_size
+        self.sources = []
+        self.buffer = []
+        self.written = 0
+
+        if self.format == 'npy':
+            if rows is None:
+                raise ValueError("The npy format needs the number of rows up front")
+            self.array = np.lib.format.open_memmap(
+                path, mode='w+', dtype=self.dtype, shape=(rows, len(self.labels)))
+            self.source_path = os.path.splitext(path)[0] + '_sources.npy'
+        elif self.format == 'csv':
+            self.file = open(path, 'w', newline='')
+            self.csv = csv.writer(self.file)
+            self.csv.writerow(['source'] + self.labels)
+        elif self.format == 'parquet':
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+            self.pyarrow = pyarrow
+            label_type = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+            self.schema = pyarrow.schema([
+                pyarrow.field('source', label_type),
+                pyarrow.field('node', label_type),
+                pyarrow.field(column, pyarrow.from_numpy_dtype(self.dtype))])
+            self.node_labels = pyarrow.array([str(label) for label in self.labels])
+            self.parquet = pyarrow.parquet.ParquetWriter(path, self.schema)
+        else:
+            raise ValueError(f"Unknown export format: {self.format}")
+
+    def write(self, source, row):
+        self.buffer.append(np.asarray(row, dtype=self.dtype))
+        self.sources.append(source)
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        block = np.vstack(self.buffer)
+        if self.format == 'npy':
+            self.array[self.written:self.written + len(block)] = block
+            self.array.flush()
+        elif self.format == 'csv':
+            for source, values in zip(self.sources[-len(block):], block.tolist()):
+                self.csv.writerow([source] + values)
+            self.file.flush()
+        else:
+            pa = self.pyarrow
+            rows, nodes = block.shape
+            sources = pa.DictionaryArray.from_arrays(
+                pa.array(np.repeat(np.arange(rows, dtype=np.int32), nodes)),
+                pa.array([str(s) for s in self.sources[-rows:]]))
+            node_column = pa.DictionaryArray.from_arrays(
+                pa.array(np.tile(np.arange(nodes, dtype=np.int32), rows)), self.node_labels)
+            self.parquet.write_table(pa.Table.from_arrays(
+                [sources, node_column, pa.array(block.ravel())], schema=self.schema))
+        self.written += len(block)
+        self.buffer = []
+        if self.format != 'npy':
+            # Only npy needs the source list, kept in a side file at close()
+            self.sources = []
+
+    def close(self):
+        self.flush()
+        if self.format == 'npy':
+            np.save(self.source_path, np.asarray(self.sources))
+            del self.array
+        elif self.format == 'csv':
+            self.file.close()
+        else:
+            self.parquet.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PathListWriter:
+    """Streams shortest paths as CSV lines: source,target,distance,'n0 n1 ... nk'"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='')
+        self.csv = csv.writer(self.file)
+        self.csv.writerow(['source', 'target', 'distance', 'path'])
+
+    def write_tree(self, graph, source, distances, predecessors, targets=None):
+        """
+        Write the path to every reachable target from index arrays.
+
+        Args:
+            distances: float array aligned with graph.labels
+            predecessors: int array of predecessor indices (-1 for none)
+            targets: labels to export (all reachable nodes by default)
+        """
+        labels = graph.labels
+        if targets is None:
+            indices = np.flatnonzero(np.isfinite(distances)).tolist()
+        else:
+            indices = [graph.index[t] for t in targets]
+        pred = predecessors.tolist() if hasattr(predecessors, 'tolist') else predecessors
+        for t in indices:
+            if not np.isfinite(distances[t]):
+                continue
+            path = []
+            node = t
+            while node != -1 and len(path) <= len(labels):
+                path.append(labels[node])
+                node = pred[node]
+            path.reverse()
+            self.csv.writerow([source, labels[t], distances[t].item(), ' '.join(map(str, path))])
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_source_rows(graph, sources, engine=None, limits=None, on_stop=None):
+    """
+    Yield (source, distances, predecessors) arrays, one single-source search at a time.
+
+    With limits (a SearchLimits) only the settled nodes of a search are
+    reported, the others read inf / -1, and on_stop(source, reason) is called
+    for every search cut short by a limit.
+
+    Raises NegativeCycleError when a cycle of negative total weight is
+    reachable from a source: its distances would be meaningless.
+    """
+    from .engines import create_engine
+
+    if engine is None:
+        engine = 'spfa' if graph.has_negative_weight() else 'vectorized'
+    for source in sources:
+        runner = create_engine(graph, source, engine, limits=limits)
+        while runner.has_next():
+            runner.step_forward()
+        if getattr(runner, 'negative_cycle', None) is not None:
+            raise NegativeCycleError(runner.negative_cycle)
+        distances, predecessors = distance_row(graph, runner), predecessor_row(graph, runner)
+        if limits is not None:
+            unsettled = ~settled_row(graph, runner)
+            distances[unsettled] = np.inf
+            predecessors[unsettled] = -1
+            if runner.stopped_by not in (None, 'radius') and on_stop is not None:
+                on_stop(source, runner.stopped_by)
+        yield source, distances, predecessors
+
+
+def export_shortest_paths(graph, sources, directory, fmt='npy', chunk_size=256,
+                          predecessors=True, paths=False, engine=None, rows=None):
+    """
+    Run one single-source search per source and stream the results to directory:
+    distances.<fmt>, predecessors.<fmt> (indices into graph.labels) and
+    optionally paths.csv (npy also writes a <name>_sources.npy row index).
+    Only chunk_size rows are ever held in memory.
+
+    rows can supply precomputed (source, distances, predecessors) tuples in
+    the order of sources, e.g. from a process pool; by default they come from
+    iter_source_rows().
+
+    Returns the list of files written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    sources = list(sources)
+    if rows is None:
+        rows = iter_source_rows(graph, sources, engine)
+
+    files = [os.path.join(directory, f'distances.{fmt}')]
+    distance_writer = RowWriter(files[-1], graph.labels, np.float64, fmt,
+                                rows=len(sources), chunk_size=chunk_size, column='distance')
+    predecessor_writer = path_writer = None
+    if predecessors:
+        files.append(os.path.join(directory, f'predecessors.{fmt}'))
+        predecessor_writer = RowWriter(files[-1], graph.labels, np.int64, fmt,
+                                       rows=len(sources), chunk_size=chunk_size,
+                                       column='predecessor')
+    if paths:
+        files.append(os.path.join(directory, 'paths.csv'))
+        path_writer = PathListWriter(files[-1])
+
+    try:
+        for source, distances, pred in rows:
+            distance_writer.write(source, distances)
+            if predecessor_writer is not None:
+                predecessor_writer.write(source, pred)
+            if path_writer is not None:
+                path_writer.write_tree(graph, source, distances, pred)
+    finally:
+        distance_writer.close()
+        if predecessor_writer is not None:
+            predecessor_writer.close()
+        if path_writer is not None:
+            path_writer.close()
+    return files
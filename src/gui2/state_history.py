@@ -0,0 +1,223 @@
+import numpy as np
+
+
+class StateSnapshot:
+    """
+    One engine state as flat arrays aligned with a label list:
+    distances float64, predecessors int32 (-1 for none), visited as a
+    packed bitset and the current node index (-1 for none).
+    """
+
+    __slots__ = ('distances', 'predecessors', 'visited', 'current')
+
+    def __init__(self, distances, predecessors, visited, current):
+        self.distances = distances
+        self.predecessors = predecessors
+        self.visited = visited
+        self.current = current
+
+    @classmethod
+    def capture(cls, engine, labels, index):
+        """
+        Snapshot of a step engine. CSR engines are copied array to array;
+        dict-based engines are read once through their attributes rather than
+        through get_current_state(), which would copy every container first.
+        """
+        current = index[engine.current_node] if engine.current_node is not None else -1
+        if hasattr(engine, 'dist') and getattr(engine, 'csr', None) is not None:
+            return cls(np.array(engine.dist, dtype=np.float64),
+                       np.asarray(engine.pred, dtype=np.int32),
+                       np.packbits(engine.settled), current)
+        inf = float('inf')
+        distances = engine.distances
+        predecessors = engine.predecessors
+        return cls(
+            np.array([distances.get(label, inf) for label in labels], dtype=np.float64),
+            np.array([-1 if p is None else index[p]
+                      for p in (predecessors.get(label) for label in labels)], dtype=np.int32),
+            np.packbits(np.array([label in engine.visited for label in labels], dtype=bool)),
+            current)
+
+    def visited_mask(self):
+        return np.unpackbits(self.visited, count=len(self.distances)).astype(bool)
+
+    def to_state(self, labels):
+        """The same dict as get_current_state()"""
+        preds = self.predecessors.tolist()
+        return {
+            'distances': dict(zip(labels, self.distances.tolist())),
+            'visited': {labels[i] for i in np.flatnonzero(self.visited_mask()).tolist()},
+            'current_node': labels[self.current] if self.current >= 0 else None,
+            'predecessors': {label: (labels[p] if p >= 0 else None) for label, p in zip(labels, preds)},
+        }
+
+    @property
+    def nbytes(self):
+        return self.distances.nbytes + self.predecessors.nbytes + self.visited.nbytes
+
+
+class StateDelta:
+    """Difference between two consecutive snapshots: only the entries that changed"""
+
+    __slots__ = ('changed', 'distances', 'predecessors', 'flipped', 'current')
+
+    def __init__(self, previous, snapshot):
+        self.changed = np.flatnonzero((snapshot.distances != previous.distances)
+                                      | (snapshot.predecessors != previous.predecessors)).astype(np.int32)
+        self.distances = snapshot.distances[self.changed]
+        self.predecessors = snapshot.predecessors[self.changed]
+        # Visited bits that changed, found on the packed bytes first
+        bytes_changed = np.flatnonzero(snapshot.visited != previous.visited)
+        bits = np.unpackbits((snapshot.visited ^ previous.visited)[bytes_changed]).reshape(-1, 8)
+        rows, columns = np.nonzero(bits)
+        self.flipped = (bytes_changed[rows] * 8 + columns).astype(np.int32)
+        self.current = snapshot.current
+
+    @classmethod
+    def from_changes(cls, changed, distances, predecessors, flipped, current):
+        """Delta built from entries already known to have changed"""
+        delta = cls.__new__(cls)
+        delta.changed = changed
+        delta.distances = distances
+        delta.predecessors = predecessors
+        delta.flipped = flipped
+        delta.current = current
+        return delta
+
+    def apply(self, distances, predecessors, visited):
+        """Replay the delta in place on unpacked arrays"""
+        distances[self.changed] = self.distances
+        predecessors[self.changed] = self.predecessors
+        visited[self.flipped] = ~visited[self.flipped]
+
+    @property
+    def nbytes(self):
+        return (self.changed.nbytes + self.distances.nbytes
+                + self.predecessors.nbytes + self.flipped.nbytes)
+
+
+class StateHistory:
+    """
+    Every state of a run, stored as full keyframes plus per-step deltas.
+
+    A new keyframe is only taken once the deltas since the previous one
+    weigh as much as a keyframe, so memory stays within about twice the size
+    of the changes themselves (plus the first keyframe), and rebuilding any
+    step replays at most one keyframe's worth of deltas. Moving forward from
+    the last rebuilt step only applies the deltas in between.
+
+    Dict-based engines (DijkstraStepByStep, SPFAStepByStep) are only read at
+    the nodes a step can change, the current node and its out-neighbours,
+    against a live copy of the last state, so recording a step costs
+    O(degree) instead of O(n). CSR engines are copied and diffed array to
+    array.
+    """
+
+    def __init__(self, labels):
+        """
+        Args:
+            labels: node labels; snapshot arrays follow this order
+        """
+        self.labels = list(labels)
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.entries = []
+        self.keyframes = []
+        self._last = None
+        self._since_keyframe = 0
+        self._cursor = None
+        # Unpacked (distances, predecessors, visited) of the last state,
+        # kept while a dict-based engine is being recorded step by step
+        self._live = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def record(self, engine):
+        """Append the current state of engine (reached by one step from the last one recorded)"""
+        # CSR engines build their .distances dict on demand: test them first
+        by_node = getattr(engine, 'csr', None) is None and isinstance(
+            getattr(engine, 'distances', None), dict)
+        if by_node and self._live is not None:
+            self._record_step(engine)
+            return
+        snapshot = StateSnapshot.capture(engine, self.labels, self.index)
+        self.append(snapshot)
+        if by_node:
+            self._live = (snapshot.distances.copy(), snapshot.predecessors.copy(),
+                          snapshot.visited_mask())
+
+    def _record_step(self, engine):
+        distances, predecessors, visited = self._live
+        node = engine.current_node
+        touched = [] if node is None else list(dict.fromkeys(
+            [node] + [neighbor for neighbor, _ in engine.graph[node]]))
+        positions = np.array([self.index[v] for v in touched], dtype=np.int32)
+        inf = float('inf')
+        new_distances = np.array([engine.distances.get(v, inf) for v in touched], dtype=np.float64)
+        new_predecessors = np.array([-1 if p is None else self.index[p]
+                                     for p in (engine.predecessors.get(v) for v in touched)],
+                                    dtype=np.int32)
+        new_visited = np.array([v in engine.visited for v in touched], dtype=bool)
+
+        changed = (new_distances != distances[positions]) | (new_predecessors != predecessors[positions])
+        flipped = positions[new_visited != visited[positions]]
+        distances[positions] = new_distances
+        predecessors[positions] = new_predecessors
+        visited[positions] = new_visited
+        current = self.index[node] if node is not None else -1
+
+        # append() diffs against _last, which this path does not keep up to date
+        self._last = None
+        if self._since_keyframe >= self._keyframe_nbytes:
+            self._add(StateSnapshot(distances.copy(), predecessors.copy(),
+                                    np.packbits(visited), current))
+        else:
+            self._add(StateDelta.from_changes(positions[changed], new_distances[changed],
+                                              new_predecessors[changed], flipped, current))
+
+    def append(self, snapshot):
+        self._live = None
+        if self._last is None or self._since_keyframe >= snapshot.nbytes:
+            self._add(snapshot)
+        else:
+            self._add(StateDelta(self._last, snapshot))
+        self._last = snapshot
+
+    @property
+    def _keyframe_nbytes(self):
+        n = len(self.labels)
+        return n * (8 + 4) + (n + 7) // 8
+
+    def _add(self, entry):
+        if isinstance(entry, StateSnapshot):
+            self.keyframes.append(len(self.entries))
+            self._since_keyframe = 0
+        else:
+            self._since_keyframe += entry.nbytes
+        self.entries.append(entry)
+
+    def __getitem__(self, step):
+        """Rebuild the StateSnapshot of a step (negative steps count from the end)"""
+        if step < 0:
+            step += len(self.entries)
+        if not 0 <= step < len(self.entries):
+            raise IndexError(step)
+        keyframe = self.keyframes[np.searchsorted(self.keyframes, step, side='right') - 1]
+        cursor = self._cursor
+        if cursor is not None and keyframe <= cursor[0] <= step:
+            start, distances, predecessors, visited = cursor
+        else:
+            start = keyframe
+            base = self.entries[keyframe]
+            distances = base.distances.copy()
+            predecessors = base.predecessors.copy()
+            visited = base.visited_mask()
+        for delta in self.entries[start + 1:step + 1]:
+            delta.apply(distances, predecessors, visited)
+        self._cursor = (step, distances, predecessors, visited)
+        current = self.entries[step].current
+        return StateSnapshot(distances.copy(), predecessors.copy(), np.packbits(visited), current)
+
+    @property
+    def nbytes(self):
+        return sum(entry.nbytes for entry in self.entries)
@@ -0,0 +1,274 @@
+from collections import OrderedDict
+import math
+import queue
+
+import numpy as np
+from matplotlib.colors import to_rgb
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+TAILLE_TUILE = 256
+
+
+def _decouper(debut, fin, taille):
+    """Découpe (Liang-Barsky) des segments au carré [0, taille]², en pixels"""
+    t0 = np.zeros(len(debut))
+    t1 = np.ones(len(debut))
+    delta = fin - debut
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for k in (0, 1):
+            a = (0 - debut[:, k]) / delta[:, k]
+            b = (taille - debut[:, k]) / delta[:, k]
+            plat = delta[:, k] == 0
+            dehors = plat & ((debut[:, k] < 0) | (debut[:, k] > taille))
+            t0 = np.where(plat, np.where(dehors, np.inf, t0), np.maximum(t0, np.minimum(a, b)))
+            t1 = np.where(plat, t1, np.minimum(t1, np.maximum(a, b)))
+    garder = t0 <= t1
+    return (debut + t0[:, None] * delta)[garder], (debut + t1[:, None] * delta)[garder]
+
+
+def rasteriser_tuile(segments, boites, xy, etendue, couleurs, taille=TAILLE_TUILE):
+    """
+    Dessine la partie du graphe statique contenue dans `etendue` en une image RGBA.
+
+    Args:
+        segments: tableau (m, 2, 2) des arêtes
+        boites: tableau (m, 4) xmin, xmax, ymin, ymax de chaque arête
+        xy: tableau (n, 2) des positions des nœuds
+        etendue: (x0, x1, y0, y1) de la tuile en coordonnées du graphe
+        couleurs: dict avec les clés 'arete' et 'noeud'
+
+    Rastérisation NumPy (pas d'artistes matplotlib, sûr dans un thread) : les
+    arêtes découpées à la tuile sont échantillonnées à un point par pixel et
+    leur densité par pixel donne l'opacité, comme des traits superposés.
+    """
+    x0, x1, y0, y1 = etendue
+    echelle = taille / (x1 - x0)
+    origine = np.array([x0, y0])
+    image = np.zeros((taille, taille, 4))
+
+    dedans = (boites[:, 1] >= x0) & (boites[:, 0] <= x1) & (boites[:, 3] >= y0) & (boites[:, 2] <= y1)
+    if dedans.any():
+        morceaux = (segments[dedans] - origine) * echelle
+        debut, fin = _decouper(morceaux[:, 0], morceaux[:, 1], taille)
+        nb = np.ceil(np.hypot(*(fin - debut).T)).astype(np.int64) + 1
+        quel = np.repeat(np.arange(len(nb)), nb)
+        rang = np.arange(nb.sum()) - np.repeat(np.cumsum(nb) - nb, nb)
+        fraction = (rang / np.maximum(nb - 1, 1)[quel])[:, None]
+        points = debut[quel] + fraction * (fin - debut)[quel]
+        px = np.clip(points[:, 0].astype(np.int64), 0, taille - 1)
+        py = np.clip(taille - 1 - points[:, 1].astype(np.int64), 0, taille - 1)
+        densite = np.bincount(py * taille + px, minlength=taille * taille).reshape(taille, taille)
+        image[..., :3] = to_rgb(couleurs['arete'])
+        image[..., 3] = 1 - 0.65 ** densite
+
+    marge = (x1 - x0) * 0.02
+    points = xy[(xy[:, 0] >= x0 - marge) & (xy[:, 0] <= x1 + marge)
+                & (xy[:, 1] >= y0 - marge) & (xy[:, 1] <= y1 + marge)]
+    if len(points):
+        # Des points plus gros quand la tuile en contient peu (zoom profond)
+        rayon = int(np.clip(np.sqrt(3000.0 / len(points)) / 2, 0, 6))
+        px = ((points[:, 0] - x0) * echelle).astype(np.int64)
+        py = taille - 1 - ((points[:, 1] - y0) * echelle).astype(np.int64)
+        noeuds = np.zeros((taille, taille), dtype=bool)
+        for dx in range(-rayon, rayon + 1):
+            for dy in range(-rayon, rayon + 1):
+                if dx * dx + dy * dy <= rayon * rayon:
+                    qx, qy = px + dx, py + dy
+                    ok = (qx >= 0) & (qx < taille) & (qy >= 0) & (qy < taille)
+                    noeuds[qy[ok], qx[ok]] = True
+        image[noeuds] = (*to_rgb(couleurs['noeud']), 1.0)
+    return (image * 255).astype(np.uint8)
+
+
+class TileCache:
+    """Tuiles rendues {(niveau, tx, ty): image}, éviction LRU au-delà de `capacite`"""
+
+    def __init__(self, capacite=256):
+        self.capacite = capacite
+        self.tuiles = OrderedDict()
+
+    def __contains__(self, cle):
+        return cle in self.tuiles
+
+    def get(self, cle):
+        image = self.tuiles.get(cle)
+        if image is not None:
+            self.tuiles.move_to_end(cle)
+        return image
+
+    def put(self, cle, image):
+        self.tuiles[cle] = image
+        self.tuiles.move_to_end(cle)
+        while len(self.tuiles) > self.capacite:
+            # Le niveau 0 sert de repli pour toute la vue : jamais évincé
+            ancienne = next(cle for cle in self.tuiles if cle[0] != 0)
+            del self.tuiles[ancienne]
+
+    def octets(self):
+        return sum(image.nbytes for image in self.tuiles.values())
+
+
+class TileWorker(QThread):
+    """Rend les tuiles demandées hors du thread de l'interface (dernière demande d'abord)"""
+
+    tuile_prete = pyqtSignal(object)
+
+    def __init__(self, segments, boites, xy, couleurs, parent=None):
+        super().__init__(parent)
+        self.segments = segments
+        self.boites = boites
+        self.xy = xy
+        self.couleurs = couleurs
+        self.demandes = queue.LifoQueue()
+
+    def demander(self, cle, etendue):
+        self.demandes.put((cle, etendue))
+
+    def vider(self):
+        """Oublie les demandes en attente (la vue a changé)"""
+        try:
+            while True:
+                self.demandes.get_nowait()
+        except queue.Empty:
+            pass
+
+    def arreter(self):
+        self.vider()
+        self.demandes.put(None)
+        self.wait()
+
+    def run(self):
+        while True:
+            demande = self.demandes.get()
+            if demande is None:
+                return
+            cle, etendue = demande
+            image = rasteriser_tuile(self.segments, self.boites, self.xy, etendue, self.couleurs)
+            self.tuile_prete.emit((cle, image))
+
+
+class TiledBackground:
+    """
+    Fond statique en tuiles multi-résolution pour les très grands graphes.
+
+    Le niveau z découpe le carré englobant en 2^z x 2^z tuiles de 256 px.
+    À chaque changement de vue (zoom, déplacement de la NavigationToolbar),
+    seules les tuiles visibles du niveau adapté sont affichées, sous forme
+    d'images ; celles qui manquent sont demandées au TileWorker et remplacées
+    en attendant par la tuile ancêtre la plus fine déjà en cache. Le niveau 0
+    est rendu tout de suite, si bien que la vue n'est jamais vide.
+    """
+
+    def __init__(self, axes, canvas, graph, xy, couleurs, capacite=256):
+        """
+        Args:
+            graph: CSRGraph
+            xy: tableau (n, 2) des positions, dans l'ordre de graph.labels
+            couleurs: dict avec les clés 'arete' et 'noeud'
+            capacite: nombre maximal de tuiles gardées en mémoire
+        """
+        self.axes = axes
+        self.canvas = canvas
+        self.xy = xy
+        n = len(xy)
+        origines = np.repeat(np.arange(n), np.diff(graph.indptr))
+        segments = np.stack((xy[origines], xy[graph.indices]), axis=1)
+        boites = np.column_stack((segments[:, :, 0].min(axis=1), segments[:, :, 0].max(axis=1),
+                                  segments[:, :, 1].min(axis=1), segments[:, :, 1].max(axis=1)))
+
+        # Carré englobant, pour des tuiles carrées avec un aspect 'equal'
+        bas, haut = xy.min(axis=0), xy.max(axis=0)
+        self.cote = max((haut - bas).max(), 1e-9) * 1.04
+        self.origine = (bas + haut) / 2 - self.cote / 2
+        self.niveau_max = int(np.clip(np.ceil(np.log2(max(np.sqrt(n), 1) / 4)), 0, 12))
+
+        self.cache = TileCache(capacite)
+        self.images = {}
+        self.niveau = 0
+        self.cache.put((0, 0, 0), rasteriser_tuile(segments, boites, xy, self.etendue((0, 0, 0)), couleurs))
+
+        self.worker = TileWorker(segments, boites, xy, couleurs)
+        self.worker.tuile_prete.connect(self._sur_tuile_prete)
+        self.worker.start()
+        self.en_attente = set()
+
+        x0, x1, y0, y1 = self.etendue((0, 0, 0))
+        # imshow ne doit pas modifier la vue choisie par l'utilisateur
+        axes.set_autoscale_on(False)
+        axes.set_xlim(x0, x1)
+        axes.set_ylim(y0, y1)
+        self._cids = [axes.callbacks.connect('xlim_changed', self._sur_changement_vue),
+                      axes.callbacks.connect('ylim_changed', self._sur_changement_vue)]
+        self.mettre_a_jour_vue()
+
+    def etendue(self, cle):
+        niveau, tx, ty = cle
+        pas = self.cote / (1 << niveau)
+        x0 = self.origine[0] + tx * pas
+        y0 = self.origine[1] + ty * pas
+        return (x0, x0 + pas, y0, y0 + pas)
+
+    def niveau_pour_vue(self):
+        """Niveau dont les tuiles ont à peu près la résolution de l'écran"""
+        x0, x1 = self.axes.get_xlim()
+        largeur_px = max(self.axes.bbox.width, 1)
+        largeur = max(abs(x1 - x0), 1e-12)
+        niveau = math.ceil(math.log2(max(self.cote * largeur_px / (largeur * TAILLE_TUILE), 1)))
+        return min(max(niveau, 0), self.niveau_max)
+
+    def tuiles_visibles(self, niveau):
+        x0, x1 = sorted(self.axes.get_xlim())
+        y0, y1 = sorted(self.axes.get_ylim())
+        pas = self.cote / (1 << niveau)
+        dernier = (1 << niveau) - 1
+        tx = range(max(int((x0 - self.origine[0]) // pas), 0), min(int((x1 - self.origine[0]) // pas), dernier) + 1)
+        ty = range(max(int((y0 - self.origine[1]) // pas), 0), min(int((y1 - self.origine[1]) // pas), dernier) + 1)
+        return [(niveau, i, j) for i in tx for j in ty]
+
+    def _ancetre_en_cache(self, cle):
+        niveau, tx, ty = cle
+        while niveau > 0:
+            niveau, tx, ty = niveau - 1, tx // 2, ty // 2
+            if (niveau, tx, ty) in self.cache:
+                return (niveau, tx, ty)
+        return (0, 0, 0)
+
+    def _sur_changement_vue(self, axes):
+        self.mettre_a_jour_vue()
+
+    def mettre_a_jour_vue(self):
+        """Choisit le niveau adapté à la vue et demande les tuiles qui manquent"""
+        self.niveau = self.niveau_pour_vue()
+        manquantes = [cle for cle in self.tuiles_visibles(self.niveau) if cle not in self.cache]
+        self.worker.vider()
+        self.en_attente = set(manquantes)
+        for cle in manquantes:
+            self.worker.demander(cle, self.etendue(cle))
+        self._afficher()
+
+    def _afficher(self):
+        """Une image par tuile visible, ou par ancêtre en cache en attendant"""
+        voulues = {cle if cle in self.cache else self._ancetre_en_cache(cle)
+                   for cle in self.tuiles_visibles(self.niveau)}
+        for cle in list(self.images):
+            if cle not in voulues:
+                self.images.pop(cle).remove()
+        for cle in voulues - set(self.images):
+            # Les ancêtres (flous) passent sous les tuiles plus fines
+            self.images[cle] = self.axes.imshow(
+                self.cache.get(cle), extent=self.etendue(cle), origin='upper',
+                interpolation='bilinear', zorder=0.5 + cle[0] / 100, aspect='auto')
+
+    def _sur_tuile_prete(self, resultat):
+        cle, image = resultat
+        self.cache.put(cle, image)
+        if cle in self.en_attente:
+            self.en_attente.discard(cle)
+            self._afficher()
+            self.canvas.draw_idle()
+
+    def fermer(self):
+        for cid in self._cids:
+            self.axes.callbacks.disconnect(cid)
+        self.worker.arreter()
@@ -0,0 +1,218 @@
+import heapq
+
+import numpy as np
+
+from .csr_graph import CSRGraph
+
+
+def gather_out_edges(csr, nodes, weight_mask=None):
+    """
+    Concatenate the CSR slices of several nodes without a Python loop.
+
+    Returns (sources, targets, weights) arrays, optionally restricted to the
+    edges whose weight satisfies weight_mask (a boolean array over csr.weights).
+    """
+    starts = csr.indptr[nodes]
+    counts = csr.indptr[nodes + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.float64)
+    sources = np.repeat(nodes, counts)
+    # Position of every edge inside the flat CSR arrays
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    positions = np.repeat(starts, counts) + offsets
+    if weight_mask is not None:
+        keep = weight_mask[positions]
+        sources, positions = sources[keep], positions[keep]
+    return sources, csr.indices[positions], csr.weights[positions]
+
+
+def min_per_target(sources, targets, candidates):
+    """Keep the smallest candidate distance for each target (ties: lowest source)"""
+    order = np.lexsort((sources, candidates, targets))
+    targets, candidates, sources = targets[order], candidates[order], sources[order]
+    first = np.ones(len(targets), dtype=bool)
+    first[1:] = targets[1:] != targets[:-1]
+    return sources[first], targets[first], candidates[first]
+
+
+class VectorizedDijkstra:
+    """
+    Dijkstra over a CSR graph where each settled node relaxes its whole
+    adjacency slice at once with NumPy.
+
+    With mode='delta' the engine runs delta-stepping instead: each step settles
+    a whole distance bucket [k * delta, (k + 1) * delta), relaxing the light
+    edges (weight <= delta) of the bucket in batches until it stops changing,
+    then its heavy edges once. Same step interface as DijkstraStepByStep.
+
+    limits (a SearchLimits, 'dijkstra' mode only) bounds the search the same
+    way as in DijkstraStepByStep.
+    """
+
+    def __init__(self, graph, source, mode='dijkstra', delta=None, limits=None):
+        self.csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph)
+        self.graph = self.csr
+        self.source = source
+        self.mode = mode
+
+        n = self.csr.number_of_nodes()
+        self.dist = np.full(n, np.inf)
+        self.pred = np.full(n, -1, dtype=np.int64)
+        self.settled = np.zeros(n, dtype=bool)
+        self.current_node = None
+        self.current_bucket = []
+        self.finished = False
+        self.limits = limits
+        self.stopped_by = None
+        self.settled_count = 0
+        # Arcs examined so far
+        self.relaxations = 0
+        if limits is not None and mode != 'dijkstra':
+            raise ValueError("Search limits need mode='dijkstra'")
+        self._deadline = limits.deadline() if limits is not None else None
+
+        s = self.csr.index[source]
+        self.dist[s] = 0
+        if mode == 'dijkstra':
+            self._heap = [(0.0, s)]
+        elif mode == 'delta':
+            if delta is None:
+                # Classic choice: max weight / average degree
+                edges = len(self.csr.weights)
+                delta = float(self.csr.weights.max()) * n / edges if edges else 1.0
+            self.delta = max(delta, 1e-9)
+            self._light = self.csr.weights <= self.delta
+            self._heavy = ~self._light
+            self._buckets = {0: {s}}
+        else:
+            raise ValueError(f"Unknown mode: {mode}")
+
+    @property
+    def queue(self):
+        labels = self.csr.labels
+        if self.mode == 'dijkstra':
+            return [(d, labels[i]) for d, i in self._heap]
+        return [(self.dist[i].item(), labels[i])
+                for bucket in self._buckets.values() for i in bucket]
+
+    @property
+    def distances(self):
+        return {label: d for label, d in zip(self.csr.labels, self.dist.tolist())}
+
+    @property
+    def predecessors(self):
+        labels = self.csr.labels
+        return {labels[i]: (labels[p] if p >= 0 else None)
+                for i, p in enumerate(self.pred.tolist())}
+
+    @property
+    def visited(self):
+        labels = self.csr.labels
+        return {labels[i] for i in np.flatnonzero(self.settled)}
+
+    def has_next(self):
+        return not self.finished
+
+    def relax_node(self, i):
+        """Relax every out-edge of node i at once, returns the improved targets"""
+        targets, weights = self.csr.out_slice(i)
+        self.relaxations += len(targets)
+        candidates = self.dist[i] + weights
+        improved = (candidates < self.dist[targets]) & ~self.settled[targets]
+        if self.limits is not None and self.limits.radius is not None:
+            outside = improved & (candidates > self.limits.radius)
+            if outside.any():
+                self.stopped_by = 'radius'
+                improved &= ~outside
+        targets = targets[improved]
+        self.dist[targets] = candidates[improved]
+        self.pred[targets] = i
+        return targets
+
+    def step_forward(self):
+        if self.mode == 'delta':
+            self._step_bucket()
+        else:
+            self._step_node()
+
+    def _step_node(self):
+        if self.limits is not None and self._heap:
+            reason = self.limits.exceeded(self.settled_count, len(self._heap), self._deadline)
+            if reason is not None:
+                self.stopped_by = reason
+                self.finished = True
+                self.current_node = None
+                return
+        while self._heap:
+            d, i = heapq.heappop(self._heap)
+            if not self.settled[i]:
+                break
+        else:
+            self.finished = True
+            self.current_node = None
+            return
+
+        self.settled[i] = True
+        self.settled_count += 1
+        self.current_node = self.csr.labels[i]
+        for target in self.relax_node(i).tolist():
+            heapq.heappush(self._heap, (self.dist[target].item(), target))
+
+        if not self._heap:
+            self.finished = True
+
+    def _candidates(self, nodes, weight_mask):
+        """Best tentative distance per target reachable through the given edges"""
+        sources, targets, weights = gather_out_edges(self.csr, nodes, weight_mask)
+        self.relaxations += len(weights)
+        return min_per_target(sources, targets, self.dist[sources] + weights)
+
+    def _relax_batch(self, nodes, weight_mask):
+        sources, targets, candidates = self._candidates(nodes, weight_mask)
+        improved = candidates < self.dist[targets]
+        sources, targets, candidates = sources[improved], targets[improved], candidates[improved]
+        for t, old in zip(targets.tolist(), self.dist[targets].tolist()):
+            if old != np.inf:
+                self._buckets.get(int(old // self.delta), set()).discard(t)
+        self.dist[targets] = candidates
+        self.pred[targets] = sources
+        for t, d in zip(targets.tolist(), candidates.tolist()):
+            self._buckets.setdefault(int(d // self.delta), set()).add(t)
+        return len(targets)
+
+    def _step_bucket(self):
+        while self._buckets and not self._buckets[min(self._buckets)]:
+            del self._buckets[min(self._buckets)]
+        if not self._buckets:
+            self.finished = True
+            self.current_node = None
+            self.current_bucket = []
+            return
+
+        k = min(self._buckets)
+        settled_in_bucket = []
+        while self._buckets.get(k):
+            frontier = np.fromiter(self._buckets.pop(k), dtype=np.int64)
+            settled_in_bucket.append(frontier)
+            self._relax_batch(frontier, self._light)
+        bucket = np.unique(np.concatenate(settled_in_bucket))
+        self._relax_batch(bucket, self._heavy)
+        self._buckets.pop(k, None)
+
+        self.settled[bucket] = True
+        labels = self.csr.labels
+        self.current_bucket = [labels[i] for i in bucket.tolist()]
+        self.current_node = labels[int(bucket[np.argmax(self.dist[bucket])])]
+
+        if not any(self._buckets.values()):
+            self.finished = True
+
+    def get_current_state(self):
+        return {
+            'distances': self.distances,
+            'visited': self.visited,
+            'current_node': self.current_node,
+            'predecessors': self.predecessors,
+        }